@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.simulation.simulation import Simulator
+
+# frictionless high velocity swing
+plant = DoublePendulumPlant(
+    mass=[0.6, 0.6],
+    length=[0.3, 0.2],
+    com=[0.3, 0.2],
+    damping=[0.0, 0.0],
+    torque_limit=[0.0, 5.0],
+)
+sim = Simulator(plant=plant)
+
+x0 = [2.5, -1.0, 8.0, -12.0]
+t_final = 3.0
+control_dt = 0.002
+
+
+def reference(t):
+    return solve_ivp(
+        lambda t, y: plant.rhs(t, y, [0.0, 0.0]),
+        (0.0, t),
+        x0,
+        method="DOP853",
+        rtol=1e-13,
+        atol=1e-13,
+    ).y[:, -1]
+
+
+print("integrator     dt/tol    rhs evals   final state error")
+for dt in [0.002, 0.001, 0.0005, 0.00025]:
+    T, X, U = sim.simulate(0.0, x0, t_final, dt, integrator="runge_kutta")
+    err = np.max(np.abs(X[-1] - reference(T[-1])))
+    print(f"runge_kutta  {dt:8.5f}  {4 * (len(T) - 1):10d}  {err:18.2e}")
+
+for integrator in ["dopri5", "bs32"]:
+    for tol in [1e-5, 1e-7, 1e-9]:
+        sim.set_integrator_parameters(rtol=tol, atol=tol)
+        T, X, U = sim.simulate(0.0, x0, t_final, control_dt, integrator=integrator)
+        stats = sim.get_integrator_statistics()
+        err = np.max(np.abs(X[-1] - reference(T[-1])))
+        print(
+            f"{integrator:11s}  {tol:8.0e}  {stats['n_rhs']:10d}  {err:18.2e}"
+            f"  (accepted: {stats['n_accepted']}, rejected: {stats['n_rejected']})"
+        )
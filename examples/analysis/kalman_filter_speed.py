@@ -0,0 +1,65 @@
+import time
+import numpy as np
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.utils.filters.kalman_filter import kalman_filter_rt
+
+# model parameters
+design = "design_C.0"
+model = "model_3.0"
+robot = "acrobot"
+
+model_par_path = (
+    "../../data/system_identification/identified_parameters/"
+    + design
+    + "/"
+    + model
+    + "/model_parameters.yml"
+)
+mpar = model_parameters(filepath=model_par_path)
+
+# filter parameters
+dt = 0.002
+n_ticks = 50000
+x_lin = [np.pi, 0.0, 0.0, 0.0]
+u_lin = [0.0, 0.0]
+process_noise = [1e-4, 1e-4, 1e-3, 1e-3]
+meas_noise = [0.001, 0.001, 0.1, 0.1]
+
+plant = DoublePendulumPlant(model_pars=mpar)
+A, B = plant.linear_matrices(x_lin, u_lin)
+
+rng = np.random.default_rng(0)
+X = np.asarray(x_lin) + rng.normal(0.0, np.sqrt(meas_noise), (n_ticks, 4))
+U = np.zeros((n_ticks, 2))
+
+
+def run(steady_state):
+    filt = kalman_filter_rt(
+        A=A,
+        B=B,
+        x0=x_lin,
+        dt=dt,
+        process_noise=process_noise,
+        measurement_noise=meas_noise,
+        steady_state=steady_state,
+    )
+    X_est = np.empty_like(X)
+    t0 = time.perf_counter()
+    for i in range(n_ticks):
+        X_est[i] = filt(X[i], U[i])
+    return (time.perf_counter() - t0) / n_ticks, X_est, filt.steady_state
+
+
+t_full, X_full, _ = run(False)
+t_ss, X_ss, ss = run(True)
+
+print(f"{n_ticks} filter ticks at {1./dt} Hz")
+print(f"filterpy (time-varying gain): {1e6*t_full:8.2f} us/tick")
+print(f"steady state gain:            {1e6*t_ss:8.2f} us/tick (active: {ss})")
+print(f"speedup:                      {t_full / t_ss:8.2f}")
+print(
+    "max. deviation after transient: "
+    f"{np.max(np.abs(X_full[-n_ticks//10:] - X_ss[-n_ticks//10:])):.3e}"
+)
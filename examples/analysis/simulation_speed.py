@@ -0,0 +1,64 @@
+import time
+import numpy as np
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.simulation.simulation import Simulator
+
+# model parameters
+design = "design_C.0"
+model = "model_3.0"
+robot = "acrobot"
+
+model_par_path = (
+    "../../data/system_identification/identified_parameters/"
+    + design
+    + "/"
+    + model
+    + "/model_parameters.yml"
+)
+mpar = model_parameters(filepath=model_par_path)
+
+# simulation parameters
+dt = 0.002
+t_final = 10.0
+x0 = [0.1, 0.0, 0.0, 0.0]
+integrator = "runge_kutta"
+repetitions = 3
+
+plant = DoublePendulumPlant(model_pars=mpar)
+sim = Simulator(plant=plant)
+
+
+def steps_per_second(fast):
+    sim.use_fast_rhs = fast
+    times = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        T, X, U = sim.simulate(
+            t0=0.0, x0=x0, tf=t_final, dt=dt, controller=None, integrator=integrator
+        )
+        times.append(time.perf_counter() - t0)
+    return (len(T) - 1) / min(times), np.asarray(X)
+
+
+sps_generic, X_generic = steps_per_second(False)
+sps_fast, X_fast = steps_per_second(True)
+
+print(f"{t_final} s simulation at {1./dt} Hz, integrator: {integrator}")
+print(f"generic rhs:     {sps_generic:10.0f} steps/s")
+print(f"scalar fast rhs: {sps_fast:10.0f} steps/s")
+print(f"speedup:         {sps_fast / sps_generic:10.2f}")
+print(f"max. state deviation: {np.max(np.abs(X_generic - X_fast)):.3e}")
+
+# integrator step alone (without measurement, noise and recording)
+n = int(t_final / dt)
+x = np.asarray(x0, dtype=float)
+tau = np.zeros(2)
+for fast in [False, True]:
+    sim.use_fast_rhs = fast
+    t0 = time.perf_counter()
+    for _ in range(n):
+        sim.runge_integrator(x, dt, 0.0, tau)
+    name = "scalar fast rhs" if fast else "generic rhs"
+    print(f"RK4 increments/s ({name}): {n / (time.perf_counter() - t0):10.0f}")
@@ -10,6 +10,7 @@ from double_pendulum.analysis.benchmark import benchmarker
 from double_pendulum.analysis.utils import get_par_list
 from double_pendulum.analysis.benchmark_scores import get_scores
 from double_pendulum.analysis.benchmark_plot import plot_benchmark_results
+from double_pendulum.analysis.result_cache import hash_content, track_read_files
 
 from sim_parameters import (
     mpar,
@@ -25,7 +26,27 @@ from sim_parameters import (
 )
 
 
-def benchmark_controller(controller, save_dir, controller_name=""):
+def get_controller_config(controller_file, data_files=[]):
+    # the controller is defined by its script, the simulation parameters
+    # and the data files (trajectories, policies) loaded by the script
+    config = []
+    for file in [controller_file, "sim_parameters.py"]:
+        with open(file, "r") as f:
+            config.append(f.read())
+    for file in sorted(data_files):
+        with open(file, "rb") as f:
+            config.append(hash_content(os.path.relpath(file), f.read()))
+    return config
+
+
+def import_controller(controller_arg):
+    # record the data files read while the controller script is set up
+    with track_read_files("../../..") as data_files:
+        imp = importlib.import_module(controller_arg)
+    return imp.controller, get_controller_config(controller_arg + ".py", data_files)
+
+
+def benchmark_controller(controller, save_dir, controller_name="", controller_config=None):
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
@@ -113,6 +134,9 @@ def benchmark_controller(controller, save_dir, controller_name=""):
     ben.set_model_parameter(model_pars=mpar)
     ben.set_cost_par(Q=Q, R=R, Qf=Qf)
     ben.compute_ref_cost()
+    if controller_config is not None:
+        # only simulate what changed since the last run
+        ben.set_result_cache(controller_config=controller_config)
     res = ben.benchmark(
         compute_model_robustness=True,
         compute_noise_robustness=True,
@@ -130,6 +154,7 @@ def benchmark_controller(controller, save_dir, controller_name=""):
         u_responses=u_responses,
         delay_mode=delay_mode,
         delays=delays,
+        seed=0,
     )
     #pprint.pprint(res)
 
@@ -162,7 +187,5 @@ if __name__ == "__main__":
 
     save_dir = f"data/{controller_name}"
 
-    imp = importlib.import_module(controller_arg)
-    controller = imp.controller
-
-    benchmark_controller(controller, save_dir)
+    controller, controller_config = import_controller(controller_arg)
+    benchmark_controller(controller, save_dir, controller_config=controller_config)
@@ -12,7 +12,7 @@ from double_pendulum.analysis.leaderboard import leaderboard_scores
 from double_pendulum.analysis.benchmark_scores import get_scores
 
 from sim_parameters import mpar, dt, t_final, t0, x0, goal, integrator
-from benchmark_controller import benchmark_controller
+from benchmark_controller import benchmark_controller, import_controller
 
 
 parser = argparse.ArgumentParser()
@@ -61,14 +61,15 @@ for file in os.listdir("."):
 
             controller_arg = file[:-3]
             controller_name = controller_arg[4:]
-            imp = importlib.import_module(controller_arg)
-            controller = imp.controller
+            controller, controller_config = import_controller(controller_arg)
 
             save_dir = os.path.join(data_dir, f"{controller_name}")
             if not os.path.exists(save_dir):
                 os.makedirs(save_dir)
 
-            benchmark_controller(controller, save_dir)
+            benchmark_controller(
+                controller, save_dir, controller_config=controller_config
+            )
 
             recompute_leaderboard = True
 
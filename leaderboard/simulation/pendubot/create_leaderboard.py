@@ -33,11 +33,20 @@ parser.add_argument(
     default="",
     required=False,
 )
+parser.add_argument(
+    "--num-workers",
+    dest="num_workers",
+    help="Number of worker processes for scoring the trajectories.",
+    default=os.cpu_count(),
+    required=False,
+    type=int,
+)
 
 
 data_dir = parser.parse_args().data_dir
 recompute_leaderboard = parser.parse_args().recompute
 link_base = parser.parse_args().link
+num_workers = parser.parse_args().num_workers
 
 if not os.path.exists(data_dir):
     os.makedirs(data_dir)
@@ -107,6 +116,9 @@ if recompute_leaderboard:
             "velocity_cost": 1000,
         },
         link_base=link_base,
+        num_workers=num_workers,
+        # only new or changed trajectories are scored
+        cache_file=os.path.splitext(save_to)[0] + "_score_cache.pkl",
     )
 
     df = pandas.read_csv(save_to)
@@ -1,10 +1,33 @@
+import copy
+import inspect
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
-from double_pendulum.utils.wrap_angles import wrap_angles_top
+from double_pendulum.utils.wrap_angles import wrap_angles_top_batch
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.model.plant import DoublePendulumPlant
 from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.batch_simulation import BatchSimulator
+from double_pendulum.simulation.stop_condition import StopCondition
 from double_pendulum.utils.csv_trajectory import load_trajectory
+from double_pendulum.analysis.parameter_sweep import sample_parameters
+from double_pendulum.analysis.result_cache import (
+    ResultCache,
+    hash_content,
+    DEFAULT_MAX_SIZE,
+)
+
+
+# model parameters with one value per joint, e.g. "b1", "b2"
+modelpar_keys = {
+    "m": "mass",
+    "r": "com",
+    "I": "inertia",
+    "b": "damping",
+    "cf": "cfric",
+}
 
 
 class benchmarker:
@@ -20,8 +43,14 @@ class benchmarker:
         friction_compensation=True,
         integrator="runge_kutta",
         save_dir="benchmark",
+        controller_factory=None,
     ):
+        if controller is None:
+            controller = controller_factory()
+        if controller_factory is None:
+            controller_factory = functools.partial(copy.deepcopy, controller)
         self.controller = controller
+        self.controller_factory = controller_factory
         self.x0 = np.asarray(x0)
         self.dt = dt
         self.t_final = t_final
@@ -58,6 +87,16 @@ class benchmarker:
         self.ref_cost_free = None
         self.ref_cost_tf = None
 
+        self.filter_args = None
+        self.seed_sequence = np.random.SeedSequence()
+        self.executor = None
+
+        self.result_cache = None
+        self.controller_config_hash = None
+
+        self.set_adaptive_parameters()
+        self.set_stop_condition()
+
     def set_model_parameter(
         self,
         mass=[0.608, 0.630],
@@ -119,22 +158,44 @@ class benchmarker:
         self.Qf = Qf
 
     def compute_cost(self, x_traj, u_traj, mode="free"):
-        len_traj = len(x_traj)
+        """
+        quadratic cost of a trajectory or of a batch of trajectories
+
+        Parameters
+        ----------
+        x_traj : array_like, shape=(N, 4) or shape=(M, N, 4)
+            states
+        u_traj : array_like, shape=(N-1, 2) or shape=(M, N-1, 2)
+            motor torques
+        mode : string
+            "free": deviation from the goal
+            "trajectory_following": deviation from the reference trajectory
+            (Default value="free")
+
+        Returns
+        -------
+        float or numpy_array, shape=(M,)
+            cost
+        """
+        x_traj = np.asarray(x_traj, dtype=float)
+        u_traj = np.asarray(u_traj, dtype=float)
+        len_traj = x_traj.shape[-2]
 
         if mode == "free":
-            X = x_traj[:-1] - self.goal
+            X = x_traj[..., :-1, :] - self.goal
             U = u_traj
-            xf = x_traj[-1] - self.goal
+            xf = x_traj[..., -1, :] - self.goal
         elif mode == "trajectory_following":
-            n = min([len(x_traj), len(self.x_traj)])
-            X = x_traj[:n] - self.x_traj[:n]
-            nu = min([len(u_traj), len(self.u_traj)])
-            U = u_traj[:nu] - self.u_traj[:nu]
-            xf = x_traj[-1] - self.x_traj[-1]
+            n = min([len_traj, len(self.x_traj)])
+            X = x_traj[..., :n, :] - self.x_traj[:n]
+            nu = min([u_traj.shape[-2], len(self.u_traj)])
+            U = u_traj[..., :nu, :] - self.u_traj[:nu]
+            xf = x_traj[..., -1, :] - self.x_traj[-1]
 
-        X_cost = np.einsum("jl, jk, lk", X.T, self.Q, X) / (len_traj - 1)
-        U_cost = np.einsum("jl, jk, lk", U.T, self.R, U) / (len_traj - 1)
-        Xf_cost = np.einsum("i, ij, j", xf, self.Qf, xf)
+        # sums of the quadratic forms over the time axis
+        X_cost = np.sum((X @ self.Q) * X, axis=(-2, -1)) / (len_traj - 1)
+        U_cost = np.sum((U @ self.R) * U, axis=(-2, -1)) / (len_traj - 1)
+        Xf_cost = np.sum((xf @ self.Qf) * xf, axis=-1)
 
         cost = X_cost + U_cost + Xf_cost
         return cost
@@ -149,35 +210,54 @@ class benchmarker:
             )
 
     def check_goal_success(self, x_traj):
+        """
+        whether the trajectory reaches the goal region (the final state
+        if check_only_final_state)
+
+        Parameters
+        ----------
+        x_traj : array_like, shape=(N, 4) or shape=(M, N, 4)
+            states
+
+        Returns
+        -------
+        bool or numpy_array, shape=(M,)
+            success
+        """
+        X = np.asarray(x_traj, dtype=float)
         if self.check_only_final_state:
-            lp = wrap_angles_top(x_traj[-1])
-            pos1_succ = np.abs(lp[0] - self.goal[0]) < self.epsilon[0]
-            pos2_succ = np.abs(lp[1] - self.goal[1]) < self.epsilon[1]
-            vel1_succ = np.abs(lp[2] - self.goal[2]) < self.epsilon[2]
-            vel2_succ = np.abs(lp[3] - self.goal[3]) < self.epsilon[3]
-            succ = pos1_succ and pos2_succ and vel1_succ and vel2_succ
-        else:
-            succ = False
-            for x in x_traj:
-                lp = wrap_angles_top(x)
-                pos1_succ = np.abs(lp[0] - self.goal[0]) < self.epsilon[0]
-                pos2_succ = np.abs(lp[1] - self.goal[1]) < self.epsilon[1]
-                vel1_succ = np.abs(lp[2] - self.goal[2]) < self.epsilon[2]
-                vel2_succ = np.abs(lp[3] - self.goal[3]) < self.epsilon[3]
-                succ = pos1_succ and pos2_succ and vel1_succ and vel2_succ
-                if succ:
-                    break
-
-        return succ
+            X = X[..., -1:, :]
+        lp = wrap_angles_top_batch(X)
+        within = np.all(np.abs(lp - self.goal) < self.epsilon, axis=-1)
+        return np.any(within, axis=-1)
 
     def compute_success_measure(self, x_traj, u_traj):
-        X = np.asarray(x_traj)
-        U = np.asarray(u_traj)
+        """
+        costs and success of a trajectory or of a batch of trajectories
+
+        Parameters
+        ----------
+        x_traj : array_like, shape=(N, 4) or shape=(M, N, 4)
+            states
+        u_traj : array_like, shape=(N-1, 2) or shape=(M, N-1, 2)
+            motor torques
+
+        Returns
+        -------
+        float or numpy_array, shape=(M,)
+            free cost
+        float or numpy_array, shape=(M,)
+            trajectory following cost (0 without reference trajectory)
+        bool or numpy_array, shape=(M,)
+            success
+        """
+        X = np.asarray(x_traj, dtype=float)
+        U = np.asarray(u_traj, dtype=float)
         cost_free = self.compute_cost(X, U, mode="free")
         if self.traj_following:
             cost_tf = self.compute_cost(X, U, mode="trajectory_following")
         else:
-            cost_tf = 0.0
+            cost_tf = np.zeros(X.shape[:-2]) if X.ndim > 2 else 0.0
         succ = self.check_goal_success(X)
         return cost_free, cost_tf, succ
 
@@ -221,11 +301,800 @@ class benchmarker:
             dt=self.dt,
             controller=self.controller,
             integrator=self.integrator,
+            stop_condition=self.stop_condition,
+            pad=self.pad,
         )
 
         cost_free, cost_tf, succ = self.compute_success_measure(X, U)
         return cost_free, cost_tf, succ
 
+    def get_modelpar_variation(self, mp, var):
+        """
+        plant parameters of a model parameter variation
+
+        Parameters
+        ----------
+        mp : string
+            varied model parameter, see get_modelpar_sample
+        var : float
+            value of the varied model parameter
+
+        Returns
+        -------
+        dict
+            keyword arguments for simulate_and_get_cost
+        """
+        return self.get_modelpar_sample({mp: var})
+
+    def get_modelpar_sample(self, pars):
+        """
+        plant parameters of a sweep point, where several model parameters
+        are varied at once. The parameters are applied in the order of pars,
+        e.g. "m1r1" keeps the (possibly varied) m1 and changes r1.
+
+        Parameters
+        ----------
+        pars : dict
+            varied model parameters mapped to their values. Supported names:
+            "m1", "m2", "r1", "r2", "m1r1", "m2r2", "I1", "I2",
+            "b1", "b2", "cf1", "cf2", "Ir", "g"
+
+        Returns
+        -------
+        dict
+            keyword arguments for simulate_and_get_cost
+        """
+        model = {
+            "mass": list(self.mass),
+            "length": list(self.length),
+            "com": list(self.com),
+            "damping": list(self.damping),
+            "gravity": self.gravity,
+            "cfric": list(self.cfric),
+            "inertia": list(self.inertia),
+            "motor_inertia": self.motor_inertia,
+            "torque_limit": self.torque_limit,
+        }
+        for mp, var in pars.items():
+            if mp == "Ir":
+                model["motor_inertia"] = var
+            elif mp == "g":
+                model["gravity"] = var
+            elif mp in ["m1r1", "m2r2"]:
+                i = int(mp[1]) - 1
+                model["com"][i] = var / model["mass"][i]
+            elif mp[:-1] in modelpar_keys:
+                model[modelpar_keys[mp[:-1]]][int(mp[-1]) - 1] = var
+            else:
+                raise NotImplementedError(
+                    f"Sorry, varying the model parameter {mp} is not implemented."
+                )
+        return model
+
+    def get_settings(self):
+        """
+        settings of this benchmarker (without controller), used to
+        reconstruct the benchmarker in worker processes
+
+        Returns
+        -------
+        dict
+        """
+        return {
+            "init": {
+                "x0": self.x0,
+                "dt": self.dt,
+                "t_final": self.t_final,
+                "goal": self.goal,
+                "epsilon": self.epsilon,
+                "check_only_final_state": self.check_only_final_state,
+                "friction_compensation": self.friction_compensation,
+                "integrator": self.integrator,
+                "save_dir": self.save_dir,
+            },
+            "model": {
+                "mass": self.mass,
+                "length": self.length,
+                "com": self.com,
+                "damping": self.damping,
+                "cfric": self.cfric,
+                "gravity": self.gravity,
+                "inertia": self.inertia,
+                "motor_inertia": self.motor_inertia,
+                "torque_limit": self.torque_limit,
+            },
+            "cost": (self.Q, self.R, self.Qf),
+            "traj": (self.traj_following, self.t_traj, self.x_traj, self.u_traj),
+            "ref_cost": (self.ref_cost_free, self.ref_cost_tf),
+            "stop": (self.stop_condition, self.pad),
+        }
+
+    @classmethod
+    def from_settings(cls, settings, controller):
+        """
+        create a benchmarker from the settings of get_settings
+
+        Parameters
+        ----------
+        settings : dict
+            settings from get_settings
+        controller : Controller object
+
+        Returns
+        -------
+        benchmarker object
+        """
+        ben = cls(controller=controller, **settings["init"])
+        if settings["model"]["mass"] is not None:
+            ben.set_model_parameter(**settings["model"])
+        ben.Q, ben.R, ben.Qf = settings["cost"]
+        ben.traj_following, ben.t_traj, ben.x_traj, ben.u_traj = settings["traj"]
+        ben.ref_cost_free, ben.ref_cost_tf = settings["ref_cost"]
+        ben.set_stop_condition(*settings["stop"])
+        return ben
+
+    def simulate_job(self, job):
+        """
+        run a single robustness simulation
+
+        Parameters
+        ----------
+        job : dict
+            description of the simulation with the keys
+            "seed": seed of the numpy random number generator
+            "filter_args": arguments for controller.set_filter_args or None
+            and one of
+            "model": plant parameters (see get_modelpar_variation)
+            "meas_noise_sigmas": measurement noise sigmas
+            "u_noise_sigmas": torque noise sigmas
+            "u_responsiveness": motor responsiveness
+            "delay", "delay_mode": measurement delay
+            Repeated simulations are distinguished by the key "repetition".
+
+        Returns
+        -------
+        float
+            free cost
+        float
+            trajectory following cost
+        bool
+            success
+        """
+        np.random.seed(job["seed"])
+
+        if job["filter_args"] is not None:
+            self.controller.set_filter_args(
+                plant=self.plant, simulator=self.simulator, **job["filter_args"]
+            )
+
+        if "model" in job:
+            return self.simulate_and_get_cost(**job["model"])
+
+        self.controller.reset()
+        if self.friction_compensation:
+            self.controller.set_friction_compensation(
+                damping=self.damping, coulomb_fric=self.cfric
+            )
+        self.controller.init()
+
+        if "meas_noise_sigmas" in job:
+            self.simulator.set_measurement_parameters(
+                meas_noise_sigmas=job["meas_noise_sigmas"]
+            )
+        if "u_noise_sigmas" in job:
+            self.simulator.set_motor_parameters(u_noise_sigmas=job["u_noise_sigmas"])
+        if "u_responsiveness" in job:
+            self.simulator.set_motor_parameters(
+                u_responsiveness=job["u_responsiveness"]
+            )
+        if "delay" in job:
+            self.simulator.set_measurement_parameters(
+                delay=job["delay"], delay_mode=job["delay_mode"]
+            )
+        T, X, U = self.simulator.simulate(
+            t0=0.0,
+            tf=self.t_final,
+            dt=self.dt,
+            x0=self.x0,
+            controller=self.controller,
+            integrator=self.integrator,
+            stop_condition=self.stop_condition,
+            pad=self.pad,
+        )
+        self.simulator.reset()
+
+        return self.compute_success_measure(X, U)
+
+    def set_adaptive_parameters(self, n_coarse=5, tol=None):
+        """
+        parameters of the adaptive boundary search, see
+        adaptive_boundary_search
+
+        Parameters
+        ----------
+        n_coarse : int, optional
+            number of evenly spaced points of a variation list which are
+            always simulated
+            (Default value=5)
+        tol : float, optional
+            tolerance of the success/failure boundary relative to the range
+            of the variation list. None refines up to neighboring points of
+            the variation list.
+            (Default value=None)
+        """
+        self.adaptive_n_coarse = n_coarse
+        self.adaptive_tol = tol
+
+    def set_stop_condition(self, stop_condition=None, pad="auto"):
+        """
+        early termination of the robustness simulations, see
+        Simulator.simulate. The trajectories are padded up to t_final for
+        the cost computation, with pad="auto" successful simulations hold
+        the last state and failed simulations are marked with nan (nan
+        costs, no success). Not used by the batch backend.
+
+        Parameters
+        ----------
+        stop_condition : callable or dict, optional
+            stop condition of Simulator.simulate, e.g.
+            {"goal": goal, "epsilon": eps, "hold_time": 1.0,
+            "max_error": [2.0, 2.0, 20.0, 20.0]}
+            None: always simulate until t_final
+            (Default value=None)
+        pad : string, optional
+            padding of the trajectories, "hold", "nan" or "auto"
+            (Default value="auto")
+        """
+        self.stop_condition = stop_condition
+        self.pad = pad
+
+    def set_result_cache(
+        self, cache_dir=None, max_size=DEFAULT_MAX_SIZE, controller_config=None
+    ):
+        """
+        cache the result of every simulation on disk. A simulation is only
+        recomputed if the controller config, the benchmark settings (plant
+        parameters, cost, integrator, dt, ...), the simulation settings
+        (model variation, noise, delay, responsiveness, filter) or its seed
+        changed.
+        The cache is only useful across runs if benchmark is called with a
+        fixed seed.
+
+        Parameters
+        ----------
+        cache_dir : string, optional
+            directory of the cache, if None the default directory of
+            result_cache.get_cache_dir() is used
+            (Default value=None)
+        max_size : int, optional
+            maximum size of the on-disk cache, units=[byte]
+            (Default value=100*1024*1024)
+        controller_config : object, optional
+            description of the controller used for the cache key, e.g. a
+            dict of controller parameters or the source code of the script
+            creating the controller. If None, the name and the source code
+            of the controller_factory function are used. This is not
+            possible for controllers passed without controller_factory,
+            closures and other callables.
+            (Default value=None)
+        """
+        if controller_config is None:
+            controller_config = self.get_factory_config()
+        self.controller_config_hash = hash_content(controller_config)
+        self.result_cache = ResultCache(cache_dir=cache_dir, max_size=max_size)
+
+    def get_factory_config(self):
+        """
+        canonical description of the controller_factory for the result
+        cache: module, name and source code of the factory function
+
+        Returns
+        -------
+        dict
+        """
+        factory = self.controller_factory
+        error = ValueError(
+            "The result cache needs a description of the controller. "
+            "It can only be derived from a plain controller_factory function, "
+            "please provide a controller_config for the result cache."
+        )
+        if not inspect.isfunction(factory) or factory.__closure__ is not None:
+            raise error
+        try:
+            source = inspect.getsource(factory)
+        except (OSError, TypeError) as e:
+            raise error from e
+        return {
+            "factory": f"{factory.__module__}.{factory.__qualname__}",
+            "source": source,
+        }
+
+    def get_stop_condition_config(self):
+        """
+        canonical description of the stop condition for the result cache
+
+        Returns
+        -------
+        dict or None
+        """
+        stop_condition = self.stop_condition
+        if stop_condition is None or isinstance(stop_condition, dict):
+            return stop_condition
+        if isinstance(stop_condition, StopCondition):
+            return stop_condition.get_dict()
+        raise ValueError(
+            "The result cache cannot describe a callable stop condition, "
+            "please set the stop condition as dict or StopCondition."
+        )
+
+    def open_pool(self, num_workers=None):
+        """
+        open a process pool for the robustness simulations. Every worker
+        process rebuilds this benchmarker with a controller from the
+        controller_factory.
+
+        Parameters
+        ----------
+        num_workers : int, optional
+            number of worker processes, None uses the number of cpus
+            (Default value=None)
+        """
+        self.close_pool()
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(self.get_settings(), self.controller_factory),
+        )
+
+    def close_pool(self):
+        """
+        shut down the process pool of open_pool
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def get_job_key(self, job):
+        """
+        content hash of a simulation job including the benchmark settings
+        and the controller config
+
+        Parameters
+        ----------
+        job : dict
+            simulation description, see simulate_job
+
+        Returns
+        -------
+        string
+            cache key
+        """
+        settings = self.get_settings()
+        del settings["init"]["save_dir"]
+        del settings["ref_cost"]
+        settings["stop"] = (self.get_stop_condition_config(), self.pad)
+        return hash_content(self.controller_config_hash, settings, job)
+
+    def run_jobs(self, jobs, progress_prefix="", backend=None, batch_size=None):
+        """
+        run robustness simulations, in the process pool if one is open
+        (see benchmark(num_workers=...) and open_pool).
+        Every job gets a seed derived from the benchmark seed and the content
+        of the job, so that the results neither depend on the number of
+        workers nor on the other jobs of the benchmark.
+        Results found in the result cache (see set_result_cache) are not
+        recomputed.
+
+        Parameters
+        ----------
+        jobs : list of dicts
+            simulation descriptions, see simulate_job
+        progress_prefix : string
+            prefix of the progress output
+            (Default value="")
+        backend : string, optional
+            "serial" : simulate one job after the other in this process
+            "process" : distribute the jobs over the open process pool
+            "batch" : simulate model parameter jobs in lockstep with
+            the BatchSimulator, see simulate_jobs_batch
+            None uses "process" if a pool is open and "serial" otherwise
+            (Default value=None)
+        batch_size : int, optional
+            number of rollouts per batch for the "batch" backend
+            (Default value=None)
+
+        Returns
+        -------
+        list
+            (free cost, following cost, success) for every job
+        """
+        if backend is None:
+            backend = "serial" if self.executor is None else "process"
+
+        res = [None] * len(jobs)
+        keys = [None] * len(jobs)
+        todo = []
+        # the jobs of the caller are not modified
+        jobs = [{**job, "filter_args": self.filter_args} for job in jobs]
+        for i, job in enumerate(jobs):
+            job_hash = int(hash_content(job)[:16], 16)
+            seed_seq = np.random.SeedSequence(
+                self.seed_sequence.entropy, spawn_key=(job_hash,)
+            )
+            job["seed"] = int(seed_seq.generate_state(1)[0])
+            if self.result_cache is not None:
+                # the batch simulation is not bitwise equal to the Simulator
+                keys[i] = self.get_job_key(
+                    {**job, "backend": "batch"} if backend == "batch" else job
+                )
+                res[i] = self.result_cache.get(keys[i])
+            if res[i] is None:
+                todo.append(i)
+
+        todo_jobs = [jobs[i] for i in todo]
+        if backend == "serial":
+            results = map(self.simulate_job, todo_jobs)
+        elif backend == "process":
+            if self.executor is None:
+                raise ValueError("No process pool is open, see open_pool.")
+            results = self.executor.map(_run_worker_job, todo_jobs)
+        elif backend == "batch":
+            results = self.simulate_jobs_batch(todo_jobs, batch_size=batch_size)
+        else:
+            raise NotImplementedError(f"Sorry, the backend {backend} is not implemented.")
+
+        n_cached = len(jobs) - len(todo)
+        if n_cached > 0:
+            print(f"{progress_prefix}{n_cached} results loaded from cache")
+        print(f"{progress_prefix}0/{len(todo)}", end="")
+        for counter, (i, r) in enumerate(zip(todo, results)):
+            res[i] = r
+            if self.result_cache is not None:
+                self.result_cache.put(keys[i], r)
+            print("\r", end="")
+            print(f"{progress_prefix}{counter + 1}/{len(todo)}", end="")
+        print("")
+        if self.result_cache is not None and len(todo) > 0:
+            self.result_cache.prune()
+        return res
+
+    def simulate_jobs_batch(self, jobs, batch_size=None):
+        """
+        simulate model parameter jobs with the BatchSimulator. The rollouts
+        of a batch are integrated in lockstep with one controller per
+        rollout (created with the controller_factory).
+        Noise filters (filter_args) and stop conditions are not supported
+        by the BatchSimulator and raise a NotImplementedError.
+
+        Parameters
+        ----------
+        jobs : list of dicts
+            simulation descriptions with the key "model",
+            see simulate_job
+        batch_size : int, optional
+            number of rollouts per batch, None simulates all jobs in one
+            batch
+            (Default value=None)
+
+        Yields
+        ------
+        tuple
+            (free cost, following cost, success) for every job
+        """
+        if self.stop_condition is not None:
+            raise NotImplementedError(
+                "Sorry, the batch backend does not support stop conditions."
+            )
+        if batch_size is None:
+            batch_size = max(len(jobs), 1)
+        for start in range(0, len(jobs), batch_size):
+            batch = jobs[start : start + batch_size]
+            P = []
+            for job in batch:
+                if "model" not in job:
+                    raise NotImplementedError(
+                        "Sorry, the batch backend only supports model parameter jobs."
+                    )
+                if job["filter_args"] is not None:
+                    raise NotImplementedError(
+                        "Sorry, the batch backend does not support noise filters."
+                    )
+                model = job["model"]
+                plant = DoublePendulumPlant(
+                    mass=model["mass"],
+                    length=model["length"],
+                    com=model["com"],
+                    damping=model["damping"],
+                    gravity=model["gravity"],
+                    coulomb_fric=model["cfric"],
+                    inertia=model["inertia"],
+                    motor_inertia=model["motor_inertia"],
+                    torque_limit=model["torque_limit"],
+                )
+                P.append(plant.parameter_vector())
+
+            controllers = []
+            for _ in batch:
+                controller = self.controller_factory()
+                controller.reset()
+                if self.friction_compensation:
+                    controller.set_friction_compensation(
+                        damping=self.damping, coulomb_fric=self.cfric
+                    )
+                controller.init()
+                controllers.append(controller)
+
+            simulator = BatchSimulator(plant=plant, n_rollouts=len(batch))
+            simulator.set_plant_parameters(P)
+            T, X, U = simulator.simulate(
+                t0=0.0,
+                x0=self.x0,
+                tf=self.t_final,
+                dt=self.dt,
+                controller=controllers,
+                integrator=self.integrator,
+            )
+            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
+            for i in range(len(batch)):
+                yield cost_free[i], cost_tf[i], succ[i]
+
+    def check_parameter_sweep(
+        self,
+        spec,
+        method="grid",
+        n_samples=None,
+        seed=None,
+        backend=None,
+        batch_size=None,
+        num_workers=None,
+        progress_prefix="",
+    ):
+        """
+        compute the controller performance on a multi-dimensional sweep of
+        model parameters
+
+        Parameters
+        ----------
+        spec : dict
+            model parameter names (see get_modelpar_sample) mapped to
+            value lists, see parameter_sweep.sample_parameters
+        method : string, optional
+            sampling strategy, "grid", "lhs" or "sobol"
+            (Default value="grid")
+        n_samples : int, optional
+            number of samples for "lhs" and "sobol"
+            (Default value=None)
+        seed : int, optional
+            seed of the sampling for "lhs" and "sobol"
+            (Default value=None)
+        backend : string, optional
+            "serial", "process" or "batch", see run_jobs
+            (Default value=None)
+        batch_size : int, optional
+            number of rollouts per batch for the "batch" backend
+            (Default value=None)
+        num_workers : int, optional
+            number of worker processes for the "process" backend, if no
+            pool is open
+            (Default value=None)
+        progress_prefix : string
+            prefix of the progress output
+            (Default value="")
+
+        Returns
+        -------
+        dict
+            "names": list of the d swept parameters
+            "values": numpy array, shape=(N, d), sweep points
+            "free_costs": numpy array, shape=(N,)
+            "following_costs": numpy array, shape=(N,)
+            (only for trajectory following)
+            "successes": numpy array, shape=(N,), dtype=bool
+        """
+        names, values = sample_parameters(
+            spec, method=method, n_samples=n_samples, seed=seed
+        )
+        jobs = [
+            {"model": self.get_modelpar_sample(dict(zip(names, v)))} for v in values
+        ]
+
+        close_pool = backend == "process" and self.executor is None
+        if close_pool:
+            self.open_pool(num_workers)
+        try:
+            res = self.run_jobs(
+                jobs,
+                progress_prefix=progress_prefix,
+                backend=backend,
+                batch_size=batch_size,
+            )
+        finally:
+            if close_pool:
+                self.close_pool()
+
+        res_dict = {}
+        res_dict["names"] = names
+        res_dict["values"] = values
+        res_dict["free_costs"] = np.array([r[0] for r in res])
+        if self.traj_following:
+            res_dict["following_costs"] = np.array([r[1] for r in res])
+        res_dict["successes"] = np.array([r[2] for r in res], dtype=bool)
+        return res_dict
+
+    def adaptive_boundary_search(
+        self, values, make_jobs, progress_prefix="", backend=None, batch_size=None
+    ):
+        """
+        find the points of a (sorted) variation list where the controller
+        flips between success and failure without simulating every point.
+
+        The list is simulated at n_coarse evenly spaced points. Intervals
+        between simulated neighbors with a different outcome are bisected
+        until the boundary is found up to the tolerance (see
+        set_adaptive_parameters). All bisection points of a refinement
+        round are simulated together. The outcome of the points that were
+        not simulated is inferred from their nearest simulated neighbors,
+        i.e. boundaries between two coarse points with the same outcome are
+        not detected.
+
+        Parameters
+        ----------
+        values : array_like
+            sorted variation list, shape=(N,)
+        make_jobs : function
+            make_jobs(i) returns the list of simulation jobs of point i
+            (see simulate_job). With several jobs (repetitions) the point is
+            a success if more than half of the jobs succeed.
+        progress_prefix : string
+            prefix of the progress output
+            (Default value="")
+        backend : string, optional
+            see run_jobs
+            (Default value=None)
+        batch_size : int, optional
+            see run_jobs
+            (Default value=None)
+
+        Returns
+        -------
+        list
+            results of the jobs of every point, None for points that were
+            not simulated
+        list
+            success of every point (simulated or inferred)
+        """
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        results = [None] * n
+        succ = [None] * n
+        if self.adaptive_tol is None:
+            tol = 0.0
+        else:
+            tol = self.adaptive_tol * (np.max(values) - np.min(values))
+
+        n_coarse = min(max(self.adaptive_n_coarse, 2), n)
+        todo = sorted(set(np.linspace(0, n - 1, n_coarse).round().astype(int)))
+        while len(todo) > 0:
+            jobs = []
+            for i in todo:
+                jobs.append(make_jobs(i))
+            res = self.run_jobs(
+                [job for point_jobs in jobs for job in point_jobs],
+                progress_prefix=progress_prefix,
+                backend=backend,
+                batch_size=batch_size,
+            )
+            k = 0
+            for i, point_jobs in zip(todo, jobs):
+                results[i] = res[k : k + len(point_jobs)]
+                succ[i] = bool(np.average([r[2] for r in results[i]]) > 0.5)
+                k += len(point_jobs)
+
+            simulated = [i for i in range(n) if succ[i] is not None]
+            todo = []
+            for i, j in zip(simulated[:-1], simulated[1:]):
+                if (
+                    succ[i] != succ[j]
+                    and j > i + 1
+                    and abs(values[j] - values[i]) > tol
+                ):
+                    todo.append((i + j) // 2)
+
+        simulated = [i for i in range(n) if results[i] is not None]
+        for i, j in zip(simulated[:-1], simulated[1:]):
+            for m in range(i + 1, j):
+                if abs(values[m] - values[i]) <= abs(values[j] - values[m]):
+                    succ[m] = succ[i]
+                else:
+                    succ[m] = succ[j]
+        return results, succ
+
+    def run_point_jobs(self, values, make_jobs, adaptive=False, progress_prefix=""):
+        """
+        simulate the jobs of all points of a variation list, or only the
+        ones needed by the adaptive_boundary_search
+
+        Parameters
+        ----------
+        values : array_like
+            variation list, shape=(N,)
+        make_jobs : function
+            make_jobs(i) returns the list of simulation jobs of point i
+        adaptive : bool, optional
+            whether to use the adaptive_boundary_search
+            (Default value=False)
+        progress_prefix : string
+            prefix of the progress output
+            (Default value="")
+
+        Returns
+        -------
+        list
+            results of the jobs of every point, None for points that were
+            not simulated
+        list
+            success of every point (simulated or inferred)
+        """
+        if adaptive:
+            return self.adaptive_boundary_search(
+                values, make_jobs, progress_prefix=progress_prefix
+            )
+        jobs = [make_jobs(i) for i in range(len(values))]
+        res = self.run_jobs(
+            [job for point_jobs in jobs for job in point_jobs],
+            progress_prefix=progress_prefix,
+        )
+        results = []
+        k = 0
+        for point_jobs in jobs:
+            results.append(res[k : k + len(point_jobs)])
+            k += len(point_jobs)
+        succ = [bool(np.average([r[2] for r in rs]) > 0.5) for rs in results]
+        return results, succ
+
+    def collect_point_results(self, results, succ, repetitions=None):
+        """
+        costs and successes of a variation list in the layout of the
+        robustness results
+
+        Parameters
+        ----------
+        results : list
+            results of the jobs of every point, None for points that were
+            not simulated, see run_point_jobs
+        succ : list
+            success of every point, see run_point_jobs
+        repetitions : int, optional
+            number of jobs per point, None for one job per point
+            (Default value=None)
+
+        Returns
+        -------
+        list
+            free costs, nan for points that were not simulated
+        list
+            trajectory following costs, nan for points that were not
+            simulated
+        list
+            successes, the inferred successes for points that were not
+            simulated
+        """
+        C_free = []
+        C_tf = []
+        SUCC = []
+        for rs, s in zip(results, succ):
+            if rs is None:
+                rs = [(np.nan, np.nan, s)] * (1 if repetitions is None else repetitions)
+            if repetitions is None:
+                C_free.append(rs[0][0])
+                C_tf.append(rs[0][1])
+                SUCC.append(rs[0][2])
+            else:
+                C_free.append([r[0] for r in rs])
+                C_tf.append([r[1] for r in rs])
+                SUCC.append([r[2] for r in rs])
+        return C_free, C_tf, SUCC
+
     def check_modelpar_robustness(
         self,
         mpar_vars=["Ir", "m1r1", "I1", "b1", "cf1", "m2r2", "m2", "I2", "b2", "cf2"],
@@ -241,6 +1110,9 @@ class benchmarker:
             "b2": [],
             "cf2": [],
         },
+        backend=None,
+        batch_size=None,
+        adaptive=False,
     ):
         n_sims = 0
         for k in var_lists.keys():
@@ -249,182 +1121,41 @@ class benchmarker:
 
         res_dict = {}
         for mp in mpar_vars:
-            counter = 0
             nn_sims = len(var_lists[mp])
             print(
                 "  Computing robustness to model parameter",
                 mp,
                 f" ({nn_sims} simulations)",
             )
-            print(f"  {counter}/{nn_sims}", end="")
-            C_free = []
-            C_tf = []
-            SUCC = []
-            for var in var_lists[mp]:
-                if mp == "Ir":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=var,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "m1r1":
-                    m1 = self.mass[0]
-                    r1 = var / m1
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[m1, self.mass[1]],
-                        length=self.length,
-                        com=[r1, self.com[1]],
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "I1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=[var, self.inertia[1]],
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "b1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=[var, self.damping[1]],
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "cf1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=[var, self.cfric[1]],
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "m2r2":
-                    m2 = self.mass[1]
-                    r2 = var / m2
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[self.mass[0], m2],
-                        length=self.length,
-                        com=[self.com[0], r2],
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "m2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[self.mass[0], var],
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "I2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=[self.inertia[0], var],
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "b2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=[self.damping[0], var],
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                elif mp == "cf2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=[self.cfric[0], var],
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                counter += 1
-                print("\r", end="")
-                print(f"  {counter}/{nn_sims}", end="")
             res_dict[mp] = {}
             res_dict[mp]["values"] = var_lists[mp]
-            res_dict[mp]["free_costs"] = C_free
+            if adaptive:
+                results, succ = self.adaptive_boundary_search(
+                    var_lists[mp],
+                    lambda i: [
+                        {"model": self.get_modelpar_variation(mp, var_lists[mp][i])}
+                    ],
+                    progress_prefix="  ",
+                    backend=backend,
+                    batch_size=batch_size,
+                )
+                C_free, C_tf, SUCC = self.collect_point_results(results, succ)
+                res_dict[mp]["free_costs"] = C_free
+                if self.traj_following:
+                    res_dict[mp]["following_costs"] = C_tf
+                res_dict[mp]["successes"] = SUCC
+                res_dict[mp]["simulated"] = [r is not None for r in results]
+                continue
+            sweep = self.check_parameter_sweep(
+                {mp: var_lists[mp]},
+                backend=backend,
+                batch_size=batch_size,
+                progress_prefix="  ",
+            )
+            res_dict[mp]["free_costs"] = list(sweep["free_costs"])
             if self.traj_following:
-                res_dict[mp]["following_costs"] = C_tf
-            res_dict[mp]["successes"] = SUCC
-            print("")
+                res_dict[mp]["following_costs"] = list(sweep["following_costs"])
+            res_dict[mp]["successes"] = list(sweep["successes"])
         return res_dict
 
     def check_perturbation_robustness(self, time_stamps=[], tau_perts=[]):
@@ -438,6 +1169,7 @@ class benchmarker:
         meas_noise_cut=0.0,
         meas_noise_vfilters=["None"],
         meas_noise_vfilter_args={"lowpass_alpha": 0.3},
+        adaptive=False,
     ):
         # maybe add noise frequency
         # (on the real system noise frequency seems so be higher than
@@ -445,67 +1177,34 @@ class benchmarker:
         n_sims = repetitions * len(meas_noise_sigma_list) * len(meas_noise_vfilters)
         print(f"Computing noise robustness ({n_sims} simulations)")
 
+        def make_jobs(i):
+            na = meas_noise_sigma_list[i]
+            if meas_noise_mode == "posvel":
+                meas_noise_sigmas = [na, na, na, na]
+            elif meas_noise_mode == "vel":
+                meas_noise_sigmas = [0.0, 0.0, na, na]
+            return [
+                {"meas_noise_sigmas": meas_noise_sigmas, "repetition": rep}
+                for rep in range(repetitions)
+            ]
+
         res_dict = {}
         for nf in meas_noise_vfilters:
-            counter = 0
             nn_sims = repetitions * len(meas_noise_sigma_list)
             print("  Using Noise filter: ", nf, f"({nn_sims} simulations)")
-            print(f"  {counter}/{n_sims}", end="")
-            C_free = []
-            C_tf = []
-            SUCC = []
-            for na in meas_noise_sigma_list:
-                rep_C_free = []
-                rep_C_tf = []
-                rep_SUCC = []
-                for _ in range(repetitions):
-                    self.controller.set_filter_args(
-                        filt=nf,
-                        x0=self.goal,
-                        dt=self.dt,
-                        plant=self.plant,
-                        simulator=self.simulator,
-                        velocity_cut=meas_noise_cut,
-                        filter_kwargs=meas_noise_vfilter_args,
-                    )
-
-                    self.controller.reset()
-                    if self.friction_compensation:
-                        self.controller.set_friction_compensation(
-                            damping=self.damping, coulomb_fric=self.cfric
-                        )
-                    self.controller.init()
-                    if meas_noise_mode == "posvel":
-                        meas_noise_sigmas = [na, na, na, na]
-                    elif meas_noise_mode == "vel":
-                        meas_noise_sigmas = [0.0, 0.0, na, na]
-                    self.simulator.set_measurement_parameters(
-                        meas_noise_sigmas=meas_noise_sigmas
-                    )
-                    # self.simulator.set_filter_parameters(
-                    #         meas_noise_cut=meas_noise_cut,
-                    #         meas_noise_vfilter=nf,
-                    #         meas_noise_vfilter_args=meas_noise_vfilter_args)
-                    T, X, U = self.simulator.simulate(
-                        t0=0.0,
-                        tf=self.t_final,
-                        dt=self.dt,
-                        x0=self.x0,
-                        controller=self.controller,
-                        integrator=self.integrator,
-                    )
-                    self.simulator.reset()
-
-                    cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-                    rep_C_free.append(cost_free)
-                    rep_C_tf.append(cost_tf)
-                    rep_SUCC.append(succ)
-                    counter += 1
-                    print("\r", end="")
-                    print(f"  {counter}/{n_sims}", end="")
-                C_free.append(rep_C_free)
-                C_tf.append(rep_C_tf)
-                SUCC.append(rep_SUCC)
+            self.filter_args = {
+                "filt": nf,
+                "x0": self.goal,
+                "dt": self.dt,
+                "velocity_cut": meas_noise_cut,
+                "filter_kwargs": meas_noise_vfilter_args,
+            }
+            results, succ = self.run_point_jobs(
+                meas_noise_sigma_list, make_jobs, adaptive, progress_prefix="  "
+            )
+            C_free, C_tf, SUCC = self.collect_point_results(
+                results, succ, repetitions
+            )
             res_dict[nf] = {}
             res_dict[nf]["noise_sigma_list"] = meas_noise_sigma_list
             res_dict[nf]["free_costs"] = C_free
@@ -516,150 +1215,79 @@ class benchmarker:
             res_dict[nf]["noise_cut"] = meas_noise_cut
             # res_dict[nf]["noise_vfilter"] = nf
             # res_dict[nf]["noise_vfilter_args"] = meas_noise_vfilter_args
-            print("")
+            if adaptive:
+                res_dict[nf]["simulated"] = [r is not None for r in results]
         return res_dict
 
-    def check_unoise_robustness(self, repetitions=10, u_noise_sigma_list=[]):
+    def check_unoise_robustness(
+        self, repetitions=10, u_noise_sigma_list=[], adaptive=False
+    ):
         # maybe add noise frequency
         n_sims = repetitions * len(u_noise_sigma_list)
         print(f"Computing torque noise robustness ({n_sims} simulations)")
 
-        counter = 0
+        def make_jobs(i):
+            u_noise_sigmas = np.zeros(len(self.torque_limit))
+            for j in range(len(self.torque_limit)):
+                if self.torque_limit[j] != 0.0:
+                    u_noise_sigmas[j] = u_noise_sigma_list[i]
+            return [
+                {"u_noise_sigmas": u_noise_sigmas, "repetition": rep}
+                for rep in range(repetitions)
+            ]
+
+        results, succ = self.run_point_jobs(u_noise_sigma_list, make_jobs, adaptive)
+        C_free, C_tf, SUCC = self.collect_point_results(results, succ, repetitions)
+
         res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for uns in u_noise_sigma_list:
-            rep_C_free = []
-            rep_C_tf = []
-            rep_SUCC = []
-            for _ in range(repetitions):
-                self.controller.reset()
-                if self.friction_compensation:
-                    self.controller.set_friction_compensation(
-                        damping=self.damping, coulomb_fric=self.cfric
-                    )
-                self.controller.init()
-                u_noise_sigmas = np.zeros(len(self.torque_limit))
-                for i in range(len(self.torque_limit)):
-                    if self.torque_limit[i] != 0.0:
-                        u_noise_sigmas[i] = uns
-
-                self.simulator.set_motor_parameters(u_noise_sigmas=u_noise_sigmas)
-                T, X, U = self.simulator.simulate(
-                    t0=0.0,
-                    tf=self.t_final,
-                    dt=self.dt,
-                    x0=self.x0,
-                    controller=self.controller,
-                    integrator=self.integrator,
-                )
-                self.simulator.reset()
-
-                cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-                rep_C_free.append(cost_free)
-                rep_C_tf.append(cost_tf)
-                rep_SUCC.append(succ)
-                counter += 1
-                print("\r", end="")
-                print(f"{counter}/{n_sims}", end="")
-            C_free.append(rep_C_free)
-            C_tf.append(rep_C_tf)
-            SUCC.append(rep_SUCC)
         res_dict["u_noise_sigma_list"] = u_noise_sigma_list
         res_dict["free_costs"] = C_free
         if self.traj_following:
             res_dict["following_costs"] = C_tf
         res_dict["successes"] = SUCC
-        print("")
+        if adaptive:
+            res_dict["simulated"] = [r is not None for r in results]
         return res_dict
 
-    def check_uresponsiveness_robustness(self, u_responses=[]):
+    def check_uresponsiveness_robustness(self, u_responses=[], adaptive=False):
         n_sims = len(u_responses)
         print(f"Computing torque responsiveness robustness ({n_sims} simulations)")
 
-        counter = 0
-        res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for ur in u_responses:
-            self.controller.reset()
-            if self.friction_compensation:
-                self.controller.set_friction_compensation(
-                    damping=self.damping, coulomb_fric=self.cfric
-                )
-            self.controller.init()
-            self.simulator.set_motor_parameters(u_responsiveness=ur)
-            T, X, U = self.simulator.simulate(
-                t0=0.0,
-                tf=self.t_final,
-                dt=self.dt,
-                x0=self.x0,
-                controller=self.controller,
-                integrator=self.integrator,
-            )
-            self.simulator.reset()
+        results, succ = self.run_point_jobs(
+            u_responses, lambda i: [{"u_responsiveness": u_responses[i]}], adaptive
+        )
+        C_free, C_tf, SUCC = self.collect_point_results(results, succ)
 
-            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-            C_free.append(cost_free)
-            C_tf.append(cost_tf)
-            SUCC.append(succ)
-            counter += 1
-            print("\r", end="")
-            print(f"{counter}/{n_sims}", end="")
+        res_dict = {}
         res_dict["u_responsivenesses"] = u_responses
         res_dict["free_costs"] = C_free
         if self.traj_following:
             res_dict["following_costs"] = C_tf
         res_dict["successes"] = SUCC
-        print("")
+        if adaptive:
+            res_dict["simulated"] = [r is not None for r in results]
         return res_dict
 
-    def check_delay_robustness(self, delay_mode="posvel", delays=[]):
+    def check_delay_robustness(self, delay_mode="posvel", delays=[], adaptive=False):
         n_sims = len(delays)
         print(f"Computing delay robustness ({n_sims} simulations)")
 
-        counter = 0
-        res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for de in delays:
-            self.controller.reset()
-            if self.friction_compensation:
-                self.controller.set_friction_compensation(
-                    damping=self.damping, coulomb_fric=self.cfric
-                )
-            self.controller.init()
-            self.simulator.set_measurement_parameters(delay=de, delay_mode=delay_mode)
-            T, X, U = self.simulator.simulate(
-                t0=0.0,
-                tf=self.t_final,
-                dt=self.dt,
-                x0=self.x0,
-                controller=self.controller,
-                integrator=self.integrator,
-            )
-            self.simulator.reset()
+        results, succ = self.run_point_jobs(
+            delays,
+            lambda i: [{"delay": delays[i], "delay_mode": delay_mode}],
+            adaptive,
+        )
+        C_free, C_tf, SUCC = self.collect_point_results(results, succ)
 
-            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-            C_free.append(cost_free)
-            C_tf.append(cost_tf)
-            SUCC.append(succ)
-            counter += 1
-            print("\r", end="")
-            print(f"{counter}/{n_sims}", end="")
+        res_dict = {}
         res_dict["delay_mode"] = delay_mode
         res_dict["measurement_delay"] = delays
         res_dict["free_costs"] = C_free
         if self.traj_following:
             res_dict["following_costs"] = C_tf
         res_dict["successes"] = SUCC
-        print("")
+        if adaptive:
+            res_dict["simulated"] = [r is not None for r in results]
         return res_dict
 
     def benchmark(
@@ -692,7 +1320,47 @@ class benchmarker:
         u_responses=[1.0, 1.1, 1.2, 1.3, 1.4, 1.5],
         delay_mode="vel",
         delays=[0.01, 0.02, 0.05, 0.1],
+        seed=None,
+        num_workers=1,
+        modelpar_backend=None,
+        adaptive=False,
     ):
+        """
+        compute the robustness of the controller
+
+        The simulations can be distributed over a process pool with
+        num_workers > 1. Every worker process builds its own controller with
+        the controller_factory of the benchmarker (which has to be
+        picklable) and every simulation gets a seed derived from seed.
+        The results do not depend on num_workers.
+
+        Parameters
+        ----------
+        seed : int, optional
+            seed for the noise of the simulations, if None a random seed
+            is used
+            (Default value=None)
+        num_workers : int, optional
+            number of worker processes, 1 runs all simulations in this
+            process
+            (Default value=1)
+        modelpar_backend : string, optional
+            backend of the model parameter robustness simulations,
+            "serial", "process" or "batch", see run_jobs
+            (Default value=None)
+        adaptive : bool, optional
+            whether to only simulate the points of the variation lists
+            needed to find the success/failure boundaries, see
+            adaptive_boundary_search and set_adaptive_parameters.
+            The successes of the other points are inferred, their costs
+            are nan.
+            (Default value=False)
+
+        Returns
+        -------
+        dict
+            robustness results
+        """
         n_sims = 0
         for k in modelpar_var_lists.keys():
             n_sims += len(modelpar_var_lists[k])
@@ -704,10 +1372,65 @@ class benchmarker:
             f"\nWill in total compute {n_sims} simulations for testing the robustness of the controller\n"
         )
 
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.filter_args = None
+        if num_workers > 1:
+            self.open_pool(num_workers)
+        try:
+            res = self.compute_robustness(
+                compute_model_robustness,
+                compute_noise_robustness,
+                compute_unoise_robustness,
+                compute_uresponsiveness_robustness,
+                compute_delay_robustness,
+                mpar_vars,
+                modelpar_var_lists,
+                repetitions,
+                meas_noise_mode,
+                meas_noise_sigma_list,
+                meas_noise_cut,
+                meas_noise_vfilters,
+                meas_noise_vfilter_args,
+                u_noise_sigma_list,
+                u_responses,
+                delay_mode,
+                delays,
+                modelpar_backend,
+                adaptive,
+            )
+        finally:
+            self.close_pool()
+        return res
+
+    def compute_robustness(
+        self,
+        compute_model_robustness,
+        compute_noise_robustness,
+        compute_unoise_robustness,
+        compute_uresponsiveness_robustness,
+        compute_delay_robustness,
+        mpar_vars,
+        modelpar_var_lists,
+        repetitions,
+        meas_noise_mode,
+        meas_noise_sigma_list,
+        meas_noise_cut,
+        meas_noise_vfilters,
+        meas_noise_vfilter_args,
+        u_noise_sigma_list,
+        u_responses,
+        delay_mode,
+        delays,
+        modelpar_backend,
+        adaptive,
+    ):
         res = {}
         if compute_model_robustness:
             res_model = self.check_modelpar_robustness(
-                mpar_vars=mpar_vars, var_lists=modelpar_var_lists
+                mpar_vars=mpar_vars,
+                var_lists=modelpar_var_lists,
+                backend=modelpar_backend,
+                adaptive=adaptive,
             )
             res["model_robustness"] = res_model
         if compute_noise_robustness:
@@ -718,19 +1441,35 @@ class benchmarker:
                 meas_noise_cut=meas_noise_cut,
                 meas_noise_vfilters=meas_noise_vfilters,
                 meas_noise_vfilter_args=meas_noise_vfilter_args,
+                adaptive=adaptive,
             )
             res["meas_noise_robustness"] = res_noise
         if compute_unoise_robustness:
             res_unoise = self.check_unoise_robustness(
-                u_noise_sigma_list=u_noise_sigma_list
+                u_noise_sigma_list=u_noise_sigma_list, adaptive=adaptive
             )
             res["u_noise_robustness"] = res_unoise
         if compute_uresponsiveness_robustness:
-            res_uresp = self.check_uresponsiveness_robustness(u_responses=u_responses)
+            res_uresp = self.check_uresponsiveness_robustness(
+                u_responses=u_responses, adaptive=adaptive
+            )
             res["u_responsiveness_robustness"] = res_uresp
         if compute_delay_robustness:
             res_delay = self.check_delay_robustness(
-                delay_mode=delay_mode, delays=delays
+                delay_mode=delay_mode, delays=delays, adaptive=adaptive
             )
             res["delay_robustness"] = res_delay
         return res
+
+
+# benchmarker of a worker process, created by _init_worker
+_worker_benchmarker = None
+
+
+def _init_worker(settings, controller_factory):
+    global _worker_benchmarker
+    _worker_benchmarker = benchmarker.from_settings(settings, controller_factory())
+
+
+def _run_worker_job(job):
+    return _worker_benchmarker.simulate_job(job)
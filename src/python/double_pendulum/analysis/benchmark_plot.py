@@ -42,7 +42,7 @@ def plot_benchmark_results(
     # ToDo: solve better
     if "meas_noise_robustness" in res_dict.keys():
         if "free_costs" in res_dict["meas_noise_robustness"]["None"].keys():
-            y1 = np.median(
+            y1 = np.nanmedian(
                 res_dict["meas_noise_robustness"]["None"]["free_costs"], axis=1
             )
             norm_cost_free = y1[0]
@@ -77,7 +77,7 @@ def plot_benchmark_results(
                     / norm_cost_free
                 )
                 ax_mr[j][k].plot(x, y1, "o")
-                ymax = np.max([ymax, np.max(y1)])
+                ymax = np.nanmax([ymax, np.nanmax(y1)])
             # if "following_costs" in res_dict["model_robustness"][mp].keys():
             #     y2 = np.asarray(res_dict["model_robustness"][mp]["following_costs"]) / norm_cost_follow
             #     ax_mr[j][k].plot(x, y2, "o-")
@@ -154,13 +154,13 @@ def plot_benchmark_results(
             x = res_dict["meas_noise_robustness"][nf]["noise_sigma_list"]
             if "free_costs" in res_dict["meas_noise_robustness"][nf].keys():
                 y1 = (
-                    np.median(
+                    np.nanmedian(
                         res_dict["meas_noise_robustness"][nf]["free_costs"], axis=1
                     )
                     / norm_cost_free
                 )
                 ax_nr[i][0].plot(x, y1, "o-")
-                ymax = np.max([ymax, np.max(y1)])
+                ymax = np.nanmax([ymax, np.nanmax(y1)])
             # if "following_costs" in res_dict["meas_noise_robustness"][nf].keys():
             #     y2 = np.median(res_dict["meas_noise_robustness"][nf]["following_costs"], axis=1) / norm_cost_follow
             #     ax_nr[i].plot(x, y2, "o-")
@@ -213,11 +213,11 @@ def plot_benchmark_results(
         x = res_dict["u_noise_robustness"]["u_noise_sigma_list"]
         if "free_costs" in res_dict["u_noise_robustness"].keys():
             y1 = (
-                np.median(res_dict["u_noise_robustness"]["free_costs"], axis=1)
+                np.nanmedian(res_dict["u_noise_robustness"]["free_costs"], axis=1)
                 / norm_cost_free
             )
             ax_unr.plot(x, y1, "o-")
-            ymax = np.max([ymax, np.max(y1)])
+            ymax = np.nanmax([ymax, np.nanmax(y1)])
         # if "following_costs" in res_dict["u_noise_robustness"].keys():
         #     y2 = np.median(res_dict["u_noise_robustness"]["following_costs"], axis=1) / norm_cost_follow
         #     ax_unr.plot(x, y2, "o-")
@@ -272,7 +272,7 @@ def plot_benchmark_results(
                 / norm_cost_free
             )
             ax_urr.plot(x, y1, "o-")
-            ymax = np.max([ymax, np.max(y1)])
+            ymax = np.nanmax([ymax, np.nanmax(y1)])
         # if "following_costs" in res_dict["u_responsiveness_robustness"].keys():
         #     y2 = np.asarray(res_dict["u_responsiveness_robustness"]["following_costs"]) / norm_cost_follow
         #     ax_urr.plot(x, y2, "o-")
@@ -323,7 +323,7 @@ def plot_benchmark_results(
         if "free_costs" in res_dict["delay_robustness"].keys():
             y1 = np.asarray(res_dict["delay_robustness"]["free_costs"]) / norm_cost_free
             ax_dr.plot(x, y1, "o-")
-            ymax = np.max([ymax, np.max(y1)])
+            ymax = np.nanmax([ymax, np.nanmax(y1)])
         # if "following_costs" in res_dict["delay_robustness"].keys():
         #     y2 = np.asarray(res_dict["delay_robustness"]["following_costs"]) / norm_cost_follow
         #     ax_dr.plot(x, y2, "o-")
@@ -426,7 +426,7 @@ def plot_model_robustness_multi(
         # ToDo: solve better
         if "meas_noise_robustness" in res_dict.keys():
             if "free_costs" in res_dict["meas_noise_robustness"]["None"].keys():
-                y1 = np.median(
+                y1 = np.nanmedian(
                     res_dict["meas_noise_robustness"]["None"]["free_costs"], axis=1
                 )
                 norm_cost_free = y1[0]
@@ -1,8 +1,14 @@
 import os
+import pickle
+import inspect
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
 from double_pendulum.utils.csv_trajectory import load_trajectory_full
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.analysis.result_cache import hash_content
 
 
 def leaderboard_scores(
@@ -27,6 +33,8 @@ def leaderboard_scores(
     },
     link_base="",
     simulation=True,
+    num_workers=1,
+    cache_file=None,
 ):
     """leaderboard_scores.
     Compute leaderboard scores from data_dictionaries which will be loaded from
@@ -71,10 +79,33 @@ def leaderboard_scores(
         whether to load the simulaition trajectory data
     link_base : string
         base-link for hosting data. Not needed for local execution
+    num_workers : int
+        number of worker processes for scoring the trajectories
+        default=1
+    cache_file : string
+        path of the score cache (see get_path_scores). The cache file is
+        unpickled, only use a file created by yourself.
+        None disables the cache
+        default=None
     """
-
     leaderboard_data = []
 
+    all_paths = []
+    for key in data_paths:
+        d = data_paths[key]
+        if type(d["csv_path"]) == str:
+            all_paths += [d["csv_path"]]
+        else:
+            all_paths += list(d["csv_path"])
+    path_scores = get_path_scores(
+        sorted(set(all_paths)),
+        mpar,
+        weights,
+        normalize,
+        num_workers=num_workers,
+        cache_file=cache_file,
+    )
+
     for key in data_paths:
         d = data_paths[key]
         if type(d["csv_path"]) == str:
@@ -93,44 +124,16 @@ def leaderboard_scores(
         scores = []
 
         for path in sorted(csv_paths):
-            data_dict = load_trajectory_full(path)
-            T = data_dict["T"]
-            X = data_dict["X_meas"]
-            U = data_dict["U_con"]
-
-            swingup_times.append(
-                get_swingup_time(
-                    T=T, X=X, has_to_stay=True, mpar=mpar, method="height", height=0.9
-                )
-            )
-            max_taus.append(get_max_tau(U))
-            energies.append(get_energy(X, U))
-            integ_taus.append(get_integrated_torque(T, U))
-            tau_costs.append(get_torque_cost(T, U))
-            tau_smoothnesses.append(get_tau_smoothness(U))
-            velocity_costs.append(get_velocity_cost(T, X))
-
-            successes.append(int(swingup_times[-1] < T[-1]))
-
-            score = successes[-1] * (
-                1.0
-                - (
-                    weights["swingup_time"]
-                    * swingup_times[-1]
-                    / normalize["swingup_time"]
-                    + weights["max_tau"] * max_taus[-1] / normalize["max_tau"]
-                    + weights["energy"] * energies[-1] / normalize["energy"]
-                    + weights["integ_tau"] * integ_taus[-1] / normalize["integ_tau"]
-                    + weights["tau_cost"] * tau_costs[-1] / normalize["tau_cost"]
-                    + weights["tau_smoothness"]
-                    * tau_smoothnesses[-1]
-                    / normalize["tau_smoothness"]
-                    + weights["velocity_cost"]
-                    * velocity_costs[-1]
-                    / normalize["velocity_cost"]
-                )
-            )
-
+            ps = path_scores[path]
+            swingup_times.append(ps["swingup_time"])
+            max_taus.append(ps["max_tau"])
+            energies.append(ps["energy"])
+            integ_taus.append(ps["integ_tau"])
+            tau_costs.append(ps["tau_cost"])
+            tau_smoothnesses.append(ps["tau_smoothness"])
+            velocity_costs.append(ps["velocity_cost"])
+            successes.append(ps["success"])
+            score = ps["score"]
             scores.append(score)
 
             results = np.array(
@@ -266,6 +269,142 @@ def leaderboard_scores(
     )
 
 
+def get_trajectory_scores(path, mpar, weights, normalize):
+    """get_trajectory_scores.
+    Compute the leaderboard criteria and the score of one trajectory csv
+    file.
+
+    Parameters
+    ----------
+    path : string
+        path to the trajectory csv file
+    mpar : model_parameters object
+        model parameters for the forward kinematics
+    weights : dict
+        weights of the criteria, see leaderboard_scores
+    normalize : dict
+        normalization constants of the criteria, see leaderboard_scores
+
+    Returns
+    -------
+    dict
+        criteria and score with the keys "success", "swingup_time",
+        "max_tau", "energy", "integ_tau", "tau_cost", "tau_smoothness",
+        "velocity_cost", "score"
+    """
+    data_dict = load_trajectory_full(path)
+    T = data_dict["T"]
+    X = data_dict["X_meas"]
+    U = data_dict["U_con"]
+
+    res = {}
+    res["swingup_time"] = get_swingup_time(
+        T=T, X=X, has_to_stay=True, mpar=mpar, method="height", height=0.9
+    )
+    res["max_tau"] = get_max_tau(U)
+    res["energy"] = get_energy(X, U)
+    res["integ_tau"] = get_integrated_torque(T, U)
+    res["tau_cost"] = get_torque_cost(T, U)
+    res["tau_smoothness"] = get_tau_smoothness(U)
+    res["velocity_cost"] = get_velocity_cost(T, X)
+    res["success"] = int(res["swingup_time"] < T[-1])
+
+    res["score"] = res["success"] * (
+        1.0
+        - (
+            weights["swingup_time"] * res["swingup_time"] / normalize["swingup_time"]
+            + weights["max_tau"] * res["max_tau"] / normalize["max_tau"]
+            + weights["energy"] * res["energy"] / normalize["energy"]
+            + weights["integ_tau"] * res["integ_tau"] / normalize["integ_tau"]
+            + weights["tau_cost"] * res["tau_cost"] / normalize["tau_cost"]
+            + weights["tau_smoothness"]
+            * res["tau_smoothness"]
+            / normalize["tau_smoothness"]
+            + weights["velocity_cost"]
+            * res["velocity_cost"]
+            / normalize["velocity_cost"]
+        )
+    )
+    return res
+
+
+def get_path_scores(paths, mpar, weights, normalize, num_workers=1, cache_file=None):
+    """get_path_scores.
+    Compute the scores (see get_trajectory_scores) of several trajectory
+    csv files, optionally in a process pool.
+    The scores are cached per file, keyed by the file content, the model
+    parameters, the weights, the normalization and the source code of this
+    module and of the plant module (forward kinematics). Only new or
+    changed files are scored. The cache only keeps the entries of the
+    current call.
+    The cache file is unpickled, only use a file created by yourself.
+
+    Parameters
+    ----------
+    paths : list of strings
+        paths to the trajectory csv files
+    mpar : model_parameters object
+        model parameters for the forward kinematics
+    weights : dict
+        weights of the criteria, see leaderboard_scores
+    normalize : dict
+        normalization constants of the criteria, see leaderboard_scores
+    num_workers : int
+        number of worker processes
+        default=1
+    cache_file : string
+        path of the score cache file, None: no cache
+        default=None
+
+    Returns
+    -------
+    dict
+        scores of every path
+    """
+    src = []
+    for src_file in [__file__, inspect.getsourcefile(DoublePendulumPlant)]:
+        with open(src_file, "rb") as f:
+            src.append(f.read())
+    settings = hash_content(src, mpar.get_dict(), weights, normalize)
+
+    cache = {}
+    if cache_file is not None and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                cache = pickle.load(f)
+        except Exception:
+            cache = {}
+
+    keys = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            keys[path] = hash_content(settings, f.read())
+    todo = [path for path in paths if keys[path] not in cache]
+
+    score_fun = functools.partial(
+        get_trajectory_scores, mpar=mpar, weights=weights, normalize=normalize
+    )
+    if num_workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = list(executor.map(score_fun, todo))
+    else:
+        results = list(map(score_fun, todo))
+
+    for path, res in zip(todo, results):
+        cache[keys[path]] = res
+
+    path_scores = {path: cache[keys[path]] for path in paths}
+
+    if cache_file is not None:
+        cache = {keys[path]: path_scores[path] for path in paths}
+        try:
+            with open(cache_file, "wb") as f:
+                pickle.dump(cache, f)
+        except OSError:
+            pass
+    return path_scores
+
+
 def get_swingup_time(
     T,
     X,
@@ -341,9 +480,8 @@ def get_swingup_time(
                 time_index = n[0]
         time = T[time_index]
     elif method == "height":
-        plant = SymbolicDoublePendulum(model_pars=mpar)
-        fk = plant.forward_kinematics(X.T[:2])
-        ee_pos_y = fk[1][1]
+        plant = DoublePendulumPlant(model_pars=mpar)
+        ee_pos_y = plant.forward_kinematics_batch(X)[:, 1, 1]
 
         goal_height = height * (mpar.l[0] + mpar.l[1])
 
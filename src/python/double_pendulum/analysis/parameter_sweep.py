@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+from scipy.stats import qmc
+
+
+def sample_parameters(spec, method="grid", n_samples=None, seed=None):
+    """
+    sample points of a multi-dimensional parameter sweep
+
+    Parameters
+    ----------
+    spec : dict
+        parameter names mapped to value lists.
+        For method="grid" all combinations of the values are sampled,
+        for "lhs" and "sobol" the values only define the range
+        [min(values), max(values)] of the parameter.
+    method : string, optional
+        sampling strategy
+        "grid" : full factorial grid
+        "lhs" : Latin hypercube sampling
+        "sobol" : scrambled Sobol sequence
+        (Default value="grid")
+    n_samples : int, optional
+        number of samples for "lhs" and "sobol",
+        not used for "grid"
+        (Default value=None)
+    seed : int, optional
+        seed for "lhs" and "sobol"
+        (Default value=None)
+
+    Returns
+    -------
+    list
+        parameter names, len=d
+    numpy_array
+        shape=(N, d)
+        parameter values of the N sweep points
+    """
+    names = list(spec.keys())
+    value_lists = [np.asarray(spec[n], dtype=float) for n in names]
+
+    if method == "grid":
+        values = np.array(list(itertools.product(*value_lists)), dtype=float)
+        return names, values.reshape(-1, len(names))
+
+    if n_samples is None:
+        raise ValueError(f"The sampling method {method} requires n_samples.")
+
+    if method == "lhs":
+        sampler = qmc.LatinHypercube(d=len(names), seed=seed)
+    elif method == "sobol":
+        sampler = qmc.Sobol(d=len(names), scramble=True, seed=seed)
+    else:
+        raise NotImplementedError(
+            f"Sorry, the sampling method {method} is not implemented."
+        )
+    lower = [np.min(v) for v in value_lists]
+    upper = [np.max(v) for v in value_lists]
+    unit_samples = sampler.random(n_samples)
+    values = lower + unit_samples * (np.asarray(upper) - np.asarray(lower))
+    return names, values
@@ -0,0 +1,290 @@
+import os
+import sys
+import glob
+import pickle
+import hashlib
+import contextlib
+import importlib.metadata
+
+import numpy as np
+
+
+# increase when the layout of the cache entries changes
+CACHE_FORMAT = 1
+
+# default maximum size of the on-disk cache, units=[byte]
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+_cache_version = None
+
+# file sets of the active track_read_files contexts
+_read_file_trackers = []
+_audit_hook_installed = False
+
+
+def get_cache_dir():
+    """
+    default directory of the on-disk benchmark result cache.
+    Defaults to ~/.cache/double_pendulum/benchmark_results and can be set
+    with the environment variable DOUBLE_PENDULUM_RESULT_CACHE_DIR.
+
+    Returns
+    -------
+    string
+        path to the cache directory
+    """
+    default = os.path.join(
+        os.path.expanduser("~"), ".cache", "double_pendulum", "benchmark_results"
+    )
+    return os.environ.get("DOUBLE_PENDULUM_RESULT_CACHE_DIR", default)
+
+
+def get_cache_version():
+    """
+    version string of the cache. Entries written with a different version
+    are ignored and removed. The version contains the package version
+    and a hash of the source code of the whole double_pendulum package.
+
+    Returns
+    -------
+    string
+        cache version
+    """
+    global _cache_version
+    if _cache_version is not None:
+        return _cache_version
+
+    try:
+        pkg_version = importlib.metadata.version("DoublePendulum")
+    except importlib.metadata.PackageNotFoundError:
+        pkg_version = "unknown"
+
+    import double_pendulum
+
+    pkg_dir = os.path.dirname(os.path.abspath(double_pendulum.__file__))
+    src_files = []
+    for root, dirs, files in os.walk(pkg_dir):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        src_files += [os.path.join(root, f) for f in files if f.endswith(".py")]
+
+    h = hashlib.sha256()
+    for path in sorted(src_files):
+        h.update(os.path.relpath(path, pkg_dir).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+
+    _cache_version = f"{CACHE_FORMAT}-{pkg_version}-{h.hexdigest()[:16]}"
+    return _cache_version
+
+
+def _audit_open(event, args):
+    # audit hook, records the files opened for reading
+    if event != "open" or not _read_file_trackers:
+        return
+    path, _, flags = args
+    if not isinstance(path, (str, bytes, os.PathLike)):
+        return
+    if flags & (os.O_WRONLY | os.O_RDWR):
+        return
+    path = os.path.abspath(os.fsdecode(path))
+    for root, files in _read_file_trackers:
+        if path.startswith(root + os.sep):
+            files.add(path)
+
+
+@contextlib.contextmanager
+def track_read_files(root="."):
+    """
+    context manager recording the files below root which are opened for
+    reading inside the context, e.g. the trajectories and policies loaded
+    by a controller script. Python source files are not recorded.
+
+    Parameters
+    ----------
+    root : string, optional
+        only files below this directory are recorded
+        (Default value=".")
+
+    Yields
+    ------
+    set
+        absolute paths of the read files, filled while the context is active
+    """
+    global _audit_hook_installed
+    if not _audit_hook_installed:
+        # audit hooks cannot be removed, install it only once
+        sys.addaudithook(_audit_open)
+        _audit_hook_installed = True
+    files = set()
+    tracker = (os.path.abspath(root), files)
+    _read_file_trackers.append(tracker)
+    try:
+        yield files
+    finally:
+        _read_file_trackers.remove(tracker)
+        for path in list(files):
+            if path.endswith((".py", ".pyc")) or not os.path.isfile(path):
+                files.discard(path)
+
+
+def _hash_update(h, obj):
+    # feed a canonical representation of obj into the hash h
+    if isinstance(obj, dict):
+        h.update(b"d")
+        for k in sorted(obj.keys(), key=str):
+            _hash_update(h, k)
+            _hash_update(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"l{len(obj)}".encode())
+        for o in obj:
+            _hash_update(h, o)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"a{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    elif isinstance(obj, (bytes, bytearray)):
+        h.update(b"b")
+        h.update(obj)
+    elif isinstance(obj, np.generic):
+        _hash_update(h, obj.item())
+    elif isinstance(obj, float):
+        h.update(f"f{obj!r}".encode())
+    elif obj is None or isinstance(obj, (str, int, complex)):
+        h.update(f"{type(obj).__name__}{obj!r}".encode())
+    else:
+        # the repr of other objects may contain memory addresses
+        raise TypeError(
+            f"Objects of type {type(obj).__name__} cannot be hashed by content."
+        )
+
+
+def hash_content(*objs):
+    """
+    content hash of (nested) dicts, lists, tuples, numpy arrays, bytes,
+    strings, numbers and None.
+    Equal content gives the same hash, independent of the dict order and
+    of whether numbers are python or numpy scalars.
+    Other objects raise a TypeError.
+
+    Parameters
+    ----------
+    *objs
+        objects to hash
+
+    Returns
+    -------
+    string
+        hex digest
+    """
+    h = hashlib.sha256()
+    _hash_update(h, objs)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    ResultCache class
+    on-disk store of simulation results addressed by a content hash.
+    Every entry is a small file, the least recently used entries are evicted
+    when the cache exceeds max_size.
+
+    Parameters
+    ----------
+    cache_dir : string, optional
+        directory of the cache, if None get_cache_dir() is used
+        (Default value=None)
+    max_size : int, optional
+        maximum size of the on-disk cache, units=[byte]
+        (Default value=100*1024*1024)
+    """
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_MAX_SIZE):
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.prefix = hashlib.sha256(get_cache_version().encode()).hexdigest()[:16]
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{self.prefix}-{key}.pkl")
+
+    def get(self, key):
+        """
+        load a result
+
+        Parameters
+        ----------
+        key : string
+            cache key
+
+        Returns
+        -------
+        object or None
+            the stored result, None if not cached
+        """
+        path = self.entry_path(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            # mark as recently used for the eviction
+            os.utime(path)
+        except Exception:
+            return None
+        return result
+
+    def put(self, key, result):
+        """
+        store a result. The cache is not pruned, call prune after storing
+        a batch of results.
+
+        Parameters
+        ----------
+        key : string
+            cache key
+        result : object
+            picklable result
+        """
+        path = self.entry_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(result, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # the cache is optional, e.g. for read only file systems
+            pass
+
+    def prune(self):
+        """
+        remove outdated entries and evict the least recently used entries
+        until the on-disk cache is smaller than max_size
+        """
+        files = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl")):
+            try:
+                if not os.path.basename(path).startswith(self.prefix):
+                    os.remove(path)
+                else:
+                    files.append((os.path.getmtime(path), os.path.getsize(path), path))
+            except OSError:
+                pass
+
+        size = sum(f[1] for f in files)
+        for _, fsize, path in sorted(files):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= fsize
+
+    def clear(self):
+        """
+        remove all entries from the cache
+        """
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl")):
+            os.remove(path)
@@ -6,10 +6,13 @@ from abc import ABC, abstractmethod
 import numpy as np
 
 from double_pendulum.model.friction_matrix import yb_friction_matrix
+from double_pendulum.simulation.data_recorder import ArrayRecorder, RingRecorder
 from double_pendulum.utils.filters.identity import identity_filter
 from double_pendulum.utils.filters.low_pass import lowpass_filter_rt, butter_filter_rt
+from double_pendulum.utils.filters.iir_filter import iir_filter_rt
 from double_pendulum.utils.filters.kalman_filter import kalman_filter_rt
 from double_pendulum.utils.filters.unscented_kalman_filter import unscented_kalman_filter_rt
+from double_pendulum.utils.filters.extended_kalman_filter import extended_kalman_filter_rt
 
 
 class AbstractController(ABC):
@@ -22,11 +25,7 @@ class AbstractController(ABC):
         self.set_filter_args()
         self.set_friction_compensation()
         self.set_gravity_compensation()
-        self.x_hist = []
-        self.x_filt_hist = []
-        self.u_hist = [[0.0, 0.0]]
-        self.u_fric_hist = []
-        self.u_grav_hist = []
+        self.set_history_recording()
 
     @abstractmethod
     def get_control_output_(self, x, t=None):
@@ -85,23 +84,123 @@ class AbstractController(ABC):
             order=[u1, u2],
             units=[Nm]
         """
-        self.x_hist.append(x)
-        y = self.filter_measurement(x, self.u_hist[-1])
-        self.x_filt_hist.append(y)
+        y = self.filter_measurement(x, self.last_u)
 
         u = np.asarray(self.get_control_output_(y, t))
 
         u_fric = self.get_friction_torque(y)
-        self.u_fric_hist.append(u_fric)
         u += u_fric
 
         u_grav = self.get_gravity_torque(y)
-        self.u_grav_hist.append(u_grav)
         u += u_grav
 
-        self.u_hist.append(u)
+        if self.recorders is not None:
+            self.recorders["x"].append(x)
+            self.recorders["x_filt"].append(y)
+            self.recorders["u"].append(u)
+            self.recorders["u_fric"].append(u_fric)
+            self.recorders["u_grav"].append(u_grav)
+
+        self.last_u = u
         return u
 
+    def set_history_recording(self, mode="full", length=1000):
+        """
+        Set what the controller records in get_control_output.
+        The recordings are accessible as x_hist, x_filt_hist, u_hist,
+        u_fric_hist and u_grav_hist. u_hist has one row more than x_hist,
+        u_hist[0] is the torque applied before the first recorded state
+        (the initial zero torque unless a ring buffer has wrapped around)
+        and u_hist[1:] are the torques computed from x_hist.
+
+        Parameters
+        ----------
+        mode : string
+            "off": no recording
+            "ring": record the last length ticks
+            "full": record all ticks in preallocated arrays, which grow
+                    geometrically if a run is longer than length
+            (Default value="full")
+        length : int
+            number of ticks of the ring buffer or preallocated capacity
+            (Default value=1000)
+        """
+        if mode not in ["off", "ring", "full"]:
+            raise NotImplementedError(
+                f"Sorry, the recording mode {mode} is not implemented.")
+        self.history_mode = mode
+        self.history_length = length
+        self.init_history()
+
+    def init_history(self):
+        """
+        Clear the recorded history.
+        """
+        self.last_u = np.zeros(2)
+        if self.history_mode == "off":
+            self.recorders = None
+            return
+        shapes = {"x": (4,), "x_filt": (4,), "u": (2,), "u_fric": (2,), "u_grav": (2,)}
+        if self.history_mode == "ring":
+            self.recorders = {
+                k: RingRecorder(shape, self.history_length) for k, shape in shapes.items()
+            }
+            # keeps the torque before the oldest recorded state for u_hist
+            self.recorders["u"] = RingRecorder((2,), self.history_length + 1)
+        else:
+            self.recorders = {
+                k: ArrayRecorder(shape, self.history_length) for k, shape in shapes.items()
+            }
+
+    def get_history(self, name):
+        """
+        Get a recorded signal.
+
+        Parameters
+        ----------
+        name : string
+            "x", "x_filt", "u", "u_fric" or "u_grav"
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 4) for states, shape=(N, 2) for torques
+            recorded values (N=0 if the recording is off)
+        """
+        if self.recorders is None:
+            dim = 4 if name in ["x", "x_filt"] else 2
+            return np.zeros((0, dim))
+        data = self.recorders[name].view()
+        if name == "u":
+            data = data[len(data) - len(self.recorders["x"]) :]
+        return data
+
+    @property
+    def x_hist(self):
+        return self.get_history("x")
+
+    @property
+    def x_filt_hist(self):
+        return self.get_history("x_filt")
+
+    @property
+    def u_hist(self):
+        # starts with the torque used for the first filter step
+        if self.recorders is None:
+            return np.zeros((1, 2))
+        u = self.recorders["u"].view()
+        if len(u) > len(self.recorders["x"]):
+            return u
+        return np.concatenate([np.zeros((1, 2)), u])
+
+    @property
+    def u_fric_hist(self):
+        return self.get_history("u_fric")
+
+    @property
+    def u_grav_hist(self):
+        return self.get_history("u_grav")
+
     def set_parameters(self):
         """
         Set controller parameters. Optional.
@@ -126,11 +225,7 @@ class AbstractController(ABC):
         initialized the filter and internal logs.
         """
         self.init_filter()
-        self.x_hist = []
-        self.u_hist = [[0.0, 0.0]]
-        self.u_fric_hist = []
-        self.u_grav_hist = []
-        self.xfilt_hist = []
+        self.init_history()
 
         self.init_()
 
@@ -158,7 +253,8 @@ class AbstractController(ABC):
 
     def save(self, save_dir):
         """
-        Save controller parameters
+        Save controller parameters and the recorded history
+        (controller_history.npz)
 
         Parameters
         ----------
@@ -183,10 +279,18 @@ class AbstractController(ABC):
             "damping1": float(self.friction_terms[1]),
             "damping2": float(self.friction_terms[3]),
             "gravity_compensation_g": g,
+            "history_mode": self.history_mode,
+            "history_length": self.history_length,
         }
         with open(os.path.join(save_dir, "controller_abstract_parameters.yml"), "w") as f:
             yaml.dump(par_dict, f)
 
+        if self.recorders is not None:
+            np.savez(
+                os.path.join(save_dir, "controller_history.npz"),
+                **{k: self.get_history(k) for k in self.recorders},
+            )
+
     def save_(self, save_dir):
         """
         Save controller parameters. Optional
@@ -278,8 +382,15 @@ class AbstractController(ABC):
             string determining the velocity noise filter
             "None": No filter
             "lowpass": lowpass filter
-            "kalman": kalman filter
+            "butter": first order butterworth filter of the differentiated
+                      positions
+            "iir": butterworth filter bank (filter_kwargs "iir_order" and
+                   "iir_cutoff", see iir_filter_rt)
+            "kalman": kalman filter (filter_kwargs "kalman_steady_state"
+                      for a constant steady state gain, see kalman_filter_rt)
             "unscented_kalman": unscented kalman filter
+            "ekf": extended kalman filter (filter_kwargs "ekf_integrator",
+                   "ekf_process_noise_sigmas", "ekf_meas_noise_sigmas")
             (Default value = None)
         x0 : array_like, shape=(4,), dtype=float,
             reference state if a linearization is needed (Kalman filter),
@@ -294,7 +405,8 @@ class AbstractController(ABC):
             double pendulum
             (Default value=None)
         simulator : Simulator object
-            simulator object necessary for the unscented Kalman filter
+            simulator object necessary for the unscented Kalman filter,
+            optional for the extended Kalman filter
             (Default value=None)
         velocity_cut : float
             measurements smaller than this value will be set to 0.
@@ -329,6 +441,16 @@ class AbstractController(ABC):
 
             self.filter = lowpass_filter_rt(dim_x=2 * dof, alpha=self.filt_kwargs["lowpass_alpha"], x0=self.filt_x0)
 
+        elif self.filt == "iir":
+            dof = 2
+
+            self.filter = iir_filter_rt(
+                dim_x=2 * dof,
+                order=self.filt_kwargs.get("iir_order", 2),
+                cutoff=self.filt_kwargs["iir_cutoff"],
+                x0=self.filt_x0,
+            )
+
         elif self.filt == "kalman":
             dof = self.filt_plant.dof
 
@@ -343,6 +465,7 @@ class AbstractController(ABC):
                 dt=self.filt_dt,
                 process_noise=self.filt_kwargs["kalman_process_noise_sigmas"],
                 measurement_noise=self.filt_kwargs["kalman_meas_noise_sigmas"],
+                steady_state=self.filt_kwargs.get("kalman_steady_state", False),
             )
         elif self.filt == "unscented_kalman":
             dof = self.filt_plant.dof
@@ -358,6 +481,25 @@ class AbstractController(ABC):
                 measurement_noise=self.filt_kwargs["ukalman_meas_noise_sigmas"],
                 fx=fx,
             )
+        elif self.filt == "ekf":
+            dof = self.filt_plant.dof
+            integrator = self.filt_kwargs.get("ekf_integrator", "runge_kutta")
+            fx = None
+            if self.filt_simulator is not None:
+                if integrator == "euler":
+                    fx = self.filt_simulator.euler_integrator
+                elif integrator == "runge_kutta":
+                    fx = self.filt_simulator.runge_integrator
+            self.filter = extended_kalman_filter_rt(
+                plant=self.filt_plant,
+                dim_x=2 * dof,
+                x0=self.filt_x0,
+                dt=self.filt_dt,
+                process_noise=self.filt_kwargs["ekf_process_noise_sigmas"],
+                measurement_noise=self.filt_kwargs["ekf_meas_noise_sigmas"],
+                fx=fx,
+                integrator=integrator,
+            )
         else:
             self.filter = identity_filter()
 
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 
 from double_pendulum.controller.abstract_controller import AbstractController
+from double_pendulum.controller.pid.pid_state import PIDErrorState
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 
 
@@ -125,8 +126,7 @@ class ComputedTorqueController(AbstractController):
         self.Kd = 0.1
 
         # init pars
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
         self.counter = 0
 
     def set_parameters(self, Kp, Ki, Kd):
@@ -150,8 +150,7 @@ class ComputedTorqueController(AbstractController):
         """
         Initialize controller.
         """
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
         self.counter = 0
 
     def get_control_output_(self, x, t=None):
@@ -185,21 +184,17 @@ class ComputedTorqueController(AbstractController):
         e2 = p[1] - x[1]
         e1 = (e1 + np.pi) % (2*np.pi) - np.pi
         e2 = (e2 + np.pi) % (2*np.pi) - np.pi
-        self.errors1.append(e1)
-        self.errors2.append(e2)
+        integral, derivative = self.pid_state.update([e1, e2])
+        integral = self.pid_state.limit_integral(self.Ki, self.torque_limit)
 
         P1 = self.Kp*e1
         P2 = self.Kp*e2
 
-        I1 = self.Ki*np.sum(np.asarray(self.errors1))*self.dt
-        I2 = self.Ki*np.sum(np.asarray(self.errors2))*self.dt
+        I1 = self.Ki*integral[0]
+        I2 = self.Ki*integral[1]
 
-        if len(self.errors1) > 2:
-            D1 = self.Kd*(self.errors1[-1]-self.errors1[-2]) / self.dt
-            D2 = self.Kd*(self.errors2[-1]-self.errors2[-2]) / self.dt
-        else:
-            D1 = 0.0
-            D2 = 0.0
+        D1 = self.Kd*derivative[0]
+        D2 = self.Kd*derivative[1]
 
         u1 = P1 + I1 + D1
         u2 = P2 + I2 + D2
@@ -40,7 +40,8 @@ def dlqr(A, B, Q, R):
     return K, X, eigVals
 
 
-def iterative_riccati(plant, Q, R, Qf, dt, x_traj, u_traj):
+def iterative_riccati(plant, Q, R, Qf, dt, x_traj, u_traj,
+                      discretization="euler"):
     """iteratively solve the dynamic ricatti equation.
     intended for finite horizon lqr/tvlqr
 
@@ -73,6 +74,12 @@ def iterative_riccati(plant, Q, R, Qf, dt, x_traj, u_traj):
             actuations/motor torques
             order=[u1, u2],
             units=[Nm]
+        discretization : string
+            discretization of the linearized dynamics,
+            "euler" or "runge_kutta",
+            the batched discretization is used if the plant provides
+            linear_matrices_discrete_batch
+            (Default value="euler")
     Returns
     -------
     numpy_array
@@ -91,18 +98,29 @@ def iterative_riccati(plant, Q, R, Qf, dt, x_traj, u_traj):
     P = np.zeros((N, n, n))
     K = np.zeros((N, m, n))
 
+    if hasattr(plant, "linear_matrices_discrete_batch"):
+        A_traj, B_traj = plant.linear_matrices_discrete_batch(
+            x_traj[:-1], u_traj[:-1], dt, method=discretization)
+    else:
+        if discretization != "euler":
+            raise NotImplementedError(
+                f"The plant does not support the discretization {discretization}.")
+        A_traj = np.empty((N-1, n, n))
+        B_traj = np.empty((N-1, n, m))
+        for i in range(N-1):
+            A_traj[i], B_traj[i] = plant.linear_matrices_discrete(
+                x_traj[i], u_traj[i], dt)
+
+    Q = np.asarray(Q, dtype=float)
+    R = np.asarray(R, dtype=float)
+
     P[-1, :, :] = Qf
     for i in range(N-2, -1, -1):
-        A, B = plant.linear_matrices_discrete(x_traj[i], u_traj[i], dt)
-        K[i, :, :] = np.linalg.multi_dot([
-            np.linalg.inv(R + np.linalg.multi_dot([B.T, P[i+1, :, :], B])),
-            B.T,
-            P[i+1, :, :],
-            A])
-        P[i, :, :] = Q + np.linalg.multi_dot([
-            A.T,
-            P[i+1, :, :],
-            (A - np.dot(B, K[i, :, :]))])
+        A = A_traj[i]
+        B = B_traj[i]
+        BtP = np.dot(B.T, P[i+1])
+        K[i] = np.linalg.solve(R + np.dot(BtP, B), np.dot(BtP, A))
+        P[i] = Q + np.dot(A.T, np.dot(P[i+1], A - np.dot(B, K[i])))
 
     return K, P
 
@@ -17,13 +17,16 @@ class lqr_check_ctg:
         """
         Callback that is passed to the probabilitic RoA estimation class
         """
+        # stop at the first nan torque/state of the controller
         t, x, tau = self.sim.simulate(
                 t0=0.0,
                 x0=x0,
                 tf=self.tf,
                 dt=self.dt,
                 controller=self.controller,
-                integrator="runge_kutta")
+                integrator="runge_kutta",
+                stop_condition={"non_finite": True},
+                pad="nan")
 
         if np.isnan(x[-1]).all():
             return False
@@ -14,10 +14,12 @@ def check_x0(simulator, controller, x0, dt, t_final,
 
     controller.init()
     simulator.reset_data_recorder()
+    # stop as soon as the state leaves the allowed region
     T, X, U = simulator.simulate(
                 t0=0.0, x0=x0,
                 tf=t_final, dt=dt, controller=controller,
-                integrator=integrator)
+                integrator=integrator,
+                stop_condition={"goal": goal, "max_error": eps})
 
     valid = True
     for x in X:
@@ -0,0 +1,101 @@
+from collections import deque
+
+import numpy as np
+
+
+class PIDErrorState():
+    """PIDErrorState
+    Running state of a PID controller for several joints.
+    Keeps the integrated and the last error so that every update costs
+    O(1), independent of the length of the run. The error history is
+    stored in a ring buffer of fixed length.
+
+    Parameters
+    ----------
+    dt : float
+        timestep, unit=[s]
+    dim : int
+        number of controlled joints
+        (Default value=2)
+    history_length : int
+        number of errors kept in the history, None keeps all errors
+        (Default value=10000)
+    """
+    def __init__(self, dt, dim=2, history_length=10000):
+        self.dt = dt
+        self.dim = dim
+        self.history_length = history_length
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the integrated error and the history.
+        """
+        self.integral = np.zeros(self.dim)
+        self.last_error = np.zeros(self.dim)
+        self.n_updates = 0
+        self.history = deque(maxlen=self.history_length)
+
+    def update(self, error):
+        """
+        Add the error of the current tick.
+
+        Parameters
+        ----------
+        error : array_like, shape=(dim,)
+            current error
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim,)
+            integrated error (sum of all errors times dt)
+        numpy_array
+            shape=(dim,)
+            differentiated error, zero for the first two updates
+        """
+        error = np.asarray(error, dtype=float)
+        self.integral += error*self.dt
+        if self.n_updates >= 2:
+            derivative = (error - self.last_error) / self.dt
+        else:
+            derivative = np.zeros(self.dim)
+        self.last_error = error
+        self.n_updates += 1
+        self.history.append(error)
+        return self.integral, derivative
+
+    def limit_integral(self, Ki, limit):
+        """
+        Anti-windup by clamping: bound the integrated error so that the
+        integral term Ki*integral stays within [-limit, limit].
+
+        Parameters
+        ----------
+        Ki : float
+            gain of the integral term
+        limit : array_like, shape=(dim,)
+            bound of the integral term, e.g. the torque limit
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim,)
+            clamped integrated error
+        """
+        if Ki != 0.0:
+            bound = np.abs(np.asarray(limit, dtype=float) / Ki)
+            np.clip(self.integral, -bound, bound, out=self.integral)
+        return self.integral
+
+    def get_history(self):
+        """
+        Get the recorded errors.
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim, K)
+            the last K errors
+        """
+        return np.asarray(self.history, dtype=float).reshape(-1, self.dim).T
@@ -3,11 +3,13 @@ import yaml
 import numpy as np
 
 from double_pendulum.controller.abstract_controller import AbstractController
+from double_pendulum.controller.pid.pid_state import PIDErrorState
 
 
 class PointPIDController(AbstractController):
     """PointPIDController
     PID controller with a fix state as goal.
+    The integral term is clamped to the torque limit (anti-windup).
 
     Parameters
     ----------
@@ -35,8 +37,7 @@ class PointPIDController(AbstractController):
         self.goal = np.array([np.pi, 0., 0., 0.])
 
         # init pars
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
 
     def set_parameters(self, Kp, Ki, Kd):
         """
@@ -72,8 +73,7 @@ class PointPIDController(AbstractController):
         """
         Initialize the controller.
         """
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
 
     def get_control_output_(self, x, t=None):
         """
@@ -102,20 +102,16 @@ class PointPIDController(AbstractController):
         e2 = self.goal[1] - x[1]
         e1 = (e1 + np.pi) % (2*np.pi) - np.pi
         e2 = (e2 + np.pi) % (2*np.pi) - np.pi
-        self.errors1.append(e1)
-        self.errors2.append(e2)
+        integral, derivative = self.pid_state.update([e1, e2])
+        integral = self.pid_state.limit_integral(self.Ki, self.torque_limit)
 
         P1 = self.Kp*e1
         P2 = self.Kp*e2
 
-        I1 = self.Ki*np.sum(np.asarray(self.errors1))*self.dt
-        I2 = self.Ki*np.sum(np.asarray(self.errors2))*self.dt
-        if len(self.errors1) > 2:
-            D1 = self.Kd*(self.errors1[-1]-self.errors1[-2]) / self.dt
-            D2 = self.Kd*(self.errors2[-1]-self.errors2[-2]) / self.dt
-        else:
-            D1 = 0.0
-            D2 = 0.0
+        I1 = self.Ki*integral[0]
+        I2 = self.Ki*integral[1]
+        D1 = self.Kd*derivative[0]
+        D2 = self.Kd*derivative[1]
 
         u1 = P1 + I1 + D1
         u2 = P2 + I2 + D2
@@ -152,4 +148,4 @@ class PointPIDController(AbstractController):
             yaml.dump(par_dict, f)
 
         np.savetxt(os.path.join(save_dir, "controller_pid_errors.csv"),
-                   [self.errors1, self.errors2])
+                   self.pid_state.get_history())
@@ -3,6 +3,7 @@ import yaml
 import numpy as np
 
 from double_pendulum.controller.abstract_controller import AbstractController
+from double_pendulum.controller.pid.pid_state import PIDErrorState
 from double_pendulum.utils.pcw_polynomial import InterpolateVector
 from double_pendulum.utils.csv_trajectory import load_trajectory, trajectory_properties
 
@@ -10,6 +11,7 @@ from double_pendulum.utils.csv_trajectory import load_trajectory, trajectory_pro
 class TrajPIDController(AbstractController):
     """TrajPIDController
     PID controller for following a trajectory.
+    The integral term is clamped to the torque limit (anti-windup).
 
     Parameters
     ----------
@@ -97,8 +99,7 @@ class TrajPIDController(AbstractController):
         self.Kd = 0.1
 
         # init pars
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
 
     def set_parameters(self, Kp, Ki, Kd):
         """
@@ -121,8 +122,7 @@ class TrajPIDController(AbstractController):
         """
         Initialize the controller.
         """
-        self.errors1 = []
-        self.errors2 = []
+        self.pid_state = PIDErrorState(self.dt)
 
     def get_control_output_(self, x, t):
         """
@@ -154,21 +154,17 @@ class TrajPIDController(AbstractController):
         e2 = p[1] - x[1]
         e1 = (e1 + np.pi) % (2*np.pi) - np.pi
         e2 = (e2 + np.pi) % (2*np.pi) - np.pi
-        self.errors1.append(e1)
-        self.errors2.append(e2)
+        integral, derivative = self.pid_state.update([e1, e2])
+        integral = self.pid_state.limit_integral(self.Ki, self.torque_limit)
 
         P1 = self.Kp*e1
         P2 = self.Kp*e2
 
-        I1 = self.Ki*np.sum(np.asarray(self.errors1))*self.dt
-        I2 = self.Ki*np.sum(np.asarray(self.errors2))*self.dt
+        I1 = self.Ki*integral[0]
+        I2 = self.Ki*integral[1]
 
-        if len(self.errors1) > 2:
-            D1 = self.Kd*(self.errors1[-1]-self.errors1[-2]) / self.dt
-            D2 = self.Kd*(self.errors2[-1]-self.errors2[-2]) / self.dt
-        else:
-            D1 = 0.0
-            D2 = 0.0
+        D1 = self.Kd*derivative[0]
+        D2 = self.Kd*derivative[1]
 
         if self.use_ff:
             uu = self.U_interp.get_value(tt)
@@ -232,4 +228,4 @@ class TrajPIDController(AbstractController):
             yaml.dump(par_dict, f)
 
         np.savetxt(os.path.join(save_dir, "controller_traj_pid_errors.csv"),
-                   [self.errors1, self.errors2])
+                   self.pid_state.get_history())
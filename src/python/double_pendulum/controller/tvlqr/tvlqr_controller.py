@@ -64,6 +64,10 @@ class TVLQRController(AbstractController):
         number of break points used for interpolation
         (Default value = 40)
         (Default value=100)
+    discretization : string
+        discretization of the linearized dynamics for the riccati
+        equation, "euler" or "runge_kutta"
+        (Default value="euler")
     """
     def __init__(self,
                  mass=[0.5, 0.6],
@@ -77,6 +81,7 @@ class TVLQRController(AbstractController):
                  model_pars=None,
                  csv_path="",
                  num_break=40,
+                 discretization="euler",
                  ):
 
         super().__init__()
@@ -114,6 +119,7 @@ class TVLQRController(AbstractController):
                 torque_limit=self.torque_limit)
 
         self.num_break = num_break
+        self.discretization = discretization
 
         # load trajectory
         self.T, self.X, self.U = load_trajectory(csv_path=csv_path,
@@ -195,7 +201,8 @@ class TVLQRController(AbstractController):
         """
 
         self.K, _ = iterative_riccati(
-            self.splant, self.Q, self.R, self.Qf, self.dt, self.X, self.U)
+            self.splant, self.Q, self.R, self.Qf, self.dt, self.X, self.U,
+            discretization=self.discretization)
 
         self.K_interp = InterpolateMatrix(
             T=self.T,
@@ -1,3 +1,4 @@
+import math
 import numpy as np
 
 
@@ -11,6 +12,8 @@ class DoublePendulumPlant():
         - state dynamics matrices (mass, coriolis, gravity, friction)
         - linearized dynamics
         - kinetic, potential, total energy
+        - center of mass, angular momentum
+    The *_batch methods evaluate whole trajectories at once.
 
     Parameters
     ----------
@@ -59,6 +62,16 @@ class DoublePendulumPlant():
         If provided, the model_pars parameters overwrite
         the other provided parameters
     """
+
+    # model parameters in the order of parameter_vector()
+    par_names = ["m1", "m2", "l1", "l2", "r1", "r2", "I1", "I2", "g",
+                 "b1", "b2", "cf1", "cf2", "Ir", "gr"]
+
+    # attributes the coefficients of the scalar fast path depend on
+    fast_dynamics_attributes = frozenset(
+        ["m", "l", "com", "b", "g", "coulomb_fric", "I", "Ir", "gr", "B",
+         "formulas"])
+
     def __init__(self,
                  mass=[1.0, 1.0],
                  length=[0.5, 0.5],
@@ -117,6 +130,14 @@ class DoublePendulumPlant():
 
         self.formulas = "UnderactuatedLecture"
 
+        self.init_fast_dynamics()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in self.fast_dynamics_attributes:
+            # coefficients of the fast path are recomputed on the next use
+            object.__setattr__(self, "_fast_pars", None)
+
     def forward_kinematics(self, pos):
         """
         forward kinematics, origin at fixed point
@@ -418,6 +439,599 @@ class DoublePendulumPlant():
         res[3] = accn[1]
         return res
 
+    def parameter_vector(self):
+        """
+        numeric model parameters of this plant in the order of par_names
+
+        Returns
+        -------
+        list
+            [m1, m2, l1, l2, r1, r2, I1, I2, g, b1, b2, cf1, cf2, Ir, gr]
+        """
+        return [self.m[0], self.m[1], self.l[0], self.l[1],
+                self.com[0], self.com[1], self.I[0], self.I[1], self.g,
+                self.b[0], self.b[1], self.coulomb_fric[0],
+                self.coulomb_fric[1], self.Ir, self.gr]
+
+    def forward_dynamics_batch(self, X, U, P=None):
+        """
+        forward dynamics of the double pendulum for a batch of states
+        and torques. Uses the closed form inverse of the 2x2 mass matrix
+        and does not loop over the batch.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        U : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array, shape=(N, 2)
+            joint accelerations, [acc1, acc2], units=[m/s²]
+        """
+        X = np.asarray(X, dtype=float)
+        U = np.asarray(U, dtype=float)
+
+        if P is None:
+            P = self.parameter_vector()
+        (m1, m2, l1, _, r1, r2, I1, I2, g,
+         b1, b2, cf1, cf2, Ir, gr) = np.asarray(P, dtype=float).T
+
+        pos1 = X[:, 0]
+        pos2 = X[:, 1]
+        vel1 = X[:, 2]
+        vel2 = X[:, 3]
+
+        c2 = np.cos(pos2)
+        s2 = np.sin(pos2)
+        h = m2*l1*r2
+
+        if self.formulas == "UnderactuatedLecture":
+            m00 = I1 + I2 + m2*l1**2.0 + 2*h*c2 + gr**2.0*Ir + Ir
+            m01 = I2 + h*c2 - gr*Ir
+            m11 = I2 + gr**2.0*Ir
+
+            G0 = -m1*g*r1*np.sin(pos1) - \
+                m2*g*(l1*np.sin(pos1) + r2*np.sin(pos1+pos2))
+            G1 = -m2*g*r2*np.sin(pos1+pos2)
+
+        elif self.formulas == "Spong":
+            m00 = I1 + I2 + m1*r1**2.0 + m2*(l1**2.0 + r2**2.0 + 2*l1*r2*c2)
+            m01 = I2 + m2*(r2**2.0 + l1*r2*c2)
+            m11 = I2 + m2*r2**2.0
+
+            p1 = pos1 - 0.5*np.pi  # Spong uses different 0 position
+            G0 = -(m1*r1 + m2*l1)*g*np.cos(p1) - m2*r2*g*np.cos(p1+pos2)
+            G1 = -m2*r2*g*np.cos(p1+pos2)
+
+        # coriolis terms C.dot(vel), C11 = 0
+        Cv0 = -2*h*s2*vel2*vel1 - h*s2*vel2*vel2
+        Cv1 = h*s2*vel1*vel1
+
+        F0 = b1*vel1 + cf1*np.arctan(100*vel1)
+        F1 = b2*vel2 + cf2*np.arctan(100*vel2)
+
+        Bu = U.dot(np.asarray(self.B, dtype=float).T)
+
+        f0 = G0 + Bu[:, 0] - Cv0 - F0
+        f1 = G1 + Bu[:, 1] - Cv1 - F1
+
+        # closed form inverse of the symmetric 2x2 mass matrix
+        det = m00*m11 - m01*m01
+
+        accn = np.empty((len(X), self.dof))
+        accn[:, 0] = (m11*f0 - m01*f1) / det
+        accn[:, 1] = (m00*f1 - m01*f0) / det
+        return accn
+
+    def rhs_batch(self, t, X, U, P=None):
+        """
+        integrand of the equations of motion for a batch of states
+        and torques
+
+        Parameters
+        ----------
+        t : float,
+            time, units=[s], not used
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        U : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, 4), dtype=float
+            integrand, [vel1, vel2, acc1, acc2]
+        """
+        X = np.asarray(X, dtype=float)
+
+        res = np.empty((len(X), 2*self.dof))
+        res[:, :self.dof] = X[:, self.dof:]
+        res[:, self.dof:] = self.forward_dynamics_batch(X, U, P)
+        return res
+
+    def forward_kinematics_batch(self, Q):
+        """
+        forward kinematics for a batch of configurations,
+        origin at fixed point
+
+        Parameters
+        ----------
+        Q : array_like, shape=(N, 2) or shape=(N, 4), dtype=float,
+            positions (or states) of the double pendulum,
+            order=[angle1, angle2, ...],
+            units=[rad, rad, ...]
+
+        Returns
+        -------
+        numpy array, shape=(N, 2, 2)
+            cartesian coordinates of the link end points,
+            [:, i] = [x_i, y_i] of link i, units=[m]
+        """
+        Q = np.asarray(Q, dtype=float)
+        pos1 = Q[..., 0]
+        pos12 = pos1 + Q[..., 1]
+
+        ee = np.empty(Q.shape[:-1] + (2, 2))
+        ee[..., 0, 0] = self.l[0]*np.sin(pos1)
+        ee[..., 0, 1] = -self.l[0]*np.cos(pos1)
+        ee[..., 1, 0] = ee[..., 0, 0] + self.l[1]*np.sin(pos12)
+        ee[..., 1, 1] = ee[..., 0, 1] - self.l[1]*np.cos(pos12)
+        return ee
+
+    def center_of_mass_batch(self, X):
+        """
+        center of mass of the whole system for a batch of configurations
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 2) or shape=(N, 4), dtype=float,
+            positions (or states) of the double pendulum,
+            order=[angle1, angle2, ...],
+            units=[rad, rad, ...]
+
+        Returns
+        -------
+        numpy array, shape=(N, 2)
+            cartesian coordinates of the center of mass, units=[m]
+        """
+        X = np.asarray(X, dtype=float)
+        pos1 = X[..., 0]
+        pos12 = pos1 + X[..., 1]
+        s1 = np.sin(pos1)
+        c1 = np.cos(pos1)
+
+        a = (self.m[0]*self.com[0] + self.m[1]*self.l[0]) / (self.m[0] + self.m[1])
+        b = self.m[1]*self.com[1] / (self.m[0] + self.m[1])
+
+        com = np.empty(X.shape[:-1] + (2,))
+        com[..., 0] = a*s1 + b*np.sin(pos12)
+        com[..., 1] = -a*c1 - b*np.cos(pos12)
+        return com
+
+    def mass_matrix_batch(self, X):
+        """
+        mass matrix entries for a batch of states
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 2) or shape=(N, 4), dtype=float,
+            positions (or states) of the double pendulum,
+            order=[angle1, angle2, ...],
+            units=[rad, rad, ...]
+
+        Returns
+        -------
+        numpy array, shape=(N,)
+            m00
+        numpy array, shape=(N,)
+            m01 (=m10)
+        float
+            m11
+        """
+        c2 = np.cos(np.asarray(X, dtype=float)[..., 1])
+        if self.formulas == "UnderactuatedLecture":
+            h = self.m[1]*self.l[0]*self.com[1]
+            m00 = (self.I[0] + self.I[1] + self.m[1]*self.l[0]**2.0 +
+                   self.gr**2.0*self.Ir + self.Ir) + 2*h*c2
+            m01 = (self.I[1] - self.gr*self.Ir) + h*c2
+            m11 = self.I[1] + self.gr**2.0*self.Ir
+        elif self.formulas == "Spong":
+            h = self.m[1]*self.l[0]*self.com[1]
+            m00 = (self.I[0] + self.I[1] + self.m[0]*self.com[0]**2.0 +
+                   self.m[1]*(self.l[0]**2.0 + self.com[1]**2.0)) + 2*h*c2
+            m01 = (self.I[1] + self.m[1]*self.com[1]**2.0) + h*c2
+            m11 = self.I[1] + self.m[1]*self.com[1]**2.0
+        return m00, m01, m11
+
+    def kinetic_energy_batch(self, X):
+        """
+        kinetic energy of the double pendulum for a batch of states
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        numpy array, shape=(N,)
+            kinetic energy, units=[J]
+        """
+        X = np.asarray(X, dtype=float)
+        vel1 = X[..., 2]
+        vel2 = X[..., 3]
+        m00, m01, m11 = self.mass_matrix_batch(X)
+        return 0.5*(m00*vel1*vel1 + 2.0*m01*vel1*vel2 + m11*vel2*vel2)
+
+    def potential_energy_batch(self, X):
+        """
+        potential energy of the double pendulum for a batch of states
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 2) or shape=(N, 4), dtype=float,
+            positions (or states) of the double pendulum,
+            order=[angle1, angle2, ...],
+            units=[rad, rad, ...]
+
+        Returns
+        -------
+        numpy array, shape=(N,)
+            potential energy, units=[J]
+        """
+        X = np.asarray(X, dtype=float)
+        c1 = np.cos(X[..., 0])
+        c12 = np.cos(X[..., 0] + X[..., 1])
+
+        # 0 level at hinge
+        a = -self.g*(self.m[0]*self.com[0] + self.m[1]*self.l[0])
+        b = -self.g*self.m[1]*self.com[1]
+        return a*c1 + b*c12
+
+    def total_energy_batch(self, X):
+        """
+        total energy of the double pendulum for a batch of states
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        numpy array, shape=(N,)
+            total energy, units=[J]
+        """
+        return self.kinetic_energy_batch(X) + self.potential_energy_batch(X)
+
+    def angular_momentum_batch(self, X):
+        """
+        angular momentum of the double pendulum around the fixed point
+        for a batch of states. This is the generalized momentum of the
+        first joint, i.e. the first entry of M(q) qd.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        numpy array, shape=(N,)
+            angular momentum, units=[kg*m²/s]
+        """
+        X = np.asarray(X, dtype=float)
+        m00, m01, _ = self.mass_matrix_batch(X)
+        return m00*X[..., 2] + m01*X[..., 3]
+
+    def init_fast_dynamics(self):
+        """
+        precompute the constant coefficients of the equations of motion
+        used by the scalar fast path (rhs_fast, rhs_into,
+        runge_integrator_into, linear_matrices_into).
+        Reassigning a model parameter attribute or the formulas
+        invalidates the coefficients and they are recomputed on the next
+        use. Has to be called explicitly if entries of the parameter
+        lists are changed in place (e.g. plant.m[1] = 0.5).
+        """
+        m1, m2 = float(self.m[0]), float(self.m[1])
+        l1 = float(self.l[0])
+        r1, r2 = float(self.com[0]), float(self.com[1])
+        I1, I2 = float(self.I[0]), float(self.I[1])
+        Ir, gr, g = float(self.Ir), float(self.gr), float(self.g)
+
+        h = m2*l1*r2
+        if self.formulas == "Spong":
+            m00 = I1 + I2 + m1*r1**2.0 + m2*(l1**2.0 + r2**2.0)
+            m01 = I2 + m2*r2**2.0
+            m11 = I2 + m2*r2**2.0
+            spong = True
+        else:
+            m00 = I1 + I2 + m2*l1**2.0 + gr**2.0*Ir + Ir
+            m01 = I2 - gr*Ir
+            m11 = I2 + gr**2.0*Ir
+            spong = False
+
+        B = np.asarray(self.B, dtype=float)
+        self._fast_pars = (
+            m00, m01, m11, h,
+            (m1*r1 + m2*l1)*g, m2*r2*g,
+            float(self.b[0]), float(self.b[1]),
+            float(self.coulomb_fric[0]), float(self.coulomb_fric[1]),
+            B[0, 0], B[0, 1], B[1, 0], B[1, 1],
+            spong)
+
+    def rhs_fast(self, x0, x1, x2, x3, u0, u1):
+        """
+        joint accelerations computed from scalars without the generic
+        matrix machinery and without allocating arrays.
+        See init_fast_dynamics for changes of the model parameters.
+
+        Parameters
+        ----------
+        x0, x1, x2, x3 : float
+            state of the double pendulum,
+            [angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        u0, u1 : float
+            actuation input/motor torque,
+            units=[Nm]
+
+        Returns
+        -------
+        float
+            acceleration of joint 1, units=[rad/s²]
+        float
+            acceleration of joint 2, units=[rad/s²]
+        """
+        if self._fast_pars is None:
+            self.init_fast_dynamics()
+        (m00, m01, m11, h, g0, g1, b1, b2, cf1, cf2,
+         B00, B01, B10, B11, spong) = self._fast_pars
+
+        if not math.isfinite(x0 + x1 + x2 + x3):
+            # diverged state, math.cos raises where numpy returns nan
+            return math.nan, math.nan
+
+        c2 = math.cos(x1)
+        hs2 = h*math.sin(x1)
+        m00 = m00 + 2.*h*c2
+        m01 = m01 + h*c2
+
+        if spong:
+            p1 = x0 - 0.5*math.pi
+            gc12 = g1*math.cos(p1 + x1)
+            G0 = -g0*math.cos(p1) - gc12
+            G1 = -gc12
+        else:
+            gs12 = g1*math.sin(x0 + x1)
+            G0 = -g0*math.sin(x0) - gs12
+            G1 = -gs12
+
+        f0 = G0 + B00*u0 + B01*u1 + hs2*(2.*x2 + x3)*x3 - \
+            b1*x2 - cf1*math.atan(100.*x2)
+        f1 = G1 + B10*u0 + B11*u1 - hs2*x2*x2 - \
+            b2*x3 - cf2*math.atan(100.*x3)
+
+        det = m00*m11 - m01*m01
+        return (m11*f0 - m01*f1) / det, (m00*f1 - m01*f0) / det
+
+    def rhs_into(self, state, tau, out):
+        """
+        integrand of the equations of motion written into a caller
+        provided buffer (scalar fast path of rhs)
+
+        Parameters
+        ----------
+        state : array_like, shape=(4,), dtype=float,
+            state of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        tau : array_like, shape=(2,), dtype=float
+            actuation input/motor torque,
+            order=[u1, u2],
+            units=[Nm]
+        out : numpy array, shape=(4,), dtype=float
+            buffer for the integrand, [vel1, vel2, acc1, acc2]
+
+        Returns
+        -------
+        numpy array
+            out
+        """
+        x2 = float(state[2])
+        x3 = float(state[3])
+        a0, a1 = self.rhs_fast(float(state[0]), float(state[1]), x2, x3,
+                               float(tau[0]), float(tau[1]))
+        out[0] = x2
+        out[1] = x3
+        out[2] = a0
+        out[3] = a1
+        return out
+
+    def runge_integrator_into(self, state, dt, tau, out):
+        """
+        Runge-Kutta (4th order) increment (k1 + 2*k2 + 2*k3 + k4)/6
+        written into a caller provided buffer.
+        The new state is state + dt*out.
+        The torque is held constant over the step.
+
+        Parameters
+        ----------
+        state : array_like, shape=(4,), dtype=float,
+            state of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        dt : float
+            timestep, unit=[s]
+        tau : array_like, shape=(2,), dtype=float
+            actuation input/motor torque,
+            order=[u1, u2],
+            units=[Nm]
+        out : numpy array, shape=(4,), dtype=float
+            buffer for the increment
+
+        Returns
+        -------
+        numpy array
+            out
+        """
+        f = self.rhs_fast
+        u0 = float(tau[0])
+        u1 = float(tau[1])
+        x0 = float(state[0])
+        x1 = float(state[1])
+        x2 = float(state[2])
+        x3 = float(state[3])
+        hdt = 0.5*dt
+
+        a10, a11 = f(x0, x1, x2, x3, u0, u1)
+
+        v20 = x2 + hdt*a10
+        v21 = x3 + hdt*a11
+        a20, a21 = f(x0 + hdt*x2, x1 + hdt*x3, v20, v21, u0, u1)
+
+        v30 = x2 + hdt*a20
+        v31 = x3 + hdt*a21
+        a30, a31 = f(x0 + hdt*v20, x1 + hdt*v21, v30, v31, u0, u1)
+
+        v40 = x2 + dt*a30
+        v41 = x3 + dt*a31
+        a40, a41 = f(x0 + dt*v30, x1 + dt*v31, v40, v41, u0, u1)
+
+        out[0] = (x2 + 2.*(v20 + v30) + v40) / 6.
+        out[1] = (x3 + 2.*(v21 + v31) + v41) / 6.
+        out[2] = (a10 + 2.*(a20 + a30) + a40) / 6.
+        out[3] = (a11 + 2.*(a21 + a31) + a41) / 6.
+        return out
+
+    def linear_matrices_into(self, state, tau, A, B):
+        """
+        A- and B-matrix of the linearized dynamics (xd = Ax+Bu) computed
+        analytically from scalars (fast path of linear_matrices) and
+        written into caller provided buffers.
+        See init_fast_dynamics for changes of the model parameters.
+
+        Parameters
+        ----------
+        state : array_like, shape=(4,), dtype=float,
+            state of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        tau : array_like, shape=(2,), dtype=float
+            actuation input/motor torque,
+            order=[u1, u2],
+            units=[Nm]
+        A : numpy array, shape=(4,4), dtype=float
+            buffer for the A-matrix
+        B : numpy array, shape=(4,2), dtype=float
+            buffer for the B-matrix
+
+        Returns
+        -------
+        numpy array
+            A
+        numpy array
+            B
+        """
+        if self._fast_pars is None:
+            self.init_fast_dynamics()
+        (m00, m01, m11, h, g0, g1, b1, b2, cf1, cf2,
+         B00, B01, B10, B11, spong) = self._fast_pars
+        x0 = float(state[0])
+        x1 = float(state[1])
+        x2 = float(state[2])
+        x3 = float(state[3])
+        u0 = float(tau[0])
+        u1 = float(tau[1])
+
+        c2 = math.cos(x1)
+        hs2 = h*math.sin(x1)
+        hc2 = h*c2
+        a = m00 + 2.*hc2
+        b = m01 + hc2
+        c = m11
+        # derivatives of the mass matrix entries w.r.t. angle2
+        da = -2.*hs2
+        db = -hs2
+
+        if spong:
+            p1 = x0 - 0.5*math.pi
+            gc12 = g1*math.cos(p1 + x1)
+            gs12 = g1*math.sin(p1 + x1)
+            G0 = -g0*math.cos(p1) - gc12
+            G1 = -gc12
+            G0x0 = g0*math.sin(p1) + gs12
+            G1x0 = gs12
+        else:
+            gs12 = g1*math.sin(x0 + x1)
+            gc12 = g1*math.cos(x0 + x1)
+            G0 = -g0*math.sin(x0) - gs12
+            G1 = -gs12
+            G0x0 = -g0*math.cos(x0) - gc12
+            G1x0 = -gc12
+
+        f0 = G0 + B00*u0 + B01*u1 + hs2*(2.*x2 + x3)*x3 - \
+            b1*x2 - cf1*math.atan(100.*x2)
+        f1 = G1 + B10*u0 + B11*u1 - hs2*x2*x2 - \
+            b2*x3 - cf2*math.atan(100.*x3)
+
+        # derivatives of f w.r.t. the state, G1x1 = G1x0 = G0x1
+        f0x = (G0x0, G1x0 + hc2*(2.*x2 + x3)*x3,
+               2.*hs2*x3 - b1 - 100.*cf1/(1. + (100.*x2)**2.),
+               2.*hs2*(x2 + x3))
+        f1x = (G1x0, G1x0 - hc2*x2*x2,
+               -2.*hs2*x2,
+               -b2 - 100.*cf2/(1. + (100.*x3)**2.))
+
+        det = a*c - b*b
+        qdd0 = (c*f0 - b*f1) / det
+        qdd1 = (a*f1 - b*f0) / det
+        ddet = da*c - 2.*b*db
+
+        A.fill(0.)
+        A[0, 2] = 1.
+        A[1, 3] = 1.
+        for i in range(4):
+            n0 = c*f0x[i] - b*f1x[i]
+            n1 = a*f1x[i] - b*f0x[i]
+            if i == 1:
+                n0 = n0 - db*f1 - qdd0*ddet
+                n1 = n1 + da*f1 - db*f0 - qdd1*ddet
+            A[2, i] = n0 / det
+            A[3, i] = n1 / det
+
+        B.fill(0.)
+        B[2, 0] = (c*B00 - b*B10) / det
+        B[2, 1] = (c*B01 - b*B11) / det
+        B[3, 0] = (a*B10 - b*B00) / det
+        B[3, 1] = (a*B11 - b*B01) / det
+        return A, B
+
     def get_Mx(self, x, tau):
         """
         state derivative of mass matrix
@@ -0,0 +1,263 @@
+import os
+import glob
+import pickle
+import hashlib
+import inspect
+import importlib.metadata
+
+import sympy as smp
+from sympy.utilities import lambdify
+
+
+# increase when the layout of the cache entries changes
+CACHE_FORMAT = 1
+
+# default maximum size of the on-disk cache, units=[byte]
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+
+# in-process store of the loaded entries
+_memory_cache = {}
+_cache_version = None
+
+
+def get_cache_dir():
+    """
+    directory of the on-disk compile cache.
+    Defaults to ~/.cache/double_pendulum/symbolic_plant and can be set with
+    the environment variable DOUBLE_PENDULUM_CACHE_DIR.
+
+    Returns
+    -------
+    string
+        path to the cache directory
+    """
+    default = os.path.join(
+        os.path.expanduser("~"), ".cache", "double_pendulum", "symbolic_plant"
+    )
+    return os.environ.get("DOUBLE_PENDULUM_CACHE_DIR", default)
+
+
+def get_cache_version():
+    """
+    version string of the cache. Entries written with a different version
+    are ignored and removed. The version contains the package version,
+    the sympy version and a hash of the symbolic plant source code.
+
+    Returns
+    -------
+    string
+        cache version
+    """
+    global _cache_version
+    if _cache_version is not None:
+        return _cache_version
+
+    try:
+        pkg_version = importlib.metadata.version("DoublePendulum")
+    except importlib.metadata.PackageNotFoundError:
+        pkg_version = "unknown"
+
+    from double_pendulum.model import symbolic_plant
+
+    with open(symbolic_plant.__file__, "rb") as f:
+        src_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    _cache_version = f"{CACHE_FORMAT}-{pkg_version}-{smp.__version__}-{src_hash}"
+    return _cache_version
+
+
+def _version_prefix():
+    return hashlib.sha256(get_cache_version().encode()).hexdigest()[:16]
+
+
+def _entry_path(key):
+    return os.path.join(get_cache_dir(), f"{_version_prefix()}-{key}.pkl")
+
+
+def get_cache_key(formulas, B):
+    """
+    content address of a cache entry
+
+    Parameters
+    ----------
+    formulas : string
+        formula variant of the plant ("UnderactuatedLecture" or "Spong")
+    B : array_like
+        shape=(2, 2)
+        actuator selection matrix
+
+    Returns
+    -------
+    string
+        cache key
+    """
+    B_str = ",".join(str(int(b)) for row in B for b in row)
+    key = f"{get_cache_version()}|{formulas}|{B_str}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def lambdify_to_source(args, expr):
+    """
+    lambdify a sympy expression and return the source code of the
+    generated numpy function
+
+    Parameters
+    ----------
+    args : list of sympy symbols
+        arguments of the generated function
+    expr : sympy expression
+
+    Returns
+    -------
+    string
+        source code of the function
+    """
+    return inspect.getsource(lambdify(args, expr, modules="numpy"))
+
+
+def source_to_function(source):
+    """
+    create a function from source code generated with lambdify_to_source
+
+    Parameters
+    ----------
+    source : string
+        source code of the function
+
+    Returns
+    -------
+    function
+    """
+    # namespace lambdify uses for the numpy module
+    namespace = dict(lambdify([], 0, modules="numpy").__globals__)
+    exec(source, namespace)
+    return namespace["_lambdifygenerated"]
+
+
+def load_entry(key):
+    """
+    load a cache entry from memory or disk
+
+    Parameters
+    ----------
+    key : string
+        cache key
+
+    Returns
+    -------
+    dict or None
+        the cache entry, None if not cached
+    """
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    path = _entry_path(key)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        if entry["version"] != get_cache_version():
+            return None
+        entry["functions"] = {
+            name: source_to_function(src) for name, src in entry["sources"].items()
+        }
+        # mark as recently used for the eviction
+        os.utime(path)
+    except Exception:
+        return None
+
+    _memory_cache[key] = entry
+    return entry
+
+
+def store_entry(key, symbolic, sources, max_size=DEFAULT_MAX_SIZE):
+    """
+    store a cache entry in memory and on disk
+
+    Parameters
+    ----------
+    key : string
+        cache key
+    symbolic : dict
+        symbolic expressions to be stored
+    sources : dict
+        source code of the generated functions
+    max_size : int
+        maximum size of the on-disk cache, units=[byte]
+        (Default value=50*1024*1024)
+
+    Returns
+    -------
+    dict
+        the cache entry
+    """
+    entry = {
+        "version": get_cache_version(),
+        "symbolic": symbolic,
+        "sources": sources,
+    }
+
+    path = _entry_path(key)
+    try:
+        os.makedirs(get_cache_dir(), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, path)
+        prune_cache(max_size=max_size)
+    except OSError:
+        # the cache is optional, e.g. for read only file systems
+        pass
+
+    entry["functions"] = {
+        name: source_to_function(src) for name, src in sources.items()
+    }
+    _memory_cache[key] = entry
+    return entry
+
+
+def prune_cache(max_size=DEFAULT_MAX_SIZE):
+    """
+    remove outdated entries and evict the least recently used entries
+    until the on-disk cache is smaller than max_size
+
+    Parameters
+    ----------
+    max_size : int
+        maximum size of the on-disk cache, units=[byte]
+        (Default value=50*1024*1024)
+    """
+    prefix = _version_prefix()
+    files = []
+    for path in glob.glob(os.path.join(get_cache_dir(), "*.pkl")):
+        # other processes may remove entries at the same time
+        try:
+            if not os.path.basename(path).startswith(prefix):
+                os.remove(path)
+            else:
+                files.append((os.path.getmtime(path), os.path.getsize(path), path))
+        except OSError:
+            pass
+
+    size = sum(f[1] for f in files)
+    for _, fsize, path in sorted(files):
+        if size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        size -= fsize
+
+
+def clear_cache():
+    """
+    remove all entries from the in-process and the on-disk cache
+    """
+    _memory_cache.clear()
+    for path in glob.glob(os.path.join(get_cache_dir(), "*.pkl")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
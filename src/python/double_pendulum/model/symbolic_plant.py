@@ -1,6 +1,13 @@
 import numpy as np
 import sympy as smp
-from sympy.utilities import lambdify
+
+from double_pendulum.model.symbolic_cache import (
+    get_cache_key,
+    load_entry,
+    store_entry,
+    lambdify_to_source,
+    source_to_function,
+)
 
 
 def diff_to_matrix(diff):
@@ -130,6 +137,13 @@ class SymbolicDoublePendulum():
         Can be used to set all model parameters above
         If provided, the model_pars parameters overwrite
         the other provided parameters
+    use_cache : bool, optional
+        default=True
+        Whether to load the equations of motion and the generated numeric
+        functions from the compile cache (see model.symbolic_cache).
+        The cache is keyed by the formula variant and the actuator
+        selection, so that the expensive symbolic derivation is only done
+        once.
     """
 
     # Acrobot parameters
@@ -170,6 +184,11 @@ class SymbolicDoublePendulum():
     u01, u02 = smp.symbols("\hat{u}_1 \hat{u}_2")
     u0 = smp.Matrix([u01, u02])
 
+    # model parameters in the order of parameter_vector()
+    par_sym = [m1, m2, l1, l2, r1, r2, I1, I2, g_sym,
+               b1, b2, cf1, cf2, Ir_sym, gr_sym]
+    par_names = [str(p) for p in par_sym]
+
     def __init__(self,
                  mass=[1.0, 1.0],
                  length=[0.5, 0.5],
@@ -181,7 +200,8 @@ class SymbolicDoublePendulum():
                  motor_inertia=0.,
                  gear_ratio=6,
                  torque_limit=[np.inf, np.inf],
-                 model_pars=None):
+                 model_pars=None,
+                 use_cache=True):
         self.m = mass
         self.l = length
         self.com = com
@@ -211,15 +231,7 @@ class SymbolicDoublePendulum():
             self.torque_limit = model_pars.tl
 
         # Actuator selection Matrix
-        if torque_limit[0] == 0:
-            self.B_sym = smp.Matrix([[0, 0], [0, 1]])
-            self.B = np.array([[0, 0], [0, 1]])
-        elif torque_limit[1] == 0:
-            self.B_sym = smp.Matrix([[1, 0], [0, 0]])
-            self.B = np.array([[1, 0], [0, 0]])
-        else:
-            self.B_sym = smp.Matrix([[1, 0], [0, 1]])
-            self.B = np.array([[1, 0], [0, 1]])
+        self.set_actuator_matrix(torque_limit)
 
         # needed for plotting
         self.workspace_range = [[-1.2*np.sum(self.l), 1.2*np.sum(self.l)],
@@ -233,15 +245,12 @@ class SymbolicDoublePendulum():
         self.G = self.symbolic_gravity_vector()
         self.F = self.symbolic_coulomb_vector()
 
-        self.eom = self.equation_of_motion(order="2nd")
-        self.f = self.equation_of_motion(order="1st")
-
         self.Ekin = self.symbolic_kinetic_energy()
         self.Epot = self.symbolic_potential_energy()
         self.E = self.symbolic_total_energy()
 
-        self.Alin, self.Blin = self.symbolic_linear_matrices()
-
+        self.use_cache = use_cache
+        self.init_numeric_functions()
         self.lambdify_matrices()
 
     def symbolic_mass_matrix(self):
@@ -634,30 +643,400 @@ class SymbolicDoublePendulum():
         mat_rep = sub_symbols(mat_rep, [self.gr_sym], [self.gr])
         return mat_rep
 
+    def parameter_vector(self):
+        """
+        numeric model parameters of this plant in the order of par_sym
+
+        Returns
+        -------
+        list
+            [m1, m2, l1, l2, r1, r2, I1, I2, g, b1, b2, cf1, cf2, Ir, gr]
+        """
+        return [self.m[0], self.m[1], self.l[0], self.l[1],
+                self.com[0], self.com[1], self.I[0], self.I[1], self.g,
+                self.b[0], self.b[1], self.coulomb_fric[0],
+                self.coulomb_fric[1], self.Ir, self.gr]
+
+    def set_actuator_matrix(self, torque_limit):
+        """
+        set the actuator selection matrix B. A joint with torque limit 0
+        is passive.
+
+        Parameters
+        ----------
+        torque_limit : array_like, shape=(2,)
+            torque limits of the motors, units=[Nm]
+        """
+        if torque_limit[0] == 0:
+            self.B_sym = smp.Matrix([[0, 0], [0, 1]])
+            self.B = np.array([[0, 0], [0, 1]])
+        elif torque_limit[1] == 0:
+            self.B_sym = smp.Matrix([[1, 0], [0, 0]])
+            self.B = np.array([[1, 0], [0, 0]])
+        else:
+            self.B_sym = smp.Matrix([[1, 0], [0, 1]])
+            self.B = np.array([[1, 0], [0, 1]])
+
+    def set_parameters(self, par_vector=None, model_pars=None):
+        """
+        change the model parameters of this plant without a symbolic
+        rebuild. Only the parameter vector the numeric functions are
+        evaluated with is updated. If the torque limit of model_pars
+        changes the actuated joints, the numeric functions are
+        rebuilt for the new actuator selection matrix.
+
+        Parameters
+        ----------
+        par_vector : array_like, shape=(15,), optional
+            model parameters in the order of par_names
+            [m1, m2, l1, l2, r1, r2, I1, I2, g, b1, b2, cf1, cf2, Ir, gr]
+            default=None
+        model_pars : model_parameters object, optional
+            object of the model_parameters class, default=None
+            If provided, the model_pars parameters overwrite
+            the par_vector parameters
+        """
+        if par_vector is not None:
+            p = [float(v) for v in par_vector]
+            self.m = p[0:2]
+            self.l = p[2:4]
+            self.com = p[4:6]
+            self.I = p[6:8]
+            self.g = p[8]
+            self.b = p[9:11]
+            self.coulomb_fric = p[11:13]
+            self.Ir = p[13]
+            self.gr = p[14]
+
+        if model_pars is not None:
+            self.m = model_pars.m
+            self.l = model_pars.l
+            self.com = model_pars.r
+            self.b = model_pars.b
+            self.coulomb_fric = model_pars.cf
+            self.g = model_pars.g
+            self.I = model_pars.I
+            self.Ir = model_pars.Ir
+            self.gr = model_pars.gr
+            self.torque_limit = model_pars.tl
+
+            B = self.B
+            self.set_actuator_matrix(self.torque_limit)
+            if not np.array_equal(B, self.B):
+                self.init_numeric_functions()
+
+        self.workspace_range = [[-1.2*np.sum(self.l), 1.2*np.sum(self.l)],
+                                [-1.2*np.sum(self.l), 1.2*np.sum(self.l)]]
+        self.lambdify_matrices()
+
+    def init_numeric_functions(self):
+        """
+        derive the equations of motion and the linearization and generate
+        the parameter dependent numeric functions. If use_cache is set,
+        the results are loaded from/stored in the compile cache.
+        """
+        cache_key = get_cache_key(self.formulas, self.B)
+        entry = None
+        if self.use_cache:
+            entry = load_entry(cache_key)
+
+        if entry is None:
+            self.eom = self.equation_of_motion(order="2nd")
+            self.f = self.equation_of_motion(order="1st")
+            self.Alin, self.Blin = self.symbolic_linear_matrices()
+
+            symbolic = {"eom": self.eom, "f": self.f,
+                        "Alin": self.Alin, "Blin": self.Blin}
+            sources = self.numeric_function_sources()
+            if self.use_cache:
+                entry = store_entry(cache_key, symbolic, sources)
+                self.numeric_functions = entry["functions"]
+            else:
+                self.numeric_functions = {
+                    name: source_to_function(src)
+                    for name, src in sources.items()}
+        else:
+            self.eom = entry["symbolic"]["eom"]
+            self.f = entry["symbolic"]["f"]
+            self.Alin = entry["symbolic"]["Alin"]
+            self.Blin = entry["symbolic"]["Blin"]
+            self.numeric_functions = entry["functions"]
+
+    def numeric_function_sources(self):
+        """
+        generate the source code of the numeric functions of this plant.
+        The model parameters are kept as function arguments, so that the
+        functions do not depend on the parameter values of this plant.
+        Argument order: (q1, q2, qd1, qd2, *par_sym) for the state
+        dependent functions and (*x0, *u0, *par_sym) for the linearization.
+
+        The functions with the suffix _flat return the matrix entries
+        as a flat list (row major), so that they can be evaluated with
+        arrays of states and parameters.
+
+        Returns
+        -------
+        dict
+            source code of the functions M, C, G, F, Ekin, Epot, E,
+            Alin, Blin and M_flat, C_flat, G_flat, F_flat, Alin_flat,
+            Blin_flat
+        """
+        x_args = list(self.x) + self.par_sym
+        lin_args = list(self.x0) + list(self.u0) + self.par_sym
+        sources = {}
+        for name, mat in [("M", self.M), ("C", self.C), ("G", self.G),
+                          ("F", self.F), ("Ekin", self.Ekin),
+                          ("Epot", self.Epot), ("E", self.E)]:
+            sources[name] = lambdify_to_source(x_args, mat)
+        sources["Alin"] = lambdify_to_source(lin_args, self.Alin)
+        sources["Blin"] = lambdify_to_source(lin_args, self.Blin)
+
+        for name, mat in [("M", self.M), ("C", self.C), ("G", self.G),
+                          ("F", self.F)]:
+            sources[name+"_flat"] = lambdify_to_source(x_args, list(mat))
+        for name, mat in [("Alin", self.Alin), ("Blin", self.Blin)]:
+            sources[name+"_flat"] = lambdify_to_source(lin_args, list(mat))
+        return sources
+
+    def evaluate_batch(self, name, args, P=None):
+        """
+        evaluate a numeric function of this plant for many states and/or
+        many parameter sets in one vectorized call
+
+        Parameters
+        ----------
+        name : string
+            name of the function, one of M_flat, C_flat, G_flat, F_flat,
+            Alin_flat, Blin_flat, Ekin, Epot, E
+        args : array_like, shape=(N, k) or shape=(k,)
+            function arguments, states (k=4) or for the linearization
+            states and actuations (k=6)
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, n_out) for the _flat functions, shape=(N,) otherwise
+        """
+        args = np.asarray(args, dtype=float)
+        if P is None:
+            P = self.parameter_vector()
+        P = np.asarray(P, dtype=float)
+        N = np.broadcast_shapes(args.shape[:-1], P.shape[:-1])
+        args = np.broadcast_to(args, N + args.shape[-1:])
+        P = np.broadcast_to(P, N + P.shape[-1:])
+
+        res = self.numeric_functions[name](
+            *np.moveaxis(args, -1, 0), *np.moveaxis(P, -1, 0))
+        if name.endswith("_flat"):
+            return np.stack(np.broadcast_arrays(*res), axis=-1)
+        return np.broadcast_to(res, N).astype(float)
+
+    def mass_matrix_batch(self, X, P=None):
+        """
+        mass matrices for many states and/or parameter sets
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4) or shape=(4,)
+            states of the double pendulum
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, 2, 2)
+        """
+        M = self.evaluate_batch("M_flat", X, P)
+        return M.reshape(M.shape[:-1] + (2, 2))
+
+    def forward_dynamics_batch(self, X, U, P=None):
+        """
+        forward dynamics for many states, actuations and/or parameter sets
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4)
+            states of the double pendulum
+        U : array_like, shape=(N, 2)
+            actuation inputs/motor torques
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array, shape=(N, 2)
+            joint accelerations
+        """
+        X = np.asarray(X, dtype=float)
+        U = np.asarray(U, dtype=float)
+
+        M = self.mass_matrix_batch(X, P)
+        C = self.evaluate_batch("C_flat", X, P)
+        C = C.reshape(C.shape[:-1] + (2, 2))
+        G = self.evaluate_batch("G_flat", X, P)
+        F = self.evaluate_batch("F_flat", X, P)
+
+        vel = np.broadcast_to(X[..., self.dof:], G.shape)
+        force = (U.dot(self.B.T)
+                 - np.einsum("...ij,...j->...i", C, vel) + G - F)
+        return np.linalg.solve(M, force[..., np.newaxis])[..., 0]
+
+    def rhs_batch(self, t, X, U, P=None):
+        """
+        integrand of the equations of motion for many states, actuations
+        and/or parameter sets
+
+        Parameters
+        ----------
+        t : float,
+            time, units=[s], not used
+        X : array_like, shape=(N, 4)
+            states of the double pendulum
+        U : array_like, shape=(N, 2)
+            actuation inputs/motor torques
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, 4), dtype=float
+            integrand, [vel1, vel2, acc1, acc2]
+        """
+        X = np.asarray(X, dtype=float)
+        accn = self.forward_dynamics_batch(X, U, P)
+        vel = np.broadcast_to(X[..., self.dof:], accn.shape)
+        return np.concatenate([vel, accn], axis=-1)
+
+    def linear_matrices_batch(self, X0, U0, P=None):
+        """
+        A- and B-matrices of the linearized dynamics for many
+        linearization points and/or parameter sets
+
+        Parameters
+        ----------
+        X0 : array_like, shape=(N, 4)
+            states of the double pendulum
+        U0 : array_like, shape=(N, 2)
+            actuation inputs/motor torques
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, 4, 4),
+            A-matrices
+        numpy array
+            shape=(N, 4, 2),
+            B-matrices
+        """
+        X0 = np.asarray(X0, dtype=float)
+        U0 = np.asarray(U0, dtype=float)
+        N = np.broadcast_shapes(X0.shape[:-1], U0.shape[:-1])
+        XU = np.concatenate([np.broadcast_to(X0, N + X0.shape[-1:]),
+                             np.broadcast_to(U0, N + U0.shape[-1:])], axis=-1)
+        A = self.evaluate_batch("Alin_flat", XU, P)
+        B = self.evaluate_batch("Blin_flat", XU, P)
+        return (A.reshape(A.shape[:-1] + (4, 4)),
+                B.reshape(B.shape[:-1] + (4, 2)))
+
+    def linear_matrices_discrete_batch(self, X0, U0, dt, method="euler",
+                                       P=None):
+        """
+        discrete A- and B-matrices of the linearized dynamics for many
+        linearization points and/or parameter sets
+
+        Parameters
+        ----------
+        X0 : array_like, shape=(N, 4)
+            states of the double pendulum
+        U0 : array_like, shape=(N, 2)
+            actuation inputs/motor torques
+        dt : float
+            timestep, unit=[s]
+        method : string
+            discretization
+            "euler" : first order, A_d = I + dt*A, B_d = dt*B
+                      (as linear_matrices_discrete)
+            "runge_kutta" : exact Jacobians of one classical Runge-Kutta
+                            step (as used by the Simulator) with constant
+                            actuation
+            default="euler"
+        P : array_like, shape=(N, 15) or shape=(15,), optional
+            model parameters in the order of par_names,
+            default=None uses the parameters of this plant
+
+        Returns
+        -------
+        numpy array
+            shape=(N, 4, 4),
+            discrete A-matrices
+        numpy array
+            shape=(N, 4, 2),
+            discrete B-matrices
+        """
+        X0 = np.asarray(X0, dtype=float)
+        U0 = np.asarray(U0, dtype=float)
+        Ac, Bc = self.linear_matrices_batch(X0, U0, P)
+        eye = np.identity(Ac.shape[-1])
+
+        if method == "euler":
+            return eye + dt*Ac, dt*Bc
+        elif method != "runge_kutta":
+            raise NotImplementedError(
+                f"Sorry, the discretization {method} is not implemented.")
+
+        # chain rule through the stages
+        # k_i = f(x + c_i*dt*k_{i-1}, u)
+        k = self.rhs_batch(0., X0, U0, P)
+        Jx, Ju = Ac, Bc
+        sum_x = Jx.copy()
+        sum_u = Ju.copy()
+        for c, w in [(0.5, 2.), (0.5, 2.), (1., 1.)]:
+            Xs = X0 + c*dt*k
+            As, Bs = self.linear_matrices_batch(Xs, U0, P)
+            Jx = As + c*dt*(As @ Jx)
+            Ju = Bs + c*dt*(As @ Ju)
+            sum_x += w*Jx
+            sum_u += w*Ju
+            if c != 1.:
+                k = self.rhs_batch(0., Xs, U0, P)
+        return eye + dt/6.*sum_x, dt/6.*sum_u
+
     def lambdify_matrices(self):
         """
         function to lambdify the symbolic matrices of this plant to make them
-        functions of state x and actuation u
-        """
-        M = self.replace_parameters(self.M)
-        C = self.replace_parameters(self.C)
-        G = self.replace_parameters(self.G)
-        F = self.replace_parameters(self.F)
-        Ekin = self.replace_parameters(self.Ekin)
-        Epot = self.replace_parameters(self.Epot)
-        E = self.replace_parameters(self.E)
-        Alin = self.replace_parameters(self.Alin)
-        Blin = self.replace_parameters(self.Blin)
-
-        self.M_la = lambdify(self.x, M)
-        self.C_la = lambdify(self.x, C)
-        self.G_la = lambdify(self.x, G)
-        self.F_la = lambdify(self.x, F)
-        self.Ekin_la = lambdify(self.x, Ekin)
-        self.Epot_la = lambdify(self.x, Epot)
-        self.E_la = lambdify(self.x, E)
-        self.Alin_la = lambdify((self.x0, self.u0), Alin)
-        self.Blin_la = lambdify((self.x0, self.u0), Blin)
+        functions of state x and actuation u.
+        Binds the parameter dependent numeric functions to the model
+        parameters of this plant.
+        """
+        pars = self.parameter_vector()
+        fn = self.numeric_functions
+
+        def state_function(f):
+            return lambda q1, q2, qd1, qd2: f(q1, q2, qd1, qd2, *pars)
+
+        def lin_function(f):
+            return lambda x0, u0: f(*x0, *u0, *pars)
+
+        self.M_la = state_function(fn["M"])
+        self.C_la = state_function(fn["C"])
+        self.G_la = state_function(fn["G"])
+        self.F_la = state_function(fn["F"])
+        self.Ekin_la = state_function(fn["Ekin"])
+        self.Epot_la = state_function(fn["Epot"])
+        self.E_la = state_function(fn["E"])
+        self.Alin_la = lin_function(fn["Alin"])
+        self.Blin_la = lin_function(fn["Blin"])
 
     def forward_kinematics(self, pos):
         """
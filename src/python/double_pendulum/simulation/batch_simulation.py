@@ -0,0 +1,521 @@
+import copy
+import numpy as np
+
+
+class BatchSimulator:
+    """
+    BatchSimulator class
+    simulates M rollouts of the double pendulum in lockstep. The states of
+    all rollouts are stored in one (M, 4) array and are integrated with
+    one vectorized call of the plant's rhs_batch per integration stage.
+
+    Every rollout can have its own model parameters, process noise,
+    measurement noise, measurement delay, motor noise and motor
+    responsiveness. The noise, delay and motor models are the same as in
+    the Simulator class. Velocity filters of the Simulator are not
+    supported, controllers can use their own filters.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum or DoublePendulumPlant object
+        A plant object containing the kinematics and dynamics of the
+        double pendulum. The plant has to provide rhs_batch.
+    n_rollouts : int
+        number of rollouts M
+        (Default value=1)
+    """
+
+    def __init__(self, plant, n_rollouts=1):
+        self.plant = plant
+        self.n_rollouts = n_rollouts
+
+        self.x = np.zeros((n_rollouts, 2 * self.plant.dof))
+        self.t = 0.0
+
+        self.reset()
+
+    def set_state(self, t, x):
+        """
+        Set the time and state of all rollouts
+
+        Parameters
+        ----------
+        t : float
+            time, units=[s]
+        x : array_like, shape=(M, 4) or shape=(4,), dtype=float,
+            state of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        """
+        self.x = np.array(
+            np.broadcast_to(x, (self.n_rollouts, 2 * self.plant.dof)), dtype=float
+        )
+        self.t = t
+
+    def get_state(self):
+        """
+        Get the states of all rollouts
+
+        Returns
+        -------
+        float
+            time, unit=[s]
+        numpy_array
+            shape=(M, 4)
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        """
+        return self.t, self.x
+
+    def _per_rollout(self, value, dim):
+        # broadcast a per rollout parameter to shape (M, dim) or (M,)
+        shape = (self.n_rollouts,) if dim is None else (self.n_rollouts, dim)
+        return np.array(np.broadcast_to(value, shape), dtype=float)
+
+    def set_plant_parameters(self, P=None):
+        """
+        Set the model parameters of the rollouts
+
+        Parameters
+        ----------
+        P : array_like, shape=(M, 15) or shape=(15,), optional
+            model parameters in the order of plant.par_names
+            [m1, m2, l1, l2, r1, r2, I1, I2, g, b1, b2, cf1, cf2, Ir, gr],
+            None uses the parameters of the plant for all rollouts
+            (Default value=None)
+        """
+        if P is None:
+            self.plant_parameters = None
+        else:
+            self.plant_parameters = self._per_rollout(P, len(self.plant.par_names))
+
+    def set_process_noise(self, process_noise_sigmas=[0.0, 0.0, 0.0, 0.0]):
+        """
+        Set parameters for process noise (Gaussian)
+
+        Parameters
+        ----------
+        process_noise_sigmas : array_like
+            shape=(M, 4) or shape=(4,)
+            Gaussian standard deviations for the process noise.
+            (Default value = [0., 0., 0., 0.])
+        """
+        self.process_noise_sigmas = self._per_rollout(process_noise_sigmas, 4)
+
+    def set_measurement_parameters(
+        self,
+        C=np.eye(4),
+        D=np.zeros((4, 2)),
+        meas_noise_sigmas=[0.0, 0.0, 0.0, 0.0],
+        delay=0.0,
+        delay_mode="None",
+    ):
+        """
+        Set parameters for state measuremts
+
+        The state measurement is described by
+        x_meas(t) = C*x(t-delay) + D*u(t-delay) + N(sigma)
+
+        Parameters
+        ----------
+        C : numpy_array
+            state-state measurement matrix
+            (Default value = np.eye(4))
+        D : numpy_array
+            state-torque measurement matrix
+            (Default value = np.zeros((4, 2))
+        meas_noise_sigmas : array_like
+            shape=(M, 4) or shape=(4,)
+            Standard deviations of Gaussian measurement noise
+            (Default value = [0., 0., 0., 0.])
+        delay : float or array_like
+            shape=(M,) for individual delays,
+            time delay of measurements, unit=[s]
+             (Default value = 0.0)
+        delay_mode : string
+            string determining what state variables are delayed:
+            "None": no delay
+            "vel": velocity measurements are delayed
+            "posvel": position and velocity measurements are delayed
+             (Default value = "None")
+        """
+        self.meas_C = np.asarray(C)
+        self.meas_D = np.asarray(D)
+        self.meas_noise_sigmas = self._per_rollout(meas_noise_sigmas, 4)
+        self.delay = self._per_rollout(delay, None)
+        self.delay_mode = delay_mode
+
+    def set_filter_parameters(self, meas_noise_cut=0.0):
+        """
+        Set filter parameters for filtering raw measurments
+
+        Parameters
+        ----------
+        meas_noise_cut : float
+            velocity measurements smaller than this value will be set to 0.
+            (they are assumed to be noise)
+            For meas_noise_cut==0.0, the measurement is not cut
+            (Default value = 0.0)
+        """
+        self.meas_noise_cut = meas_noise_cut
+
+    def set_motor_parameters(self, u_noise_sigmas=[0.0, 0.0], u_responsiveness=1.0):
+        """
+        Set parameters for the motors
+
+        The applied motor torque (u_out) is related to the commanded torque
+        (u) and the last torque output (u_last) via
+
+        u_out = u_responsiveness*u + (1-u_responsiveness)*u_last + N(sigma)
+
+        Parameters
+        ----------
+        u_noise_sigmas : array_like
+            shape=(M, 2) or shape=(2,)
+            Standard deviation of the gaussian noise for the torque produced by
+            the motors
+            (Default value = [0., 0.])
+        u_responsiveness : float or array_like
+            shape=(M,) for individual values,
+            resonsiveness of the motors
+            (Default value = 1.)
+        """
+        self.u_noise_sigmas = self._per_rollout(u_noise_sigmas, 2)
+        self.u_responsiveness = self._per_rollout(u_responsiveness, None)
+
+    def reset(self):
+        """
+        Reset the BatchSimulator
+        Resets
+            - the plant parameters of the rollouts
+            - the process noise
+            - the measurement parameters
+            - the motor parameters
+        """
+        self.set_plant_parameters()
+        self.set_process_noise()
+        self.set_measurement_parameters()
+        self.set_filter_parameters()
+        self.set_motor_parameters()
+
+    def rhs(self, t, x, tau):
+        """
+        integrand of the equations of motion of all rollouts
+
+        Parameters
+        ----------
+        t : float
+            time, unit=[s]
+        x : array_like, shape=(M, 4), dtype=float,
+            states of the double pendulum
+        tau : array_like, shape=(M, 2), dtype=float
+            actuation inputs/motor torques
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 4), dtype=float
+        """
+        return self.plant.rhs_batch(t, x, tau, self.plant_parameters)
+
+    def euler_integrator(self, y, dt, t, tau):
+        """
+        Performs a Euler integration step for all rollouts
+
+        Parameters
+        ----------
+        y : array_like, shape=(M, 4), dtype=float,
+            states of the double pendulum
+        dt : float
+            timestep, unit=[s]
+        t : float
+            time, unit=[s]
+        tau : array_like, shape=(M, 2), dtype=float
+            actuation inputs/motor torques
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 4), dtype=float,
+            state increments per unit time
+        """
+        return self.rhs(t, y, tau)
+
+    def runge_integrator(self, y, dt, t, tau):
+        """
+        Performs a Runge-Kutta integration step for all rollouts
+
+        Parameters
+        ----------
+        y : array_like, shape=(M, 4), dtype=float,
+            states of the double pendulum
+        dt : float
+            timestep, unit=[s]
+        t : float
+            time, unit=[s]
+        tau : array_like, shape=(M, 2), dtype=float
+            actuation inputs/motor torques
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 4), dtype=float,
+            state increments per unit time
+        """
+        k1 = self.rhs(t, y, tau)
+        k2 = self.rhs(t + 0.5 * dt, y + 0.5 * dt * k1, tau)
+        k3 = self.rhs(t + 0.5 * dt, y + 0.5 * dt * k2, tau)
+        k4 = self.rhs(t + dt, y + dt * k3, tau)
+        return (k1 + 2.0 * (k2 + k3) + k4) / 6.0
+
+    def step(self, tau, dt, integrator="runge_kutta"):
+        """
+        Performs a simulation step of all rollouts with the specified
+        integrator. Also adds process noise to the integration result.
+
+        Parameters
+        ----------
+        tau : array_like, shape=(M, 2), dtype=float
+            actuation inputs/motor torques,
+            units=[Nm]
+        dt : float
+            timestep, unit=[s]
+        integrator : string
+            string determining the integration method
+            "euler" : Euler integrator
+            "runge_kutta" : Runge Kutta integrator
+             (Default value = "runge_kutta")
+        """
+        tau = np.clip(
+            tau,
+            -np.asarray(self.plant.torque_limit),
+            np.asarray(self.plant.torque_limit),
+        )
+
+        if integrator == "runge_kutta":
+            self.x = self.x + dt * self.runge_integrator(self.x, dt, self.t, tau)
+        elif integrator == "euler":
+            self.x = self.x + dt * self.euler_integrator(self.x, dt, self.t, tau)
+        else:
+            raise NotImplementedError(
+                f"Sorry, the integrator {integrator} is not implemented."
+            )
+        # process noise
+        self.x = np.random.normal(self.x, self.process_noise_sigmas)
+
+        self.t += dt
+        return tau
+
+    def get_control_u(self, controller, x, t):
+        """
+        Get the control signals of all rollouts.
+
+        Controllers which implement get_control_output_batch(x, t) with
+        x of shape (M, 4) are queried once per step. Otherwise the
+        controllers are queried one rollout at a time.
+
+        Parameters
+        ----------
+        controller : Controller object, list of Controller objects or None
+            batch controller, or list of M controllers (one per rollout).
+            If None, motor torques are set to 0.
+        x : array_like, shape=(M, 4), dtype=float,
+            states of the double pendulum
+        t : float,
+            time, units=[s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 2), dtype=float
+            actuation inputs/motor torques,
+            units=[Nm]
+        """
+        if controller is None:
+            return np.zeros((self.n_rollouts, self.plant.n_actuators))
+        if hasattr(controller, "get_control_output_batch"):
+            return np.asarray(controller.get_control_output_batch(x=x, t=t))
+        return np.array(
+            [c.get_control_output(x=x[i], t=t) for i, c in enumerate(controller)],
+            dtype=float,
+        )
+
+    def get_measurement(self, X_hist, U_hist, k):
+        """
+        Get measurements of all rollouts from the recorded states
+
+        The state measurement is described by
+        x_meas(t) = C*x(t-delay) + D*u(t-delay) + N(sigma)
+
+        Parameters
+        ----------
+        X_hist : numpy_array, shape=(M, N+1, 4)
+            recorded states
+        U_hist : numpy_array, shape=(M, N, 2)
+            recorded applied torques
+        k : int
+            index of the current state
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 4), dtype=float,
+            measured states of the double pendulum
+        """
+        rollouts = np.arange(self.n_rollouts)
+        x_meas = np.copy(self.x)
+
+        # delay
+        n_delay = (self.delay / self.dt).astype(int) + 1
+        x_delayed = X_hist[rollouts, np.maximum(k + 1 - n_delay, 0)]
+        if self.delay_mode == "posvel":
+            x_meas = x_delayed
+        elif self.delay_mode == "vel":
+            x_meas[:, 2:] = x_delayed[:, 2:]
+
+        u_index = k - n_delay
+        u = np.where(
+            (u_index >= 0)[:, np.newaxis],
+            U_hist[rollouts, np.maximum(u_index, 0)],
+            0.0,
+        )
+
+        x_meas = x_meas.dot(self.meas_C.T) + u.dot(self.meas_D.T)
+
+        # sensor noise
+        return np.random.normal(x_meas, self.meas_noise_sigmas)
+
+    def filter_measurement(self, x):
+        """
+        Filter the measured states (velocity cut).
+
+        Parameters
+        ----------
+        x : array_like, shape=(M, 4), dtype=float,
+            measured states of the double pendulum
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 4), dtype=float,
+            filtered states of the double pendulum
+        """
+        x_filt = np.copy(x)
+        if self.meas_noise_cut > 0.0:
+            x_filt[:, 2:] = np.where(
+                np.abs(x_filt[:, 2:]) < self.meas_noise_cut, 0, x_filt[:, 2:]
+            )
+        return x_filt
+
+    def get_real_applied_u(self, u, last_u):
+        """
+        Get the torques that the motors actually apply.
+
+        u_out = u_responsiveness*u + (1-u_responsiveness)*u_last + N(sigma)
+
+        Parameters
+        ----------
+        u : array_like, shape=(M, 2), dtype=float
+            desired actuation inputs/motor torques,
+            units=[Nm]
+        last_u : array_like, shape=(M, 2), dtype=float
+            last applied actuation inputs/motor torques,
+            units=[Nm]
+
+        Returns
+        -------
+        numpy_array
+            shape=(M, 2), dtype=float
+            actual actuation inputs/motor torques,
+            units=[Nm]
+        """
+        nu = last_u + self.u_responsiveness[:, np.newaxis] * (u - last_u)
+        nu = np.random.normal(nu, self.u_noise_sigmas)
+        return np.clip(
+            nu,
+            -np.asarray(self.plant.torque_limit),
+            np.asarray(self.plant.torque_limit),
+        )
+
+    def simulate(self, t0, x0, tf, dt, controller=None, integrator="runge_kutta"):
+        """
+        Simulate all rollouts for a time period
+
+        Parameters
+        ----------
+        t0 : float,
+            start time, units=[s]
+        x0 : array_like, shape=(M, 4) or shape=(4,), dtype=float,
+            initial states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        tf : float
+            final time, units=[s]
+        dt : float
+            timestep, unit=[s]
+        controller : Controller object, list of Controller objects or None
+            Controller with get_control_output_batch, or a list of M
+            controllers. A single controller without batch support
+            is copied for every rollout.
+            If None, motor torques are set to 0.
+             (Default value = None)
+        integrator : string
+            string determining the integration method
+            "euler" : Euler integrator
+            "runge_kutta" : Runge Kutta integrator
+             (Default value = "runge_kutta")
+
+        Returns
+        -------
+        numpy_array
+            time points, unit=[s]
+            shape=(N+1,)
+        numpy_array
+            shape=(M, N+1, 4)
+            states, units=[rad, rad, rad/s, rad/s]
+            order=[angle1, angle2, velocity1, velocity2]
+        numpy_array
+            shape=(M, N, 2)
+            actuations/motor torques
+            order=[u1, u2],
+            units=[Nm]
+        """
+        if controller is not None and not hasattr(
+            controller, "get_control_output_batch"
+        ):
+            if not isinstance(controller, (list, tuple)):
+                controller = [
+                    copy.deepcopy(controller) for _ in range(self.n_rollouts)
+                ]
+            if len(controller) != self.n_rollouts:
+                raise ValueError(
+                    f"Expected {self.n_rollouts} controllers, got {len(controller)}."
+                )
+
+        self.set_state(t0, x0)
+        self.dt = dt
+
+        # same number of steps as Simulator.simulate
+        T = [t0]
+        while T[-1] < tf:
+            T.append(T[-1] + dt)
+        n_steps = len(T) - 1
+
+        X_hist = np.empty((self.n_rollouts, n_steps + 1, 2 * self.plant.dof))
+        U_hist = np.empty((self.n_rollouts, n_steps, self.plant.n_actuators))
+        X_hist[:, 0] = self.x
+        last_u = np.zeros((self.n_rollouts, self.plant.n_actuators))
+
+        for k in range(n_steps):
+            x_meas = self.get_measurement(X_hist, U_hist, k)
+            x_filt = self.filter_measurement(x_meas)
+            u = self.get_control_u(controller, x_filt, self.t)
+            nu = self.get_real_applied_u(u, last_u)
+            last_u = self.step(nu, dt, integrator=integrator)
+
+            U_hist[:, k] = last_u
+            X_hist[:, k + 1] = self.x
+            self.t = T[k + 1]
+
+        return np.asarray(T), X_hist, U_hist
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class ArrayRecorder:
+    """
+    ArrayRecorder class
+    records data points of a fixed shape in a preallocated numpy array.
+    The array grows geometrically if the capacity is exceeded.
+    The recorded data is accessible as a zero-copy view.
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        shape of a single data point
+        (Default value=())
+    capacity : int, optional
+        number of data points to preallocate
+        (Default value=0)
+    dtype : numpy dtype, optional
+        (Default value=float)
+    """
+
+    def __init__(self, shape=(), capacity=0, dtype=float):
+        self.shape = tuple(shape)
+        self.buffer = np.empty((max(int(capacity), 1),) + self.shape, dtype=dtype)
+        self.n = 0
+
+    def reserve(self, capacity):
+        """
+        Make sure that the recorder can hold capacity data points without
+        growing.
+
+        Parameters
+        ----------
+        capacity : int
+            number of data points
+        """
+        if capacity > len(self.buffer):
+            buffer = np.empty((int(capacity),) + self.shape, dtype=self.buffer.dtype)
+            buffer[: self.n] = self.buffer[: self.n]
+            self.buffer = buffer
+
+    def append(self, value):
+        """
+        Record a data point
+
+        Parameters
+        ----------
+        value : array_like
+            data point with the shape of the recorder
+        """
+        if self.n == len(self.buffer):
+            self.reserve(2 * len(self.buffer))
+        self.buffer[self.n] = value
+        self.n += 1
+
+    def view(self):
+        """
+        Get the recorded data
+
+        Returns
+        -------
+        numpy_array
+            shape=(N,) + shape
+            zero-copy view of the recorded data points
+        """
+        return self.buffer[: self.n]
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+
+class RingRecorder:
+    """
+    RingRecorder class
+    records the last data points of a fixed shape in a preallocated
+    numpy array (ring buffer). Older data points are overwritten.
+    Has the same interface as the ArrayRecorder.
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        shape of a single data point
+        (Default value=())
+    length : int, optional
+        number of data points to keep
+        (Default value=1)
+    dtype : numpy dtype, optional
+        (Default value=float)
+    """
+
+    def __init__(self, shape=(), length=1, dtype=float):
+        self.shape = tuple(shape)
+        self.buffer = np.empty((max(int(length), 1),) + self.shape, dtype=dtype)
+        self.n = 0
+
+    def append(self, value):
+        """
+        Record a data point
+
+        Parameters
+        ----------
+        value : array_like
+            data point with the shape of the recorder
+        """
+        self.buffer[self.n % len(self.buffer)] = value
+        self.n += 1
+
+    def view(self):
+        """
+        Get the recorded data
+
+        Returns
+        -------
+        numpy_array
+            shape=(N,) + shape
+            the last N recorded data points in chronological order
+            (a copy once the buffer has wrapped around)
+        """
+        if self.n <= len(self.buffer):
+            return self.buffer[: self.n]
+        return np.roll(self.buffer, -(self.n % len(self.buffer)), axis=0)
+
+    def __len__(self):
+        return min(self.n, len(self.buffer))
+
+    def __getitem__(self, index):
+        return self.view()[index]
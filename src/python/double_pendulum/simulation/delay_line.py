@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class DelayLine:
+    """
+    DelayLine class
+    ring buffer holding the latest data points of a fixed shape.
+    Appending and reading a delayed data point are O(1).
+
+    Parameters
+    ----------
+    shape : tuple, optional
+        shape of a single data point
+        (Default value=())
+    length : int, optional
+        number of data points held in the buffer
+        (Default value=1)
+    dtype : numpy dtype, optional
+        (Default value=float)
+    """
+
+    def __init__(self, shape=(), length=1, dtype=float):
+        self.shape = tuple(shape)
+        self.buffer = np.zeros((max(int(length), 1),) + self.shape, dtype=dtype)
+        self.index = 0  # position of the next write
+        self.count = 0  # number of appended data points
+
+    def resize(self, length):
+        """
+        Increase the number of data points held in the buffer.
+        The held data points are kept.
+
+        Parameters
+        ----------
+        length : int
+            number of data points
+        """
+        if length <= len(self.buffer):
+            return
+        n = len(self)
+        buffer = np.zeros((int(length),) + self.shape, dtype=self.buffer.dtype)
+        # oldest first
+        buffer[:n] = self.buffer[(self.index - np.arange(n, 0, -1)) % len(self.buffer)]
+        self.buffer = buffer
+        self.index = n
+
+    def append(self, value):
+        """
+        Append a data point. Overwrites the oldest data point if the
+        buffer is full.
+
+        Parameters
+        ----------
+        value : array_like
+            data point with the shape of the delay line
+        """
+        self.buffer[self.index] = value
+        self.index = (self.index + 1) % len(self.buffer)
+        self.count += 1
+
+    def delayed(self, n):
+        """
+        Get the n-th latest data point (n=1: latest data point).
+        If less than n data points are held, the oldest data point is
+        returned.
+
+        Parameters
+        ----------
+        n : int
+            delay in number of data points, n >= 1
+
+        Returns
+        -------
+        numpy_array
+            view of the data point
+        """
+        n = min(n, len(self))
+        return self.buffer[(self.index - n) % len(self.buffer)]
+
+    def __len__(self):
+        return min(self.count, len(self.buffer))
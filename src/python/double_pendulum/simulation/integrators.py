@@ -0,0 +1,334 @@
+import numpy as np
+
+
+# step size controller constants
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.0
+
+
+class EmbeddedRungeKutta:
+    """
+    EmbeddedRungeKutta class
+    explicit embedded Runge-Kutta method with error controlled step size.
+    integrate advances the state over a control interval with adaptive
+    substeps. The last substep is shortened to end exactly at the end of
+    the interval, so that the torque can change at the control ticks.
+    The method's interpolant (dense output) is available for times inside
+    the last integrated interval.
+
+    The Butcher tableau is defined by the class attributes
+    A, B, C (method), E (error estimate, B - B_hat, with an entry for
+    the first same as last stage) and P (dense output).
+
+    Parameters
+    ----------
+    rtol : float
+        relative tolerance of the local error
+        (Default value=1e-6)
+    atol : float
+        absolute tolerance of the local error
+        (Default value=1e-8)
+    max_step : float
+        maximum substep size, unit=[s]
+        (Default value=np.inf)
+    """
+
+    A = np.zeros((0, 0))
+    B = np.zeros(0)
+    C = np.zeros(0)
+    E = np.zeros(0)
+    P = np.zeros((0, 0))
+    order = 0
+    error_estimator_order = 0
+
+    def __init__(self, rtol=1e-6, atol=1e-8, max_step=np.inf):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.n_stages = len(self.B)
+        self.error_exponent = -1.0 / (self.error_estimator_order + 1)
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the step size and the substep counts
+        """
+        self.h = None
+        self.segments = []
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.n_rhs = 0
+
+    def get_statistics(self):
+        """
+        Get the substep counts since the last reset
+
+        Returns
+        -------
+        dict
+            n_accepted: number of accepted substeps
+            n_rejected: number of rejected substeps
+            n_rhs: number of rhs evaluations
+        """
+        return {
+            "n_accepted": self.n_accepted,
+            "n_rejected": self.n_rejected,
+            "n_rhs": self.n_rhs,
+        }
+
+    def substep(self, fun, t, y, f, h, K):
+        """
+        Perform a single Runge-Kutta step
+
+        Parameters
+        ----------
+        fun : function
+            rhs of the ode, fun(t, y)
+        t : float
+            time, unit=[s]
+        y : numpy_array
+            state at time t
+        f : numpy_array
+            fun(t, y)
+        h : float
+            step size, unit=[s]
+        K : numpy_array, shape=(n_stages+1, n)
+            storage for the stages
+
+        Returns
+        -------
+        numpy_array
+            state at time t+h
+        numpy_array
+            fun(t+h, y_new)
+        numpy_array
+            local error estimate
+        """
+        K[0] = f
+        for s in range(1, self.n_stages):
+            dy = np.dot(K[:s].T, self.A[s, :s]) * h
+            K[s] = fun(t + self.C[s] * h, y + dy)
+        y_new = y + h * np.dot(K[:-1].T, self.B)
+        f_new = fun(t + h, y_new)
+        K[-1] = f_new
+        return y_new, f_new, h * np.dot(K.T, self.E)
+
+    def integrate(self, fun, t, y, dt):
+        """
+        Integrate the ode from t to t+dt with adaptive substeps
+
+        Parameters
+        ----------
+        fun : function
+            rhs of the ode, fun(t, y)
+        t : float
+            start time, unit=[s]
+        y : array_like
+            state at time t
+        dt : float
+            length of the interval, unit=[s]
+
+        Returns
+        -------
+        numpy_array
+            state at time t+dt
+        """
+        t_end = t + dt
+        y = np.asarray(y, dtype=float)
+        f = fun(t, y)
+        self.n_rhs += 1
+
+        h = min(dt if self.h is None else self.h, self.max_step)
+        h_min = 1e-10 * dt
+        K = np.empty((self.n_stages + 1, len(y)))
+        self.segments = []
+
+        while t_end - t > 1e-12 * dt:
+            h_step = min(h, t_end - t)
+            y_new, f_new, err = self.substep(fun, t, y, f, h_step, K)
+            self.n_rhs += self.n_stages
+
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+            err_norm = np.sqrt(np.mean((err / scale) ** 2))
+
+            if err_norm <= 1.0 or h_step <= h_min:
+                if err_norm == 0.0:
+                    factor = MAX_FACTOR
+                else:
+                    factor = min(MAX_FACTOR, SAFETY * err_norm**self.error_exponent)
+                if not np.isfinite(factor):
+                    factor = 1.0
+                self.segments.append((t, h_step, y, K.copy()))
+                self.n_accepted += 1
+
+                if h_step < h:
+                    # shortened last substep, keep the larger proposal
+                    h = max(h, h_step * factor)
+                else:
+                    h = h_step * factor
+                h = min(h, self.max_step)
+                t += h_step
+                y = y_new
+                f = f_new
+            else:
+                self.n_rejected += 1
+                h = h_step * max(MIN_FACTOR, SAFETY * err_norm**self.error_exponent)
+                h = max(h, h_min)
+
+        self.h = h
+        return y
+
+    def dense_output(self, t):
+        """
+        Evaluate the interpolant of the last integrated interval
+
+        Parameters
+        ----------
+        t : float
+            time inside the last integrated interval, unit=[s]
+
+        Returns
+        -------
+        numpy_array
+            interpolated state at time t
+        """
+        for t0, h, y0, K in self.segments:
+            if t <= t0 + h:
+                break
+        theta = (t - t0) / h
+        powers = theta ** np.arange(1, self.P.shape[1] + 1)
+        return y0 + h * np.dot(K.T, np.dot(self.P, powers))
+
+
+class DormandPrince54(EmbeddedRungeKutta):
+    """
+    Dormand-Prince 5(4) method with 4th order dense output
+    (first same as last, 6 rhs evaluations per substep)
+    """
+
+    A = np.array(
+        [
+            [0, 0, 0, 0, 0],
+            [1 / 5, 0, 0, 0, 0],
+            [3 / 40, 9 / 40, 0, 0, 0],
+            [44 / 45, -56 / 15, 32 / 9, 0, 0],
+            [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0],
+            [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+        ]
+    )
+    B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+    C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+    E = np.array(
+        [
+            -71 / 57600,
+            0,
+            71 / 16695,
+            -71 / 1920,
+            17253 / 339200,
+            -22 / 525,
+            1 / 40,
+        ]
+    )
+    P = np.array(
+        [
+            [
+                1,
+                -8048581381 / 2820520608,
+                8663915743 / 2820520608,
+                -12715105075 / 11282082432,
+            ],
+            [0, 0, 0, 0],
+            [
+                0,
+                131558114200 / 32700410799,
+                -68118460800 / 10900136933,
+                87487479700 / 32700410799,
+            ],
+            [
+                0,
+                -1754552775 / 470086768,
+                14199869525 / 1410260304,
+                -10690763975 / 1880347072,
+            ],
+            [
+                0,
+                127303824393 / 49829197408,
+                -318862633887 / 49829197408,
+                701980252875 / 199316789632,
+            ],
+            [
+                0,
+                -282668133 / 205662961,
+                2019193451 / 616988883,
+                -1453857185 / 822651844,
+            ],
+            [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+        ]
+    )
+    order = 5
+    error_estimator_order = 4
+
+
+class BogackiShampine32(EmbeddedRungeKutta):
+    """
+    Bogacki-Shampine 3(2) method with cubic Hermite dense output
+    (first same as last, 3 rhs evaluations per substep)
+    """
+
+    A = np.array([[0, 0, 0], [1 / 2, 0, 0], [0, 3 / 4, 0]])
+    B = np.array([2 / 9, 1 / 3, 4 / 9])
+    C = np.array([0, 1 / 2, 3 / 4])
+    E = np.array([5 / 72, -1 / 12, -1 / 9, 1 / 8])
+    P = np.array(
+        [
+            [1, -4 / 3, 5 / 9],
+            [0, 1, -2 / 3],
+            [0, 4 / 3, -8 / 9],
+            [0, -1, 1],
+        ]
+    )
+    order = 3
+    error_estimator_order = 2
+
+
+integrators = {}
+
+
+def register_integrator(name, integrator_class):
+    """
+    Register an adaptive integrator, so that it can be used with
+    Simulator.step and Simulator.simulate
+
+    Parameters
+    ----------
+    name : string
+        name of the integrator, used as integrator argument of the Simulator
+    integrator_class : class
+        subclass of EmbeddedRungeKutta
+    """
+    integrators[name] = integrator_class
+
+
+def get_integrator(name, **kwargs):
+    """
+    Create an adaptive integrator from the registry
+
+    Parameters
+    ----------
+    name : string
+        name of the integrator
+    **kwargs
+        parameters of the integrator (rtol, atol, max_step)
+
+    Returns
+    -------
+    EmbeddedRungeKutta object
+    """
+    if name not in integrators:
+        raise NotImplementedError(f"Sorry, the integrator {name} is not implemented.")
+    return integrators[name](**kwargs)
+
+
+register_integrator("dopri5", DormandPrince54)
+register_integrator("bs32", BogackiShampine32)
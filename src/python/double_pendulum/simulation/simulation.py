@@ -5,11 +5,19 @@ from matplotlib.animation import FuncAnimation
 import matplotlib.animation as mplanimation
 
 from double_pendulum.simulation.visualization import get_arrow, set_arrow_properties
+from double_pendulum.simulation.data_recorder import ArrayRecorder
+from double_pendulum.simulation.delay_line import DelayLine
+from double_pendulum.simulation.stop_condition import make_stop_condition
+from double_pendulum.simulation.integrators import integrators, get_integrator
 from double_pendulum.utils.filters.low_pass import lowpass_filter_rt
+from double_pendulum.utils.filters.iir_filter import iir_filter_rt
 from double_pendulum.utils.filters.kalman_filter import kalman_filter_rt
 from double_pendulum.utils.filters.unscented_kalman_filter import (
     unscented_kalman_filter_rt,
 )
+from double_pendulum.utils.filters.extended_kalman_filter import (
+    extended_kalman_filter_rt,
+)
 
 
 class Simulator:
@@ -23,13 +31,33 @@ class Simulator:
     plant : SymbolicDoublePendulum or DoublePendulumPlant object
         A plant object containing the kinematics and dynamics of the
         double pendulum
+    return_lists : bool
+        The data is recorded in preallocated numpy arrays and simulate
+        returns (zero-copy views of) these arrays.
+        If True, simulate and the recorded data attributes (t_values,
+        x_values, tau_values, meas_x_values, filt_x_values, con_u_values)
+        return python lists instead (compatibility with earlier versions).
+        (Default value = False)
+    record_trajectory : bool
+        Whether to record the full trajectory. The measurement delay and
+        the motor responsiveness only use fixed-size delay lines, so the
+        record can be disabled for long runs. Then, simulate returns
+        empty records and the final state is available with get_state.
+        (Default value = True)
     """
 
-    def __init__(self, plant):
+    def __init__(self, plant, return_lists=False, record_trajectory=True):
         self.plant = plant
+        self.return_lists = return_lists
+        self.record_trajectory = record_trajectory
 
         self.x = np.zeros(2 * self.plant.dof)  # position, velocity
         self.t = 0.0  # time
+        self.stop_reason = "tf"  # reason of the end of the last simulation
+
+        # scalar fast path of the plant dynamics (DoublePendulumPlant)
+        self.use_fast_rhs = hasattr(self.plant, "runge_integrator_into")
+        self._dx = np.zeros(2 * self.plant.dof)
 
         self.reset()
 
@@ -65,17 +93,70 @@ class Simulator:
         """
         return self.t, self.x
 
-    def reset_data_recorder(self):
+    def reset_data_recorder(self, capacity=0, delay_steps=1):
         """
-        Reset the internal data record of the simulator
-        """
-        self.t_values = []
-        self.x_values = []
-        self.tau_values = []
+        Reset the internal data record and the delay lines of the simulator
 
-        self.meas_x_values = []
-        self.filt_x_values = []
-        self.con_u_values = []
+        Parameters
+        ----------
+        capacity : int
+            number of data points to preallocate
+            (Default value = 0)
+        delay_steps : int
+            number of states and torques held in the delay lines
+            (Default value = 1)
+        """
+        dim_x = 2 * self.plant.dof
+        dim_u = self.plant.n_actuators
+
+        self.x_delay = DelayLine((dim_x,), delay_steps)
+        self.tau_delay = DelayLine((dim_u,), delay_steps)
+        self.last_con_u = None
+        if not self.record_trajectory:
+            capacity = 0
+
+        self.t_record = ArrayRecorder((), capacity)
+        self.x_record = ArrayRecorder((dim_x,), capacity)
+        self.tau_record = ArrayRecorder((dim_u,), capacity)
+
+        self.meas_x_record = ArrayRecorder((dim_x,), capacity)
+        self.filt_x_record = ArrayRecorder((dim_x,), capacity)
+        self.con_u_record = ArrayRecorder((dim_u,), capacity)
+
+    def _recorded_values(self, record):
+        if self.return_lists:
+            return record.view().tolist()
+        return record.view()
+
+    @property
+    def t_values(self):
+        """recorded time points"""
+        return self._recorded_values(self.t_record)
+
+    @property
+    def x_values(self):
+        """recorded states"""
+        return self._recorded_values(self.x_record)
+
+    @property
+    def tau_values(self):
+        """recorded applied motor torques"""
+        return self._recorded_values(self.tau_record)
+
+    @property
+    def meas_x_values(self):
+        """recorded measured states"""
+        return self._recorded_values(self.meas_x_record)
+
+    @property
+    def filt_x_values(self):
+        """recorded filtered states"""
+        return self._recorded_values(self.filt_x_record)
+
+    @property
+    def con_u_values(self):
+        """recorded commanded motor torques"""
+        return self._recorded_values(self.con_u_record)
 
     def record_data(self, t, x, tau=None):
         """
@@ -96,10 +177,31 @@ class Simulator:
             order=[u1, u2],
             units=[Nm]
         """
-        self.t_values.append(t)
-        self.x_values.append(list(x))
+        self.x_delay.append(x)
         if tau is not None:
-            self.tau_values.append(list(tau))
+            self.tau_delay.append(tau)
+        self.record_trajectory_data(t, x, tau)
+
+    def record_trajectory_data(self, t, x, tau=None):
+        """
+        Record a data point in the trajectory record only
+        (e.g. physics substeps in multi-rate simulations).
+        The delay lines are not updated.
+
+        Parameters
+        ----------
+        t : float
+            time, units=[s]
+        x : array_like, shape=(4,), dtype=float,
+            state of the double pendulum
+        tau : array_like, shape=(2,), dtype=float
+            actuation input/motor torque
+        """
+        if self.record_trajectory:
+            self.t_record.append(t)
+            self.x_record.append(x)
+            if tau is not None:
+                self.tau_record.append(tau)
 
     def get_trajectory_data(self):
         """
@@ -120,9 +222,9 @@ class Simulator:
             order=[u1, u2],
             units=[Nm]
         """
-        T = np.asarray(self.t_values)
-        X = np.asarray(self.x_values)
-        U = np.asarray(self.tau_values)
+        T = self.t_record.view()
+        X = self.x_record.view()
+        U = self.tau_record.view()
         return T, X, U
 
     def set_process_noise(self, process_noise_sigmas=[0.0, 0.0, 0.0, 0.0]):
@@ -201,8 +303,14 @@ class Simulator:
             string determining the velocity noise filter
             "None": No filter
             "lowpass": lowpass filter
-            "kalman": kalman filter
+            "iir": butterworth filter bank, meas_noise_vfilter_args["iir"]
+                   contains the keyword arguments of iir_filter_rt
+                   (e.g. {"order": 2, "cutoff": [1., 1., 0.3, 0.3]})
+            "kalman": kalman filter, meas_noise_vfilter_args["kalman"]
+                      contains the linearization point ("x_lin", "u_lin")
+                      and optionally "steady_state" (see kalman_filter_rt)
             "unscented_kalman": unscented kalman filter
+            "ekf": extended kalman filter
             (Default value = "None")
         meas_noise_vfilter_args : dict
             dictionary containing parameters for the velocity filter
@@ -251,6 +359,47 @@ class Simulator:
         self.perturbation_times = perturbation_times
         self.perturbation_taus = perturbation_taus
 
+    def set_integrator_parameters(self, rtol=1e-6, atol=1e-8, max_step=np.inf):
+        """
+        Set parameters for the adaptive integrators
+        (see simulation.integrators, e.g. "dopri5", "bs32")
+
+        Parameters
+        ----------
+        rtol : float
+            relative tolerance of the local error
+            (Default value = 1e-6)
+        atol : float
+            absolute tolerance of the local error
+            (Default value = 1e-8)
+        max_step : float
+            maximum substep size, unit=[s]
+            (Default value = np.inf)
+        """
+        self.integrator_parameters = {
+            "rtol": rtol,
+            "atol": atol,
+            "max_step": max_step,
+        }
+        self.adaptive_integrator = None
+
+    def get_integrator_statistics(self):
+        """
+        Get the substep counts of the adaptive integrator since the start
+        of the last simulation
+
+        Returns
+        -------
+        dict
+            n_accepted: number of accepted substeps
+            n_rejected: number of rejected substeps
+            n_rhs: number of rhs evaluations
+            (empty for the fixed step integrators)
+        """
+        if self.adaptive_integrator is None:
+            return {}
+        return self.adaptive_integrator.get_statistics()
+
     def reset(self):
         """
         Reset the Simulator
@@ -281,9 +430,14 @@ class Simulator:
         self.perturbation_times = []
         self.perturbation_taus = []
 
+        self.set_integrator_parameters()
+
         self.filter = None
         self.reset_data_recorder()
 
+        if self.use_fast_rhs:
+            self.plant.init_fast_dynamics()
+
     def init_filter(self, x0, dt, integrator):
         """
         Initialize the filter
@@ -308,6 +462,13 @@ class Simulator:
                 dim_x=2 * dof, alpha=self.meas_noise_vfilter_args["alpha"], x0=x0
             )
 
+        elif self.meas_noise_vfilter == "iir":
+            dof = self.plant.dof
+
+            self.filter = iir_filter_rt(
+                dim_x=2 * dof, x0=x0, **self.meas_noise_vfilter_args["iir"]
+            )
+
         elif self.meas_noise_vfilter == "kalman":
             dof = self.plant.dof
 
@@ -325,12 +486,15 @@ class Simulator:
                 dt=dt,
                 process_noise=self.process_noise_sigmas,
                 measurement_noise=self.meas_noise_sigmas,
+                steady_state=self.meas_noise_vfilter_args["kalman"].get(
+                    "steady_state", False
+                ),
             )
         elif self.meas_noise_vfilter == "unscented_kalman":
             dof = self.plant.dof
             if integrator == "euler":
                 fx = self.euler_integrator
-            elif integrator == "runge_kutta":
+            else:
                 fx = self.runge_integrator
             self.filter = unscented_kalman_filter_rt(
                 dim_x=2 * dof,
@@ -340,6 +504,21 @@ class Simulator:
                 measurement_noise=self.meas_noise_sigmas,
                 fx=fx,
             )
+        elif self.meas_noise_vfilter == "ekf":
+            dof = self.plant.dof
+            if integrator == "euler":
+                fx = self.euler_integrator
+            else:
+                fx = self.runge_integrator
+            self.filter = extended_kalman_filter_rt(
+                plant=self.plant,
+                dim_x=2 * dof,
+                x0=x0,
+                dt=dt,
+                process_noise=self.process_noise_sigmas,
+                measurement_noise=self.meas_noise_sigmas,
+                fx=fx,
+            )
 
     def euler_integrator(self, y, dt, t, tau):
         """
@@ -368,6 +547,8 @@ class Simulator:
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
         """
+        if self.use_fast_rhs:
+            return self.plant.rhs_into(y, tau, np.empty(2 * self.plant.dof))
         return self.plant.rhs(t, y, tau)
 
     def runge_integrator(self, y, dt, t, tau):
@@ -397,13 +578,17 @@ class Simulator:
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
         """
+        if self.use_fast_rhs:
+            return self.plant.runge_integrator_into(
+                y, dt, tau, np.empty(2 * self.plant.dof)
+            )
         k1 = self.plant.rhs(t, y, tau)
         k2 = self.plant.rhs(t + 0.5 * dt, y + 0.5 * dt * k1, tau)
         k3 = self.plant.rhs(t + 0.5 * dt, y + 0.5 * dt * k2, tau)
         k4 = self.plant.rhs(t + dt, y + dt * k3, tau)
         return (k1 + 2.0 * (k2 + k3) + k4) / 6.0
 
-    def step(self, tau, dt, integrator="runge_kutta"):
+    def step(self, tau, dt, integrator="runge_kutta", record=True):
         """
         Performs a simulation step with the specified integrator.
         Also adds process noise to the integration result.
@@ -421,7 +606,18 @@ class Simulator:
             string determining the integration method
             "euler" : Euler integrator
             "runge_kutta" : Runge Kutta integrator
+            or the name of a registered adaptive integrator
+            (e.g. "dopri5", "bs32", see set_integrator_parameters)
              (Default value = "runge_kutta")
+        record : bool
+            Whether to record the new state (data record and delay lines)
+             (Default value = True)
+
+        Returns
+        -------
+        numpy_array
+            shape=(2,), dtype=float
+            applied (clipped) motor torque
         """
         tau = np.clip(
             tau,
@@ -429,7 +625,14 @@ class Simulator:
             np.asarray(self.plant.torque_limit),
         )
 
-        if integrator == "runge_kutta":
+        if self.use_fast_rhs and integrator in ["runge_kutta", "euler"]:
+            if integrator == "runge_kutta":
+                self.plant.runge_integrator_into(self.x, dt, tau, self._dx)
+            else:
+                self.plant.rhs_into(self.x, tau, self._dx)
+            self._dx *= dt
+            self.x = np.add(self.x, self._dx, casting="unsafe")
+        elif integrator == "runge_kutta":
             self.x = np.add(
                 self.x,
                 dt * self.runge_integrator(self.x, dt, self.t, tau),
@@ -443,6 +646,8 @@ class Simulator:
                 casting="unsafe",
             )
             # self.x += dt * self.euler_integrator(self.x, dt, self.t, tau)
+        elif integrator in integrators:
+            self.x = self.adaptive_step(tau, dt, integrator)
         else:
             raise NotImplementedError(
                 f"Sorry, the integrator {integrator} is not implemented."
@@ -451,8 +656,51 @@ class Simulator:
         self.x = np.random.normal(self.x, self.process_noise_sigmas, np.shape(self.x))
 
         self.t += dt
-        self.record_data(self.t, self.x.copy(), tau)
+        if record:
+            self.record_data(self.t, self.x, tau)
         # _ = self.get_measurement(dt)
+        return tau
+
+    def adaptive_step(self, tau, dt, integrator):
+        """
+        Integrate the internal state over dt with adaptive substeps
+        and constant torque
+
+        Parameters
+        ----------
+        tau : array_like, shape=(2,), dtype=float
+            actuation input/motor torque,
+            order=[u1, u2],
+            units=[Nm]
+        dt : float
+            timestep, unit=[s]
+        integrator : string
+            name of a registered adaptive integrator, e.g.
+            "dopri5" : Dormand-Prince 5(4)
+            "bs32" : Bogacki-Shampine 3(2)
+
+        Returns
+        -------
+        numpy_array
+            shape=(4,), dtype=float,
+            state of the double pendulum after dt
+        """
+        if type(self.adaptive_integrator) is not integrators[integrator]:
+            self.adaptive_integrator = get_integrator(
+                integrator, **self.integrator_parameters
+            )
+
+        if self.use_fast_rhs:
+
+            def fun(t, y):
+                return self.plant.rhs_into(y, tau, np.empty(2 * self.plant.dof))
+
+        else:
+
+            def fun(t, y):
+                return self.plant.rhs(t, y, tau)
+
+        return self.adaptive_integrator.integrate(fun, self.t, self.x, dt)
 
     def get_control_u(self, controller, x, t, dt):
         """
@@ -492,7 +740,9 @@ class Simulator:
                 realtime = False
         else:
             u = np.zeros(self.plant.n_actuators)
-        self.con_u_values.append(np.copy(u))
+        self.last_con_u = np.copy(u)
+        if self.record_trajectory:
+            self.con_u_record.append(u)
         return u, realtime
 
     def get_measurement(self, dt):
@@ -522,16 +772,17 @@ class Simulator:
 
         # delay
         n_delay = int(self.delay / dt) + 1
+        self.x_delay.resize(n_delay)
+        self.tau_delay.resize(n_delay)
         if n_delay > 1:
-            len_X = len(self.x_values)
             if self.delay_mode == "posvel":
-                x_meas = np.copy(self.x_values[max(-n_delay, -len_X)])
+                x_meas = np.copy(self.x_delay.delayed(n_delay))
             elif self.delay_mode == "vel":
                 # x_meas[:2] = self.x[:2]
-                x_meas[2:] = self.x_values[max(-n_delay, -len_X)][2:]
+                x_meas[2:] = self.x_delay.delayed(n_delay)[2:]
 
-        if len(self.tau_values) > n_delay:
-            u = np.asarray(self.tau_values[-n_delay])
+        if self.tau_delay.count > n_delay:
+            u = np.copy(self.tau_delay.delayed(n_delay))
         else:
             u = np.zeros(self.plant.n_actuators)
 
@@ -540,7 +791,8 @@ class Simulator:
         # sensor noise
         x_meas = np.random.normal(x_meas, self.meas_noise_sigmas, np.shape(self.x))
 
-        self.meas_x_values.append(np.copy(x_meas))
+        if self.record_trajectory:
+            self.meas_x_record.append(x_meas)
         return x_meas
 
     def filter_measurement(self, x):
@@ -573,10 +825,11 @@ class Simulator:
 
         # filter
         if not self.filter is None:
-            if len(self.con_u_values) > 0:
-                x_filt = self.filter(x, self.con_u_values[-1])
+            if self.last_con_u is not None:
+                x_filt = self.filter(x, self.last_con_u)
 
-        self.filt_x_values.append(np.copy(x_filt))
+        if self.record_trajectory:
+            self.filt_x_record.append(x_filt)
         return x_filt
 
     def get_real_applied_u(self, u):
@@ -610,8 +863,8 @@ class Simulator:
         nu = np.copy(u)
 
         # tau responsiveness
-        if len(self.tau_values) > 0:
-            last_u = np.asarray(self.tau_values[-1])
+        if self.tau_delay.count > 0:
+            last_u = np.copy(self.tau_delay.delayed(1))
         else:
             last_u = np.zeros(self.plant.n_actuators)
         nu = last_u + self.u_responsiveness * (nu - last_u)
@@ -630,7 +883,14 @@ class Simulator:
         nu[1] = np.clip(nu[1], -self.plant.torque_limit[1], self.plant.torque_limit[1])
         return nu
 
-    def controller_step(self, dt, controller=None, integrator="runge_kutta"):
+    def controller_step(
+        self,
+        dt,
+        controller=None,
+        integrator="runge_kutta",
+        physics_dt=None,
+        record_substeps=False,
+    ):
         """
         Perform a full simulation step including
             - get measurement
@@ -642,7 +902,7 @@ class Simulator:
         Parameters
         ----------
         dt : float
-            timestep, unit=[s]
+            controller timestep, unit=[s]
         controller : Controller object
             Controller whose control signal is used
             If None, motir torques are set to 0.
@@ -651,7 +911,20 @@ class Simulator:
             string determining the integration method
             "euler" : Euler integrator
             "runge_kutta" : Runge Kutta integrator
+            or the name of a registered adaptive integrator
+            (e.g. "dopri5", "bs32", see set_integrator_parameters)
              (Default value = "runge_kutta")
+        physics_dt : float
+            integration timestep, unit=[s]
+            If smaller than dt, the eom are integrated in substeps of
+            (approximately) physics_dt with the torque held constant
+            (zero-order hold). The process noise is applied per substep.
+            None: integrate with dt
+             (Default value = None)
+        record_substeps : bool
+            Whether to record the states at the physics substeps in the
+            trajectory record (otherwise only at the controller ticks)
+             (Default value = False)
 
         Returns
         -------
@@ -668,15 +941,47 @@ class Simulator:
         u, realtime = self.get_control_u(controller, x_filt, self.t, dt)
         nu = self.get_real_applied_u(u)
 
-        self.step(nu, dt, integrator=integrator)
+        n_sub = 1
+        if physics_dt is not None:
+            n_sub = max(int(round(dt / physics_dt)), 1)
+
+        if n_sub == 1:
+            self.step(nu, dt, integrator=integrator)
+        else:
+            t_tick = self.t
+            for i in range(n_sub - 1):
+                tau = self.step(nu, dt / n_sub, integrator=integrator, record=False)
+                if record_substeps:
+                    self.record_trajectory_data(self.t, self.x, tau)
+            tau = self.step(nu, dt / n_sub, integrator=integrator, record=False)
+            self.t = t_tick + dt
+            self.record_data(self.t, self.x, tau)
 
         return realtime
 
-    def simulate(self, t0, x0, tf, dt, controller=None, integrator="runge_kutta"):
+    def simulate(
+        self,
+        t0,
+        x0,
+        tf,
+        dt=None,
+        controller=None,
+        integrator="runge_kutta",
+        controller_dt=None,
+        physics_dt=None,
+        record_rate="controller",
+        stop_condition=None,
+        pad=None,
+    ):
         """
         Simulate the double pendulum for a time period under the control of a
         controller
 
+        The controller, the measurement (noise, delay) and the filters run
+        at the controller rate (controller_dt). The eom are integrated with
+        physics_dt and the torques are held constant between the
+        controller ticks.
+
         Parameters
         ----------
         t0 : float,
@@ -689,6 +994,9 @@ class Simulator:
             final time, units=[s]
         dt : float
             timestep, unit=[s]
+            used for the controller and the physics if controller_dt and
+            physics_dt are not set
+             (Default value = None)
         controller : Controller object
             Controller whose control signal is used
             If None, motir torques are set to 0.
@@ -697,37 +1005,133 @@ class Simulator:
             string determining the integration method
             "euler" : Euler integrator
             "runge_kutta" : Runge Kutta integrator
+            or the name of a registered adaptive integrator
+            (e.g. "dopri5", "bs32", see set_integrator_parameters)
              (Default value = "runge_kutta")
+        controller_dt : float
+            timestep of the controller, measurement and filter, unit=[s]
+            None: dt
+             (Default value = None)
+        physics_dt : float
+            integration timestep, unit=[s]
+            rounded such that controller_dt is a multiple of physics_dt
+            None: controller_dt
+             (Default value = None)
+        record_rate : string
+            rate of the trajectory record
+            "controller" : record at the controller ticks
+            "physics" : record at every physics substep
+            The measurement, filter and controller records are always at
+            the controller rate.
+             (Default value = "controller")
+        stop_condition : callable or dict
+            early termination predicate, checked after every controller
+            step. A callable stop_condition(t, x, tau) returns None to
+            continue or a reason code, a dict is passed to StopCondition
+            (e.g. {"goal": goal, "epsilon": eps, "max_error": max_err}).
+            The reason is stored in stop_reason ("tf" if the simulation
+            reached tf).
+            None: always simulate until tf
+             (Default value = None)
+        pad : string
+            how to fill the trajectory record up to tf after an early stop
+            "hold" : repeat the last state and torque
+            "nan" : nan states and torques (mark as failed)
+            "auto" : "hold" for the reason "success", "nan" otherwise
+            None : no padding, the record ends at the stop time
+             (Default value = None)
 
         Returns
         -------
-        list
+        numpy_array (list if return_lists)
             time points, unit=[s]
             shape=(N,)
-        list
+        numpy_array (list if return_lists)
             shape=(N, 4)
             states, units=[rad, rad, rad/s, rad/s]
             order=[angle1, angle2, velocity1, velocity2]
-        list
+        numpy_array (list if return_lists)
             shape=(N, 2)
             actuations/motor torques
             order=[u1, u2],
             units=[Nm]
         """
+        if controller_dt is None:
+            controller_dt = dt
+        if physics_dt is None:
+            physics_dt = controller_dt
+        dt = controller_dt
+
+        record_substeps = record_rate == "physics"
+        record_dt = physics_dt if record_substeps else dt
+
         self.set_state(t0, x0)
-        self.reset_data_recorder()
+        self.reset_data_recorder(
+            capacity=int(np.ceil((tf - t0) / record_dt)) + 2,
+            delay_steps=int(self.delay / dt) + 1,
+        )
         self.record_data(t0, np.copy(x0), None)
         # self.meas_x_values.append(np.copy(x0))
 
         self.init_filter(x0, dt, integrator)
+        if self.use_fast_rhs:
+            self.plant.init_fast_dynamics()
+        if self.adaptive_integrator is not None:
+            self.adaptive_integrator.reset()
+
+        stop_condition = make_stop_condition(stop_condition)
+        self.stop_reason = "tf"
 
         N = 0
         while self.t < tf:
-            _ = self.controller_step(dt, controller, integrator)
+            _ = self.controller_step(
+                dt, controller, integrator, physics_dt, record_substeps
+            )
             N += 1
+            if stop_condition is not None:
+                reason = stop_condition(self.t, self.x, self.tau_delay.delayed(1))
+                if reason:
+                    self.stop_reason = reason if isinstance(reason, str) else "stop"
+                    break
+
+        if self.stop_reason != "tf" and pad is not None:
+            self.pad_trajectory(tf, record_dt, pad)
 
         return self.t_values, self.x_values, self.tau_values
 
+    def pad_trajectory(self, tf, dt, pad="hold"):
+        """
+        Fill the trajectory record up to tf after an early stop of the
+        simulation. The state of the simulator is not changed.
+
+        Parameters
+        ----------
+        tf : float
+            final time, units=[s]
+        dt : float
+            timestep of the record, unit=[s]
+        pad : string
+            "hold" : repeat the last state and torque
+            "nan" : nan states and torques (mark as failed)
+            "auto" : "hold" for the stop reason "success", "nan" otherwise
+             (Default value = "hold")
+        """
+        if pad == "auto":
+            pad = "hold" if self.stop_reason == "success" else "nan"
+        if pad == "hold":
+            x = np.copy(self.x)
+            tau = np.copy(self.tau_delay.delayed(1))
+        elif pad == "nan":
+            x = np.full(2 * self.plant.dof, np.nan)
+            tau = np.full(self.plant.n_actuators, np.nan)
+        else:
+            raise NotImplementedError(f"Sorry, the padding {pad} is not implemented.")
+
+        t = self.t
+        while t < tf:
+            t += dt
+            self.record_trajectory_data(t, x, tau)
+
     def _animation_init(self):
         """init of the animation plot"""
         self.animation_ax.set_xlim(
@@ -783,7 +1187,7 @@ class Simulator:
             rt = self.controller_step(dt, controller, integrator)
             if not rt:
                 realtime = False
-        tau = self.tau_values[-1]
+        tau = self.tau_delay.delayed(1)
         ee_pos = self.plant.forward_kinematics(self.x[: self.plant.dof])
         ee_pos.insert(0, self.plant.base)
 
@@ -837,11 +1241,12 @@ class Simulator:
 
         if self.plot_inittraj:
             T, X, U = controller.get_init_trajectory()
-            coords = []
-            for x in X:
-                coords.append(self.plant.forward_kinematics(x[: self.plant.dof])[-1])
-
-            coords = np.asarray(coords)
+            X = np.asarray(X)
+            if len(X) > 0:
+                fk = self.plant.forward_kinematics(X.T[: self.plant.dof])
+                coords = np.asarray(fk[-1]).T
+            else:
+                coords = np.zeros((0, 2))
             if len(coords) > 1:
                 self.animation_plots[ani_plot_counter].set_data(
                     coords.T[0], coords.T[1]
@@ -850,11 +1255,12 @@ class Simulator:
 
         if self.plot_forecast:
             T, X, U = controller.get_forecast()
-            coords = []
-            for x in X:
-                coords.append(self.plant.forward_kinematics(x[: self.plant.dof])[-1])
-
-            coords = np.asarray(coords)
+            X = np.asarray(X)
+            if len(X) > 0:
+                fk = self.plant.forward_kinematics(X.T[: self.plant.dof])
+                coords = np.asarray(fk[-1]).T
+            else:
+                coords = np.zeros((0, 2))
             if len(coords) > 1:
                 self.animation_plots[ani_plot_counter].set_data(
                     coords.T[0], coords.T[1]
@@ -918,6 +1324,8 @@ class Simulator:
             string determining the integration method
             "euler" : Euler integrator
             "runge_kutta" : Runge Kutta integrator
+            or the name of a registered adaptive integrator
+            (e.g. "dopri5", "bs32", see set_integrator_parameters)
              (Default value = "runge_kutta")
         plot_inittraj : bool
             Whether to plot an initial (reference) trajectory
@@ -945,14 +1353,14 @@ class Simulator:
 
         Returns
         -------
-        list
+        numpy_array (list if return_lists)
             time points, unit=[s]
             shape=(N,)
-        list
+        numpy_array (list if return_lists)
             shape=(N, 4)
             states, units=[rad, rad, rad/s, rad/s]
             order=[angle1, angle2, velocity1, velocity2]
-        list
+        numpy_array (list if return_lists)
             shape=(N, 2)
             actuations/motor torques
             order=[u1, u2],
@@ -0,0 +1,151 @@
+import numpy as np
+
+from double_pendulum.utils.wrap_angles import wrap_angles_top, wrap_angles_diff
+
+
+class StopCondition:
+    """
+    StopCondition class
+    declarative early termination predicate for Simulator.simulate.
+    Called after every controller step with the time, the state and the
+    applied torque. Returns None to continue the simulation or a reason code:
+        "success" : the state stayed within epsilon of the goal for
+                    hold_time seconds
+        "diverged" : the state left the allowed region
+                     (max_error around the goal or x_max)
+        "nan" : the state or the torque is not finite
+                (e.g. LQRController with failure_value=np.nan)
+
+    Parameters
+    ----------
+    goal : array_like, shape=(4,), optional
+        goal state, order=[angle1, angle2, velocity1, velocity2],
+        units=[rad, rad, rad/s, rad/s]
+        (Default value=None)
+    epsilon : array_like, shape=(4,), optional
+        success tolerance around the goal (angles wrapped with
+        wrap_angles_top as in the benchmarker), None: no success check
+        (Default value=None)
+    hold_time : float, optional
+        time the state has to stay within epsilon for a success,
+        unit=[s]
+        (Default value=0.0)
+    max_error : array_like, shape=(4,), optional
+        allowed deviation from the goal (angle difference wrapped with
+        wrap_angles_diff), None: no check
+        (Default value=None)
+    x_max : array_like, shape=(4,), optional
+        allowed absolute values of the (unwrapped) state, None: no check
+        (Default value=None)
+    non_finite : bool, optional
+        whether to stop if the state or torque is nan or inf
+        (Default value=True)
+    """
+
+    def __init__(
+        self,
+        goal=None,
+        epsilon=None,
+        hold_time=0.0,
+        max_error=None,
+        x_max=None,
+        non_finite=True,
+    ):
+        self.goal = None if goal is None else np.asarray(goal, dtype=float)
+        self.epsilon = None if epsilon is None else np.asarray(epsilon, dtype=float)
+        self.hold_time = hold_time
+        self.max_error = (
+            None if max_error is None else np.asarray(max_error, dtype=float)
+        )
+        self.x_max = None if x_max is None else np.asarray(x_max, dtype=float)
+        self.non_finite = non_finite
+        if (self.epsilon is not None or self.max_error is not None) and (
+            self.goal is None
+        ):
+            raise ValueError("epsilon and max_error require a goal.")
+        self.reset()
+
+    def get_dict(self):
+        """
+        parameters of this stop condition, StopCondition(**get_dict())
+        creates an equal stop condition
+
+        Returns
+        -------
+        dict
+        """
+        return {
+            "goal": self.goal,
+            "epsilon": self.epsilon,
+            "hold_time": self.hold_time,
+            "max_error": self.max_error,
+            "x_max": self.x_max,
+            "non_finite": self.non_finite,
+        }
+
+    def reset(self):
+        """
+        Reset the success timer, called at the start of every simulation
+        """
+        self.t_enter = None
+
+    def __call__(self, t, x, tau):
+        """
+        Check the stop condition
+
+        Parameters
+        ----------
+        t : float
+            time, unit=[s]
+        x : array_like, shape=(4,), dtype=float,
+            state of the double pendulum
+        tau : array_like, shape=(2,), dtype=float
+            applied motor torque
+
+        Returns
+        -------
+        string or None
+            reason code or None to continue
+        """
+        if self.non_finite and not (np.all(np.isfinite(x)) and np.all(np.isfinite(tau))):
+            return "nan"
+        if self.x_max is not None and np.any(np.abs(x) > self.x_max):
+            return "diverged"
+        if self.max_error is not None:
+            err = np.abs(wrap_angles_diff(np.asarray(x) - self.goal))
+            if np.any(err > self.max_error):
+                return "diverged"
+        if self.epsilon is not None:
+            err = np.abs(wrap_angles_top(x) - self.goal)
+            if np.all(err < self.epsilon):
+                if self.t_enter is None:
+                    self.t_enter = t
+                if t - self.t_enter >= self.hold_time:
+                    return "success"
+            else:
+                self.t_enter = None
+        return None
+
+
+def make_stop_condition(stop_condition):
+    """
+    Create a stop condition for Simulator.simulate
+
+    Parameters
+    ----------
+    stop_condition : callable, dict or None
+        callable stop_condition(t, x, tau) returning None (continue) or a
+        reason code, or a dict with the parameters of StopCondition.
+        Callables with a reset method are reset.
+
+    Returns
+    -------
+    callable or None
+    """
+    if stop_condition is None:
+        return None
+    if isinstance(stop_condition, dict):
+        return StopCondition(**stop_condition)
+    if hasattr(stop_condition, "reset"):
+        stop_condition.reset()
+    return stop_condition
@@ -0,0 +1,144 @@
+import numpy as np
+from filterpy.common import Q_discrete_white_noise
+
+
+class extended_kalman_filter_rt():
+    """
+    extended kalman filter for realtime data processing.
+    The state is predicted with one integration step of the nonlinear
+    plant dynamics and the covariance is propagated with the analytic
+    Jacobian of the plant at the current estimate, discretized as
+    F = I + A*dt. The full state is measured (H = I).
+    For plants with a scalar fast path (DoublePendulumPlant) the Jacobian
+    is computed with plant.linear_matrices_into, otherwise with
+    plant.linear_matrices.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum or DoublePendulumPlant object
+        A plant object containing the kinematics and dynamics of the
+        double pendulum
+    dim_x : int
+        dimension of the state
+        (Default value=4)
+    x0 : array_like, shape=(dim_x,)
+        initial state estimate
+        (Default value=[0., 0., 0., 0.])
+    dt : float
+        timestep, unit=[s]
+        (Default value=0.01)
+    process_noise : array_like, shape=(dim_x,)
+        process noise variances
+        (Default value=[0., 0., 0., 0.])
+    measurement_noise : array_like, shape=(dim_x,)
+        measurement noise variances, have to be positive
+        (Default value=[0.001, 0.001, 0.1, 0.1])
+    covariance_matrix : array_like, shape=(dim_x, dim_x)
+        initial covariance of the state estimate
+        (Default value=np.diag((1., 1., 1., 1.)))
+    fx : function
+        integrator fx(y, dt, t, tau) returning the time derivative used
+        for the step y + dt*fx(y, dt, t, tau), e.g.
+        Simulator.runge_integrator. If None, plant.rhs is integrated
+        with the given integrator.
+        (Default value=None)
+    integrator : string
+        integrator used if fx is None,
+        "euler" or "runge_kutta"
+        (Default value="runge_kutta")
+    """
+    def __init__(self, plant, dim_x=4,
+                 x0=np.array([0., 0., 0., 0.]),
+                 dt=0.01,
+                 process_noise=[0., 0., 0., 0.],
+                 measurement_noise=[0.001, 0.001, 0.1, 0.1],
+                 covariance_matrix=np.diag((1., 1., 1., 1.)),
+                 fx=None,
+                 integrator="runge_kutta"):
+
+        self.plant = plant
+        self.dim_x = dim_x
+        self.dt = dt
+
+        self.fast = hasattr(self.plant, "linear_matrices_into")
+        if self.fast:
+            self.plant.init_fast_dynamics()
+        self.A = np.zeros((dim_x, dim_x))
+        self.B = np.zeros((dim_x, dim_x // 2))
+        self.xd = np.zeros(dim_x)
+        if fx is not None:
+            self.fx = fx
+        elif integrator == "euler":
+            self.fx = self.euler_integrator
+        elif integrator == "runge_kutta":
+            self.fx = self.runge_integrator
+        else:
+            raise NotImplementedError(
+                f"Sorry, the integrator {integrator} is not implemented.")
+
+        self.x = np.array(x0, dtype=float)
+        self.P = np.array(covariance_matrix, dtype=float)
+        self.R = np.diag(measurement_noise)
+        Q = Q_discrete_white_noise(dim=dim_x, dt=dt, var=process_noise)
+        self.Q = 0.5*(Q + Q.T)
+        self.I = np.eye(dim_x)
+
+    def euler_integrator(self, y, dt, t, tau):
+        """
+        time derivative of the state for an Euler step
+        """
+        if self.fast:
+            return self.plant.rhs_into(y, tau, self.xd)
+        return self.plant.rhs(t, y, tau)
+
+    def runge_integrator(self, y, dt, t, tau):
+        """
+        Runge-Kutta (4th order) increment, the new state is y + dt*increment
+        """
+        if self.fast:
+            return self.plant.runge_integrator_into(y, dt, tau, self.xd)
+        k1 = self.plant.rhs(t, y, tau)
+        k2 = self.plant.rhs(t + 0.5*dt, y + 0.5*dt*k1, tau)
+        k3 = self.plant.rhs(t + 0.5*dt, y + 0.5*dt*k2, tau)
+        k4 = self.plant.rhs(t + dt, y + dt*k3, tau)
+        return (k1 + 2.*(k2 + k3) + k4) / 6.
+
+    def predict(self, u):
+        """
+        Propagate the state estimate and its covariance by one timestep.
+
+        Parameters
+        ----------
+        u : array_like, shape=(2,)
+            applied motor torque
+        """
+        if self.fast:
+            A, _ = self.plant.linear_matrices_into(self.x, u, self.A, self.B)
+        else:
+            A, _ = self.plant.linear_matrices(self.x, u)
+        F = self.I + A*self.dt
+        xd = self.fx(self.x, self.dt, 0., u)
+        self.x = self.x + self.dt*np.asarray(xd)
+        self.P = F.dot(self.P).dot(F.T) + self.Q
+
+    def update(self, z):
+        """
+        Correct the state estimate with a measurement of the full state.
+
+        Parameters
+        ----------
+        z : array_like, shape=(dim_x,)
+            measured state
+        """
+        S = self.P + self.R
+        K = np.linalg.solve(S.T, self.P.T).T
+        self.x = self.x + K.dot(np.asarray(z) - self.x)
+        # Joseph form, stays positive semi-definite for K close to I
+        # (small measurement noise)
+        IK = self.I - K
+        self.P = IK.dot(self.P).dot(IK.T) + K.dot(self.R).dot(K.T)
+
+    def __call__(self, x, u):
+        self.predict(np.asarray(u))
+        self.update(x)
+        return np.copy(self.x)
@@ -0,0 +1,131 @@
+import numpy as np
+from scipy import signal as scipy_signal
+
+
+class iir_filter_rt():
+    """
+    realtime IIR filter bank.
+    Butterworth filter of arbitrary order for every channel, implemented
+    as cascaded second order sections (transposed direct form II) with an
+    explicit state. The filter can run on a single state of shape (dim_x,)
+    or on a batch of states of shape (M, dim_x), e.g. for many rollouts.
+    All intermediate results are written into preallocated buffers.
+
+    Parameters
+    ----------
+    dim_x : int
+        number of channels
+        (Default value=4)
+    order : int
+        order of the Butterworth filters
+        (Default value=2)
+    cutoff : float or array_like, shape=(dim_x,)
+        cutoff frequencies as fraction of the Nyquist frequency,
+        channels with cutoff >= 1 are not filtered
+        (Default value=[1., 1., 0.3, 0.3])
+    x0 : array_like, shape=(dim_x,) or shape=(M, dim_x)
+        initial state, the filter starts in the steady state of x0.
+        The shape of x0 determines the shape of the filtered data.
+        (Default value=[0., 0., 0., 0.])
+    btype : string
+        type of the filters, "lowpass" or "highpass"
+        (Default value="lowpass")
+    """
+    def __init__(self,
+                 dim_x=4,
+                 order=2,
+                 cutoff=[1., 1., 0.3, 0.3],
+                 x0=[0., 0., 0., 0.],
+                 btype="lowpass"):
+        self.dim_x = dim_x
+        self.order = order
+        self.cutoff = np.broadcast_to(np.asarray(cutoff, dtype=float), (dim_x,))
+        self.n_sections = (order + 1) // 2
+
+        # pass through sections for unfiltered channels
+        sos = np.zeros((self.n_sections, dim_x, 6))
+        sos[:, :, 0] = 1.
+        sos[:, :, 3] = 1.
+        for d in range(dim_x):
+            if 0. < self.cutoff[d] < 1.:
+                s = scipy_signal.butter(order, self.cutoff[d], btype=btype,
+                                        output="sos")
+                sos[:len(s), d] = s
+        # normalized sections (a0=1)
+        sos /= sos[:, :, 3:4]
+        self.b0, self.b1, self.b2 = sos[:, :, 0], sos[:, :, 1], sos[:, :, 2]
+        self.a1, self.a2 = sos[:, :, 4], sos[:, :, 5]
+
+        x0 = np.asarray(x0, dtype=float)
+        self.shape = x0.shape
+        self.z0 = np.empty((self.n_sections,) + self.shape)
+        self.z1 = np.empty((self.n_sections,) + self.shape)
+        self.v = np.empty(self.shape)
+        self.y = np.empty(self.shape)
+        self.tmp = np.empty(self.shape)
+        self.reset(x0)
+
+    def reset(self, x0):
+        """
+        Set the filter state to the steady state of the input x0.
+
+        Parameters
+        ----------
+        x0 : array_like, shape=(dim_x,) or shape=(M, dim_x)
+            state
+        """
+        v = np.array(x0, dtype=float)
+        for s in range(self.n_sections):
+            gain = ((self.b0[s] + self.b1[s] + self.b2[s]) /
+                    (1. + self.a1[s] + self.a2[s]))
+            y = gain*v
+            self.z1[s] = self.b2[s]*v - self.a2[s]*y
+            self.z0[s] = self.b1[s]*v - self.a1[s]*y + self.z1[s]
+            v = y
+
+    def __call__(self, x, u=None, out=None):
+        """
+        Filter a state.
+
+        Parameters
+        ----------
+        x : array_like, shape=(dim_x,) or shape=(M, dim_x)
+            measured state(s)
+        u : array_like
+            not used
+            (Default value=None)
+        out : numpy_array, optional
+            array for the filtered state(s). If None, a copy of the
+            internal output buffer is returned.
+            (Default value=None)
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim_x,) or shape=(M, dim_x)
+            filtered state(s)
+        """
+        v = self.v
+        y = self.y
+        tmp = self.tmp
+        np.copyto(v, x)
+        for s in range(self.n_sections):
+            z0 = self.z0[s]
+            z1 = self.z1[s]
+            # y = b0*v + z0
+            np.multiply(self.b0[s], v, out=y)
+            y += z0
+            # z0 = b1*v - a1*y + z1
+            np.multiply(self.b1[s], v, out=z0)
+            z0 += z1
+            np.multiply(self.a1[s], y, out=tmp)
+            z0 -= tmp
+            # z1 = b2*v - a2*y
+            np.multiply(self.b2[s], v, out=z1)
+            np.multiply(self.a2[s], y, out=tmp)
+            z1 -= tmp
+            np.copyto(v, y)
+        if out is None:
+            return np.copy(y)
+        np.copyto(out, y)
+        return out
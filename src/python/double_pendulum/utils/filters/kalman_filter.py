@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.linalg
 from filterpy.kalman import KalmanFilter
 from filterpy.common import Q_discrete_white_noise
 
@@ -59,13 +60,22 @@ def kalman_filter(data_measured, control_input, dt):
 class kalman_filter_rt():
     """
     kalman filter for realtime data processing
+
+    With steady_state=True, the discrete algebraic Riccati equation is
+    solved once and the constant steady state gain is used, so that a
+    filter step is a single matrix-vector product. The transient of the
+    initial covariance is neglected. If the Riccati equation has no
+    stabilizing solution for the given noise settings, the filter falls
+    back to the full time-varying update (self.steady_state is False in
+    that case).
     """
     def __init__(self, A, B, dim_x=4, dim_u=2,
                  x0=np.array([0., 0., 0., 0.]),
                  dt=0.01,
                  process_noise=[0., 0., 0., 0.],
                  measurement_noise=[0.001, 0.001, 0.1, 0.1],
-                 covariance_matrix=np.diag((1., 1., 1., 1.))):
+                 covariance_matrix=np.diag((1., 1., 1., 1.)),
+                 steady_state=False):
 
         self.dim_x = dim_x
         self.dim_u = dim_u
@@ -78,9 +88,6 @@ class kalman_filter_rt():
         self.A = np.eye(4) + A*dt
         self.B = B*dt
 
-        self.x_data = [self.x0]
-        self.u_data = []
-
         # First construct the object with the required dimensionality.
         self.f = KalmanFilter(
                 dim_x=self.dim_x,
@@ -110,17 +117,64 @@ class kalman_filter_rt():
         # Process noise
         self.f.Q = Q_discrete_white_noise(dim=self.dim_x, dt=self.dt, var=process_noise)
 
+        self.steady_state = steady_state
+        if self.steady_state:
+            self.init_steady_state()
+
+    def init_steady_state(self):
+        """
+        Compute the steady state gain and the combined update matrix
+        x_new = G [x, u, z] with
+        G = [(I-KH)F, (I-KH)B, K].
+        Falls back to the full update if there is no stabilizing solution.
+        """
+        F = np.asarray(self.f.F, dtype=float)
+        B = np.asarray(self.f.B, dtype=float)
+        H = np.asarray(self.f.H, dtype=float)
+        Q = np.asarray(self.f.Q, dtype=float)
+        # Q_discrete_white_noise with one variance per state is not
+        # exactly symmetric
+        Q = 0.5*(Q + Q.T)
+        R = np.asarray(self.f.R, dtype=float)
+        try:
+            # a priori covariance of the steady state
+            P = scipy.linalg.solve_discrete_are(F.T, H.T, Q, R)
+            S = H.dot(P).dot(H.T) + R
+            K = np.linalg.solve(S.T, H.dot(P.T)).T
+        except (np.linalg.LinAlgError, ValueError):
+            self.steady_state = False
+            return
+        IKH = np.eye(self.dim_x) - K.dot(H)
+        # the error dynamics of the filter have to be stable
+        if (not np.all(np.isfinite(K)) or
+                np.max(np.abs(np.linalg.eigvals(IKH.dot(F)))) >= 1.):
+            self.steady_state = False
+            return
+
+        self.K = K
+        self.G = np.hstack([IKH.dot(F), IKH.dot(B), K])
+        self.v = np.empty(self.G.shape[1])
+        self.v[:self.dim_x] = self.x0
+        self.x_est = np.array(self.x0, dtype=float)
+
     def __call__(self, x, u):
 
         # A, B = self.plant.linear_matrices(
         #                 self.x_data[-1],
         #                 u)
 
+        if self.steady_state:
+            n = self.dim_x
+            self.v[n:n+self.dim_u] = u
+            self.v[n+self.dim_u:] = x
+            np.dot(self.G, self.v, out=self.x_est)
+            self.v[:n] = self.x_est
+            return np.copy(self.x_est)
+
         # Perform one KF step
         self.f.u = np.asarray(u)
         self.f.predict()  # f.predict(f.u, f.B, f.F, f.Q)
         self.f.update([np.asarray(x)])  # f.update(z, f.R, f.H)
-        self.x_data.append(np.copy(x))
 
         # Output state
         x_est = self.f.x
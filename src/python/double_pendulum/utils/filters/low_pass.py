@@ -1,5 +1,3 @@
-import copy
-import signal
 from scipy import signal as scipy_signal
 import numpy as np
 
@@ -27,25 +25,28 @@ class lowpass_filter_rt():
                  x0=[0., 0., 0., 0.]):
         self.alpha = np.asarray(alpha)
         # self.dim_x = dim_x
-        self.data = np.asarray(x0).reshape(1, len(x0))
-        self.data = [x0]
+        # only the last estimate is needed
+        self.x_est = np.array(x0, dtype=float)
 
     def __call__(self, x, u=None):
-        x_est = (1.-self.alpha)*self.data[-1] + self.alpha*x
-        # self.data = np.append(self.data, [np.copy(x_est)], axis=0)
-        self.data.append(x_est)
-        # print(self.data[-2], x, x_est, np.shape(self.data), self.data)
-        return np.copy(x_est)
+        self.x_est = (1.-self.alpha)*self.x_est + self.alpha*x
+        return np.copy(self.x_est)
 
 
 class butter_filter_rt():
+    """
+    first order Butterworth filter of numerically differentiated velocities.
+    For higher orders and per channel cutoffs see
+    double_pendulum.utils.filters.iir_filter.iir_filter_rt
+    """
     def __init__(self,
                  dof=2, cutoff=0.5, dt=0.002,
                  x0=[0., 0., 0., 0.]):
         self.dof = dof
         # self.dim_x = dim_x
-        self.data = [np.array(x0)]
-        self.data_filt = [np.array(x0)]
+        # only the last measurement and estimate are needed
+        self.x_last = np.array(x0, dtype=float)
+        self.x_filt = np.array(x0, dtype=float)
         self.cutoff = cutoff
         self.b, self.a = scipy_signal.butter(1, self.cutoff)
         self.dt = dt
@@ -54,15 +55,13 @@ class butter_filter_rt():
         pos = x[:self.dof]
 
         # numeric diff
-        vel = (pos - self.data[-1][:self.dof]) / self.dt
+        vel = (pos - self.x_last[:self.dof]) / self.dt
 
         # filtering
-        vel = (self.b[0] * vel + self.b[1] * self.data[-1][self.dof:] - self.a[1] * self.data_filt[-1][self.dof:]) / self.a[0]
-
-        self.data.append(x)
+        vel = (self.b[0] * vel + self.b[1] * self.x_last[self.dof:] - self.a[1] * self.x_filt[self.dof:]) / self.a[0]
 
-        x_ = copy.deepcopy(x)
-        x_[self.dof:] = vel
-        self.data_filt.append(x_)
+        self.x_last[:] = x
+        self.x_filt[:self.dof] = pos
+        self.x_filt[self.dof:] = vel
 
-        return np.array(self.data_filt[-1])
+        return np.copy(self.x_filt)
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.optimize import curve_fit as cf
 
 
 def poly1(t,A,B):
@@ -12,18 +11,61 @@ def poly3(t,A,B,C,D):
     return A * pow(t, 3) + B * pow(t, 2) + C * pow(t, 1) + D
 
 
+class PiecewisePolynomial():
+    '''
+    Vectorized piecewise polynomial with a common set of sections for all
+    components.
+    The section of a value is found with a binary search over the section
+    end points and all components are evaluated in one Horner pass.
+    breaks: array of shape (num_break,), end point of every section,
+            a value belongs to the first section with end point >= value,
+            values beyond the last end point use the last section
+    coeffs: array of shape (num_break, degree+1, dim), polynomial
+            coefficients of every section and component, highest degree first
+    '''
+    def __init__(self, breaks, coeffs):
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.coeffs = np.ascontiguousarray(coeffs, dtype=float)
+        self.num_break, self.n_coeff, self.dim = self.coeffs.shape
+
+    def get_value(self, value):
+        '''
+        Evaluate all components at value (scalar or array of shape (n,)),
+        returns an array of shape (dim,) or (n, dim)
+        '''
+        index = np.searchsorted(self.breaks, value, side="left")
+        index = np.minimum(index, self.num_break - 1)
+        c = self.coeffs[index]
+        value = np.asarray(value, dtype=float)[..., np.newaxis]
+        y = c[..., 0, :].copy()
+        for k in range(1, self.n_coeff):
+            y *= value
+            y += c[..., k, :]
+        return y
+
+
 class FitPiecewisePolynomial():
     '''
     Gets data and number of break points and
     fit cubic segment polynomials to each section of data.
+    All sections and output dimensions are fitted in one batched linear
+    least squares solve.
     data_x: a numpy array x data, usually time, that we want to fit polynomial to it
-    data_y: y data that we want to fit polynomial to it
+    data_y: y data that we want to fit polynomial to it,
+            shape (len(data_x),) or (len(data_x), dim)
+    continuity: None for independent sections, 0 for a continuous (C0) or
+                1 for a continuously differentiable (C1) spline,
+                has to be smaller than poly_degree
     '''
-    def __init__(self, data_x, data_y, num_break, poly_degree):
+    def __init__(self, data_x, data_y, num_break, poly_degree, continuity=None):
         self.data_x = data_x
         self.data_y = data_y
         self.num_break = num_break
         self.poly_degree=poly_degree
+        self.continuity = continuity
+        if continuity is not None and not 0 <= continuity < poly_degree:
+            raise ValueError(
+                f"continuity={continuity} requires 0 <= continuity < poly_degree")
         (self.x_sec_data,
          self.y_sec_data,
          self.coeff_sec_data)=self.create_section_poly()
@@ -49,92 +91,156 @@ class FitPiecewisePolynomial():
         '''
         Takes the original data and return a list of splitted arrays
         '''
-        l = len(data)
-        sec_len = int(np.ceil(l/self.num_break))
-#         if l % self.num_break != 0 :
-#             print(f'Uneven division.len={l},section_len={sec_len}, last_sec_len={l - (sec_len * (self.num_break - 1))}')
         return np.array_split(data, self.num_break)
 
+    def fit_local_coefficients(self, x, Y, starts, widths, sizes):
+        '''
+        Least squares fit of the section polynomials in the local
+        coordinates tau = (x - start) / width of every section.
+        Returns the coefficients (highest degree first) with
+        shape (num_break, poly_degree+1, dim)
+        '''
+        n_coeff = self.poly_degree + 1
+        first = np.cumsum(sizes) - sizes
+        section = np.repeat(np.arange(self.num_break), sizes)
+
+        tau = (x - starts[section]) / widths[section]
+        V = tau[:, np.newaxis] ** np.arange(self.poly_degree, -1, -1)
+
+        # normal equations of all sections
+        H = np.add.reduceat(V[:, :, np.newaxis] * V[:, np.newaxis, :], first)
+        G = np.add.reduceat(V[:, :, np.newaxis] * Y[:, np.newaxis, :], first)
+
+        if self.continuity is None:
+            # sections with less than poly_degree+1 points get the
+            # minimum norm solution
+            return np.linalg.pinv(H, hermitian=True) @ G
+
+        # equality constrained least squares (KKT system) with value and
+        # derivative constraints at the section end points
+        S = self.num_break
+        n = S * n_coeff
+        n_con = (S - 1) * (self.continuity + 1)
+        K = np.zeros((n + n_con, n + n_con))
+        rhs = np.zeros((n + n_con, Y.shape[1]))
+        for s in range(S):
+            K[s*n_coeff:(s+1)*n_coeff, s*n_coeff:(s+1)*n_coeff] = H[s]
+        rhs[:n] = G.reshape(n, -1)
+
+        powers = np.arange(self.poly_degree, -1, -1)
+        row = n
+        for s in range(S - 1):
+            knot = starts[s] + widths[s]
+            tau_l = 1.0
+            tau_r = (knot - starts[s+1]) / widths[s+1]
+            dl = np.ones(n_coeff)
+            dr = np.ones(n_coeff)
+            pl = powers.copy()
+            for k in range(self.continuity + 1):
+                con = np.zeros(n)
+                con[s*n_coeff:(s+1)*n_coeff] = dl * tau_l ** np.maximum(pl, 0) / widths[s]**k
+                con[(s+1)*n_coeff:(s+2)*n_coeff] = -dr * tau_r ** np.maximum(pl, 0) / widths[s+1]**k
+                K[row, :n] = con
+                K[:n, row] = con
+                row += 1
+                # derivative of the monomials
+                dl = dl * np.maximum(pl, 0)
+                dr = dr * np.maximum(pl, 0)
+                pl = pl - 1
+        sol = np.linalg.lstsq(K, rhs, rcond=None)[0]
+        return sol[:n].reshape(S, n_coeff, -1)
+
     def create_section_poly(self):
         '''
-        This function takes the splitted data(x, y) and return 2 lists
+        This function takes the splitted data(x, y) and return 3 lists
         - list of the x-data to be fitted to the setion data
         - list of the fitted value
+        - list of the polynomial coefficients (highest degree first)
         '''
-        splitted_data_x = self.split_data(self.data_x)
-        splitted_data_y = self.split_data(self.data_y)
+        x = np.asarray(self.data_x, dtype=float)
+        Y = np.asarray(self.data_y, dtype=float)
+        vector = Y.ndim == 1
+        Y = Y.reshape(len(x), -1)
+
+        splitted_data_x = self.split_data(x)
+        sizes = np.array([len(sec) for sec in splitted_data_x])
+        starts = np.array([sec[0] for sec in splitted_data_x])
+        self.x_ends = np.array([sec[-1] for sec in splitted_data_x])
+        widths = self.x_ends - starts
+        widths[widths == 0.] = 1.
+
+        local = self.fit_local_coefficients(x, Y, starts, widths, sizes)
+
+        # substitute tau = a*x + b to get the coefficients in x
+        a = (1. / widths)[:, np.newaxis]
+        b = (-starts / widths)[:, np.newaxis]
+        coeffs = np.zeros_like(local)
+        for k in range(self.poly_degree + 1):
+            # coeffs = coeffs * (a*x + b) + local[:, k]
+            shifted = np.zeros_like(coeffs)
+            shifted[:, :-1] = coeffs[:, 1:] * a[:, :, np.newaxis]
+            coeffs = shifted + coeffs * b[:, :, np.newaxis]
+            coeffs[:, -1] += local[:, k]
+
+        self.poly = PiecewisePolynomial(self.x_ends, coeffs)
+
         x_sec_data = []
         y_sec_data = []
         coeff_sec_data = []
-        index = 0
-        for sec in splitted_data_x:
+        for index, sec in enumerate(splitted_data_x):
             x_sec_data.append(np.linspace(sec[0],sec[-1],len(sec)))
-            func = self.determin_poly()#self.poly3
-            p_coeff, p_cov = cf(func, splitted_data_x[index],splitted_data_y[index], maxfev=2000)
-            fit = func(x_sec_data[index],*p_coeff)
+            fit = self.poly.get_value(x_sec_data[index])
+            coeff = coeffs[index]
+            if vector:
+                fit = fit[:, 0]
+                coeff = coeff[:, 0]
             y_sec_data.append(fit)
-            coeff_sec_data.append(p_coeff)
-            index +=1
+            coeff_sec_data.append(coeff)
         self.x_sec_data=x_sec_data
         self.y_sec_data=y_sec_data
         self.coeff_sec_data=coeff_sec_data
+        self.vector = vector
         return x_sec_data, y_sec_data, coeff_sec_data
 
     def get_value(self, value):
-        poly_index = min([index for index, element in enumerate([any(poly >= value) for poly in self.x_sec_data])if element == True])
-        p_coeff = self.coeff_sec_data[poly_index]
-        func = self.determin_poly()#self.poly3
-        return func(value,*p_coeff)
+        y = self.poly.get_value(value)
+        if self.vector:
+            return y[..., 0]
+        return y
 
 
 class InterpolateVector():
-    def __init__(self, T, X, num_break=40, poly_degree=3):
+    def __init__(self, T, X, num_break=40, poly_degree=3, continuity=None):
+        X = np.asarray(X, dtype=float)
         self.dim = np.shape(X)[1]
-        self.X = []
-        for d in range(self.dim):
-            if np.count_nonzero(X[:,d]) == 0:
-                self.X.append(None)
-            else:
-                pol = FitPiecewisePolynomial(T, X[:,d], num_break, poly_degree)
-                self.X.append(pol)
+        # components which are zero everywhere are not fitted
+        self.nonzero = np.flatnonzero(np.count_nonzero(X, axis=0))
+        breaks = [sec[-1] for sec in np.array_split(T, num_break)]
+        coeffs = np.zeros((num_break, poly_degree + 1, self.dim))
+        if len(self.nonzero) > 0:
+            self.fit = FitPiecewisePolynomial(T, X[:, self.nonzero], num_break,
+                                              poly_degree, continuity)
+            coeffs[:, :, self.nonzero] = self.fit.poly.coeffs
+        self.poly = PiecewisePolynomial(breaks, coeffs)
 
     def get_value(self, value):
-        x = np.empty(self.dim)
-        for d in range(self.dim):
-            if self.X[d] is not None:
-                val = self.X[d].get_value(value)
-                x[d] = val
-            else:
-                x[d] = 0.
-        return x
+        return self.poly.get_value(value)
 
 class InterpolateMatrix():
-    def __init__(self, T, X, num_break=40, poly_degree=3):
+    def __init__(self, T, X, num_break=40, poly_degree=3, continuity=None):
         self.dim1 = np.shape(X)[1]
         self.dim2 = np.shape(X)[2]
-        self.X = []
-        for d1 in range(self.dim1):
-            Xd1 = []
-            for d2 in range(self.dim2):
-                if np.count_nonzero(X[:,d1, d2]) == 0:
-                    Xd1.append(None)
-                else:
-                    pol = FitPiecewisePolynomial(T, X[:,d1, d2], num_break, poly_degree)
-                    Xd1.append(pol)
-            self.X.append(Xd1)
+        self.interp = InterpolateVector(
+            T, np.reshape(X, (len(X), self.dim1*self.dim2)),
+            num_break, poly_degree, continuity)
+        self.poly = self.interp.poly
 
     def get_value(self, value):
-        x = np.empty((self.dim1, self.dim2))
-        for d1 in range(self.dim1):
-            for d2 in range(self.dim2):
-                if self.X[d1][d2] is not None:
-                    val = self.X[d1][d2].get_value(value)
-                    x[d1, d2] = val
-                else:
-                    x[d1, d2] = 0.
-        return x
-
-def ResampleTrajectory(T, X, U, dt, num_break=40, poly_degree=3):
+        x = self.poly.get_value(value)
+        return x.reshape(x.shape[:-1] + (self.dim1, self.dim2))
+
+def ResampleTrajectory(T, X, U, dt, num_break=40, poly_degree=3,
+                       continuity=None):
 
     n = int(T[-1] / dt)
 
@@ -142,20 +248,17 @@ def ResampleTrajectory(T, X, U, dt, num_break=40, poly_degree=3):
         T=T,
         X=X,
         num_break=num_break,
-        poly_degree=poly_degree)
+        poly_degree=poly_degree,
+        continuity=continuity)
 
     U_interp = InterpolateVector(
         T=T,
         X=U,
         num_break=num_break,
-        poly_degree=poly_degree)
+        poly_degree=poly_degree,
+        continuity=continuity)
 
     T_resamp = np.linspace(0, T[-1], n)
-    X_resamp = []
-    U_resamp = []
-    for t in T_resamp:
-        X_resamp.append(X_interp.get_value(t))
-        U_resamp.append(U_interp.get_value(t))
-    X_resamp = np.asarray(X_resamp)
-    U_resamp = np.asarray(U_resamp)
+    X_resamp = X_interp.get_value(T_resamp)
+    U_resamp = U_interp.get_value(T_resamp)
     return T_resamp, X_resamp, U_resamp
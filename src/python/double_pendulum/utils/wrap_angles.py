@@ -24,3 +24,25 @@ def wrap_angles_diff(x):
     while np.abs(y[1]) > np.pi:
         y[1] -= 2*np.pi
     return y
+
+
+def wrap_angles_top_batch(X):
+    """
+    wrap_angles_top for arrays of states (angles in the first two entries
+    of the last axis)
+
+    Parameters
+    ----------
+    X : array_like, shape=(..., 4)
+        states
+
+    Returns
+    -------
+    numpy_array
+        shape=(..., 4)
+        states with angle1 in [0, 2pi) and angle2 in [-pi, pi)
+    """
+    Y = np.array(X, dtype=float)
+    Y[..., 0] = Y[..., 0] % (2*np.pi)
+    Y[..., 1] = (Y[..., 1] + np.pi) % (2*np.pi) - np.pi
+    return Y
@@ -0,0 +1,86 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.batch_simulation import BatchSimulator
+from double_pendulum.controller.pid.point_pid_controller import PointPIDController
+
+
+class Test(unittest.TestCase):
+
+    plants = [DoublePendulumPlant(mass=[0.606, 0.630],
+                                  length=[0.3, 0.2],
+                                  com=[0.275, 0.166],
+                                  damping=[0.081, 0.0],
+                                  coulomb_fric=[0.093, 0.186],
+                                  torque_limit=[3.0, 3.0]),
+              DoublePendulumPlant(mass=[0.64, 0.56],
+                                  length=[0.2, 0.3],
+                                  com=[0.2, 0.32],
+                                  damping=[0.001, 0.001],
+                                  coulomb_fric=[0.078, 0.093],
+                                  inertia=[0.027, 0.054],
+                                  motor_inertia=6.29e-5,
+                                  torque_limit=[3.0, 3.0])]
+    delays = [0.0, 0.03]
+    responsiveness = [1.0, 0.8]
+
+    x0 = [0.1, -0.2, 0.0, 0.5]
+    dt = 0.01
+    tf = 1.0
+
+    def get_controller(self):
+        controller = PointPIDController(torque_limit=[3.0, 3.0], dt=self.dt)
+        controller.set_parameters(Kp=5.0, Ki=1.0, Kd=0.5)
+        controller.init()
+        return controller
+
+    def test_0_compare_simulator(self):
+        for integrator in ["euler", "runge_kutta"]:
+            bsim = BatchSimulator(self.plants[0], n_rollouts=len(self.plants))
+            bsim.set_plant_parameters(
+                [p.parameter_vector() for p in self.plants])
+            bsim.set_measurement_parameters(delay=self.delays,
+                                            delay_mode="posvel")
+            bsim.set_motor_parameters(u_responsiveness=self.responsiveness)
+            controllers = [self.get_controller() for _ in self.plants]
+            T, X, U = bsim.simulate(0., self.x0, self.tf, self.dt,
+                                    controllers, integrator)
+
+            self.assertTrue(np.shape(X) == (len(self.plants), len(T), 4))
+            self.assertTrue(np.shape(U) == (len(self.plants), len(T)-1, 2))
+
+            for i, plant in enumerate(self.plants):
+                sim = Simulator(plant)
+                sim.set_measurement_parameters(delay=self.delays[i],
+                                               delay_mode="posvel")
+                sim.set_motor_parameters(
+                    u_responsiveness=self.responsiveness[i])
+                T_i, X_i, U_i = sim.simulate(0., self.x0, self.tf, self.dt,
+                                             self.get_controller(),
+                                             integrator)
+                self.assertTrue(np.allclose(T, T_i))
+                self.assertTrue(np.allclose(X[i], X_i, atol=1e-8))
+                self.assertTrue(np.allclose(U[i], U_i, atol=1e-8))
+
+    def test_1_noise_shapes(self):
+        bsim = BatchSimulator(self.plants[0], n_rollouts=5)
+        bsim.set_process_noise([0.0, 0.0, 0.01, 0.01])
+        bsim.set_measurement_parameters(
+            meas_noise_sigmas=np.full((5, 4), 0.01))
+        bsim.set_motor_parameters(u_noise_sigmas=[0.01, 0.01])
+        T, X, U = bsim.simulate(0., self.x0, self.tf, self.dt,
+                                self.get_controller())
+        self.assertTrue(np.shape(X) == (5, len(T), 4))
+        self.assertTrue(np.all(np.isfinite(X)))
+        self.assertTrue(np.max(np.abs(X[0] - X[1])) > 0.)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,274 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import unittest
+import tempfile
+import numpy as np
+
+
+from double_pendulum.analysis.benchmark import benchmarker
+from double_pendulum.analysis.result_cache import track_read_files
+from double_pendulum.simulation.stop_condition import StopCondition
+from double_pendulum.controller.pid.point_pid_controller import PointPIDController
+
+
+def make_controller():
+    controller = PointPIDController(torque_limit=[3.0, 3.0], dt=0.01)
+    controller.set_parameters(Kp=10.0, Ki=0.0, Kd=1.0)
+    controller.set_goal([np.pi, 0.0, 0.0, 0.0])
+    return controller
+
+
+class Test(unittest.TestCase):
+
+    def get_benchmarker(self):
+        ben = benchmarker(
+            controller=None,
+            x0=[np.pi - 0.1, 0.1, 0.0, 0.0],
+            dt=0.01,
+            t_final=0.5,
+            goal=[np.pi, 0.0, 0.0, 0.0],
+            controller_factory=make_controller,
+        )
+        ben.set_model_parameter(torque_limit=[3.0, 3.0])
+        ben.set_cost_par(Q=np.diag([10.0, 10.0, 0.1, 0.1]),
+                         R=np.diag([0.1, 0.1]),
+                         Qf=np.diag([10.0, 10.0, 0.1, 0.1]))
+        return ben
+
+    def benchmark(self, num_workers):
+        ben = self.get_benchmarker()
+        return ben.benchmark(
+            mpar_vars=["m2", "b1"],
+            modelpar_var_lists={"m2": [0.5, 0.7], "b1": [0.0, 0.1]},
+            repetitions=2,
+            meas_noise_sigma_list=[0.1],
+            u_noise_sigma_list=[0.1],
+            u_responses=[1.0, 1.2],
+            delays=[0.0, 0.02],
+            seed=42,
+            num_workers=num_workers)
+
+    def assert_results_equal(self, res1, res2):
+        """
+        compare all costs and successes of two (nested) benchmark results,
+        returns the number of compared arrays
+        """
+        n = 0
+        self.assertEqual(res1.keys(), res2.keys())
+        for key in res1.keys():
+            if isinstance(res1[key], dict):
+                n += self.assert_results_equal(res1[key], res2[key])
+            elif key in ["free_costs", "following_costs", "successes"]:
+                self.assertTrue(np.allclose(np.asarray(res1[key], dtype=float),
+                                            np.asarray(res2[key], dtype=float),
+                                            equal_nan=True))
+                n += 1
+        return n
+
+    def test_0_parallel_benchmark(self):
+        res_serial = self.benchmark(num_workers=1)
+        res_parallel = self.benchmark(num_workers=2)
+
+        self.assertEqual(res_serial.keys(), res_parallel.keys())
+        self.assertEqual(res_serial["model_robustness"]["m2"]["values"],
+                         [0.5, 0.7])
+        self.assertEqual(
+            np.shape(res_serial["meas_noise_robustness"]["None"]["free_costs"]),
+            (1, 2))
+        n_compared = self.assert_results_equal(res_serial, res_parallel)
+        # costs and successes of m2, b1, measurement noise, torque noise,
+        # responsiveness and delay (no trajectory following costs)
+        self.assertEqual(n_compared, 2*6)
+        noise_costs = res_serial["u_noise_robustness"]["free_costs"][0]
+        self.assertNotEqual(noise_costs[0], noise_costs[1])
+
+    def test_1_run_jobs(self):
+        ben = self.get_benchmarker()
+        ben.seed_sequence = np.random.SeedSequence(5)
+        jobs = [{"u_noise_sigmas": [0.1, 0.1]}, {"u_noise_sigmas": [0.2, 0.2]}]
+        res = ben.run_jobs(jobs)
+        # the jobs are not modified, a second run gives the same results
+        self.assertEqual(jobs, [{"u_noise_sigmas": [0.1, 0.1]},
+                                {"u_noise_sigmas": [0.2, 0.2]}])
+        self.assertTrue(np.allclose(np.asarray(res, dtype=float),
+                                    np.asarray(ben.run_jobs(jobs), dtype=float)))
+
+    def test_2_result_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ben = self.get_benchmarker()
+            ben.set_result_cache(cache_dir=cache_dir,
+                                 controller_config={"Kp": 10.0, "Kd": 1.0})
+            res = ben.benchmark(
+                compute_model_robustness=False,
+                compute_noise_robustness=False,
+                compute_uresponsiveness_robustness=False,
+                compute_delay_robustness=False,
+                u_noise_sigma_list=[0.1],
+                seed=3)
+
+            # extending the variation list only simulates the new points
+            # (the torque noise check uses 10 repetitions)
+            n_sims = []
+            simulate_job = ben.simulate_job
+
+            def counting_simulate_job(job):
+                n_sims.append(job)
+                return simulate_job(job)
+            ben.simulate_job = counting_simulate_job
+            res_ext = ben.benchmark(
+                compute_model_robustness=False,
+                compute_noise_robustness=False,
+                compute_uresponsiveness_robustness=False,
+                compute_delay_robustness=False,
+                u_noise_sigma_list=[0.1, 0.5],
+                seed=3)
+            self.assertEqual(len(n_sims), 10)
+            self.assertEqual(res_ext["u_noise_robustness"]["free_costs"][0],
+                             res["u_noise_robustness"]["free_costs"][0])
+
+            # a different seed is not cached
+            n_sims.clear()
+            ben.benchmark(
+                compute_model_robustness=False,
+                compute_noise_robustness=False,
+                compute_uresponsiveness_robustness=False,
+                compute_delay_robustness=False,
+                u_noise_sigma_list=[0.1],
+                seed=4)
+            self.assertEqual(len(n_sims), 10)
+
+    def test_3_result_cache_key(self):
+        job = {"u_noise_sigmas": [0.1, 0.1], "seed": 1, "filter_args": None}
+        stop = {"goal": [np.pi, 0., 0., 0.], "epsilon": [0.1, 0.1, 1., 1.],
+                "hold_time": 0.1}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            keys = []
+            for stop_condition in [stop, StopCondition(**stop),
+                                   StopCondition(**stop)]:
+                ben = self.get_benchmarker()
+                ben.set_stop_condition(stop_condition)
+                # derived from the source of make_controller
+                ben.set_result_cache(cache_dir=cache_dir)
+                keys.append(ben.get_job_key(job))
+                # running the controller does not change the key
+                ben.seed_sequence = np.random.SeedSequence(0)
+                ben.run_jobs([job])
+                keys.append(ben.get_job_key(job))
+            self.assertEqual(keys[0], keys[1])
+            self.assertEqual(len(set(keys[2:])), 1)
+
+            ben.set_stop_condition(lambda t, x, tau: None)
+            with self.assertRaises(ValueError):
+                ben.get_job_key(job)
+
+            # a live controller without factory cannot be described
+            ben = benchmarker(controller=make_controller(),
+                              x0=[np.pi - 0.1, 0.1, 0.0, 0.0], dt=0.01,
+                              t_final=0.5, goal=[np.pi, 0.0, 0.0, 0.0])
+            with self.assertRaises(ValueError):
+                ben.set_result_cache(cache_dir=cache_dir)
+            ben.set_result_cache(cache_dir=cache_dir,
+                                 controller_config={"Kp": 10.0, "Kd": 1.0})
+
+            # data files read by a controller script can enter its config
+            traj_path = os.path.join(cache_dir, "data", "trajectory.csv")
+            os.makedirs(os.path.dirname(traj_path))
+            np.savetxt(traj_path, np.ones((3, 2)), delimiter=",")
+            other_path = os.path.join(cache_dir, "other.csv")
+            np.savetxt(other_path, np.ones(2))
+            with track_read_files(os.path.join(cache_dir, "data")) as files:
+                np.loadtxt(traj_path, delimiter=",")
+                np.loadtxt(other_path)
+                np.savetxt(os.path.join(cache_dir, "data", "out.csv"),
+                           np.ones(2))
+            self.assertEqual(files, {os.path.abspath(traj_path)})
+
+    def test_4_parameter_sweep(self):
+        ben = self.get_benchmarker()
+        spec = {"m2": [0.5, 0.6, 0.7], "b1": [0.081, 0.1]}
+        res = ben.check_parameter_sweep(spec, method="grid", backend="serial")
+        self.assertEqual(res["names"], ["m2", "b1"])
+        self.assertEqual(np.shape(res["values"]), (6, 2))
+        self.assertEqual(np.shape(res["free_costs"]), (6,))
+        self.assertEqual(res["successes"].dtype, bool)
+
+        res_batch = ben.check_parameter_sweep(spec, method="grid",
+                                              backend="batch", batch_size=4)
+        self.assertTrue(np.allclose(res["free_costs"],
+                                    res_batch["free_costs"], rtol=1e-6))
+
+        # one dimensional sweeps are the model robustness check
+        res_mp = ben.check_modelpar_robustness(
+            mpar_vars=["m2"], var_lists={"m2": spec["m2"]})
+        self.assertTrue(np.allclose(res_mp["m2"]["free_costs"],
+                                    res["free_costs"][::2]))
+
+        for method in ["lhs", "sobol"]:
+            res = ben.check_parameter_sweep(spec, method=method,
+                                            n_samples=8, seed=0,
+                                            backend="batch")
+            self.assertEqual(np.shape(res["values"]), (8, 2))
+            self.assertTrue(np.all(res["values"][:, 0] >= 0.5))
+            self.assertTrue(np.all(res["values"][:, 0] <= 0.7))
+
+        # the batch backend does not silently drop filters or stop conditions
+        ben.filter_args = {"filt": "lowpass", "x0": ben.goal, "dt": ben.dt,
+                           "velocity_cut": 0.0, "filter_kwargs": {}}
+        with self.assertRaises(NotImplementedError):
+            ben.check_parameter_sweep(spec, backend="batch")
+        ben.filter_args = None
+        ben.set_stop_condition({"goal": ben.goal, "epsilon": [0.1, 0.1, 1., 1.]})
+        with self.assertRaises(NotImplementedError):
+            ben.check_parameter_sweep(spec, backend="batch")
+
+    def test_5_adaptive_boundary_search(self):
+        ben = self.get_benchmarker()
+        ben.t_final = 2.0
+        var_lists = {"m2": np.linspace(0.2, 3.0, 21)}
+        res = ben.check_modelpar_robustness(mpar_vars=["m2"],
+                                            var_lists=var_lists)
+        ben.set_adaptive_parameters(n_coarse=5)
+        res_ad = ben.check_modelpar_robustness(mpar_vars=["m2"],
+                                               var_lists=var_lists,
+                                               adaptive=True)
+        # the controller fails for heavy second links
+        self.assertTrue(res["m2"]["successes"][0])
+        self.assertFalse(res["m2"]["successes"][-1])
+        self.assertEqual(list(res["m2"]["successes"]),
+                         list(res_ad["m2"]["successes"]))
+        self.assertLess(np.sum(res_ad["m2"]["simulated"]), 10)
+        sim = np.asarray(res_ad["m2"]["simulated"])
+        C = np.asarray(res["m2"]["free_costs"])
+        C_ad = np.asarray(res_ad["m2"]["free_costs"])
+        self.assertTrue(np.allclose(C[sim], C_ad[sim], equal_nan=True))
+        self.assertTrue(np.all(np.isnan(C_ad[~sim])))
+
+    def test_6_batch_success_measure(self):
+        ben = self.get_benchmarker()
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(5, 101, 4)) + ben.goal
+        U = rng.normal(size=(5, 100, 2))
+        X[1, -1] = np.nan
+        X[2, 50] = ben.goal + [2*np.pi, -2*np.pi, 0., 0.]
+        C_free, C_tf, succ = ben.compute_success_measure(X, U)
+        self.assertEqual(np.shape(C_free), (5,))
+        self.assertTrue(succ[2])
+        for i in range(5):
+            c_free, c_tf, s = ben.compute_success_measure(X[i].tolist(),
+                                                          U[i].tolist())
+            self.assertTrue(np.allclose(c_free, C_free[i], equal_nan=True))
+            self.assertEqual(s, succ[i])
+            xf = X[i, -1] - ben.goal
+            ref = (np.einsum("ni, ij, nj", X[i, :-1] - ben.goal, ben.Q,
+                             X[i, :-1] - ben.goal) / 100.
+                   + np.einsum("ni, ij, nj", U[i], ben.R, U[i]) / 100.
+                   + xf @ ben.Qf @ xf)
+            self.assertTrue(np.allclose(c_free, ref, equal_nan=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+from double_pendulum.controller.pid.point_pid_controller import PointPIDController
+
+
+class Test(unittest.TestCase):
+
+    dt = 0.01
+    goal = np.array([np.pi, 0., 0., 0.])
+
+    def get_controller(self, Ki, torque_limit=[5., 5.]):
+        controller = PointPIDController(torque_limit=torque_limit, dt=self.dt)
+        controller.set_parameters(Kp=2., Ki=Ki, Kd=0.1)
+        controller.set_goal(self.goal)
+        controller.init()
+        return controller
+
+    def test_0_running_accumulators(self):
+        controller = self.get_controller(Ki=0.5)
+        rng = np.random.default_rng(0)
+        errors = []
+        for i in range(300):
+            x = self.goal + 0.3*rng.standard_normal(4)
+            u = controller.get_control_output_(x)
+
+            # reference: sums over the whole error history
+            e = (self.goal[:2] - x[:2] + np.pi) % (2*np.pi) - np.pi
+            errors.append(e)
+            u_ref = 2.*e + 0.5*np.sum(errors, axis=0)*self.dt
+            if len(errors) > 2:
+                u_ref += 0.1*(errors[-1] - errors[-2]) / self.dt
+            u_ref = np.clip(u_ref, -5., 5.)
+            self.assertTrue(np.allclose(u, u_ref))
+
+        self.assertTrue(np.allclose(controller.pid_state.get_history(),
+                                    np.asarray(errors).T))
+
+    def test_1_anti_windup(self):
+        controller = self.get_controller(Ki=10., torque_limit=[1., 1.])
+        x = self.goal + np.array([0.5, -0.5, 0., 0.])
+        for i in range(1000):
+            controller.get_control_output_(x)
+        self.assertTrue(np.all(np.abs(controller.Ki*controller.pid_state.integral) <= 1. + 1e-12))
+
+        # the integral term unwinds immediately when the error changes sign
+        # (the second tick avoids the derivative kick)
+        x = self.goal - np.array([0.5, -0.5, 0., 0.])
+        controller.get_control_output_(x)
+        u = controller.get_control_output_(x)
+        self.assertTrue(np.all(np.abs(u) < 0.5))
+
+    def test_2_bounded_history(self):
+        controller = self.get_controller(Ki=0.1)
+        controller.pid_state.history_length = 100
+        controller.pid_state.reset()
+        for i in range(1000):
+            controller.get_control_output_(self.goal)
+        self.assertEqual(controller.pid_state.get_history().shape, (2, 100))
+        self.assertEqual(controller.pid_state.n_updates, 1000)
+
+    def test_3_history_recording(self):
+        controller = self.get_controller(Ki=0.)
+        X = self.goal + 0.1*np.random.default_rng(1).standard_normal((50, 4))
+        U = [controller.get_control_output(x) for x in X]
+        self.assertTrue(np.allclose(controller.x_hist, X))
+        self.assertTrue(np.allclose(controller.u_hist[1:], U))
+        self.assertTrue(np.allclose(controller.u_hist[0], 0.))
+
+        controller.set_history_recording("ring", 10)
+        U = [controller.get_control_output(x) for x in X]
+        self.assertTrue(np.allclose(controller.x_filt_hist, X[-10:]))
+        self.assertEqual(controller.u_hist.shape, (11, 2))
+        self.assertTrue(np.allclose(controller.u_hist, U[-11:]))
+        self.assertTrue(np.allclose(controller.get_history("u"), U[-10:]))
+
+        controller.set_history_recording("off")
+        U_off = [controller.get_control_output(x) for x in X]
+        self.assertEqual(len(controller.x_hist), 0)
+        self.assertTrue(np.allclose(U_off, U))
+
+        controller.set_history_recording("full", 4)
+        controller.init()
+        for x in X:
+            controller.get_control_output(x)
+        self.assertEqual(controller.u_fric_hist.shape, (50, 2))
+
+        controller = self.get_controller(Ki=0.)
+        controller.set_history_recording("ring", 10)
+        U = [controller.get_control_output(x) for x in X[:10]]
+        self.assertEqual(controller.u_hist.shape, (11, 2))
+        self.assertTrue(np.allclose(controller.u_hist[0], 0.))
+        self.assertTrue(np.allclose(controller.u_hist[1:], U))
+        # after the wrap u_hist[1:] still lines up with x_hist
+        U.append(controller.get_control_output(X[10]))
+        self.assertTrue(np.allclose(controller.x_hist, X[1:11]))
+        self.assertEqual(controller.u_hist.shape, (11, 2))
+        self.assertTrue(np.allclose(controller.u_hist[0], U[0]))
+        self.assertTrue(np.allclose(controller.u_hist[1:], U[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
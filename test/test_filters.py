@@ -0,0 +1,134 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+from scipy import signal
+
+from double_pendulum.utils.filters.iir_filter import iir_filter_rt
+from double_pendulum.utils.filters.kalman_filter import kalman_filter_rt
+from double_pendulum.utils.filters.extended_kalman_filter import extended_kalman_filter_rt
+from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.controller.pid.point_pid_controller import PointPIDController
+
+
+class Test(unittest.TestCase):
+
+    X = np.random.default_rng(0).standard_normal((300, 4)) + 2.
+    cutoff = [1., 0.5, 0.3, 0.1]
+
+    def test_0_iir_filter(self):
+        for order in [1, 2, 3, 4]:
+            filt = iir_filter_rt(order=order, cutoff=self.cutoff, x0=self.X[0])
+            Y = np.array([filt(x) for x in self.X])
+            for d, c in enumerate(self.cutoff):
+                if c < 1.:
+                    sos = signal.butter(order, c, output="sos")
+                    zi = signal.sosfilt_zi(sos)*self.X[0, d]
+                    ref = signal.sosfilt(sos, self.X[:, d], zi=zi)[0]
+                else:
+                    ref = self.X[:, d]
+                self.assertTrue(np.allclose(Y[:, d], ref))
+
+    def test_1_iir_filter_batch(self):
+        M = 3
+        filt = iir_filter_rt(order=3, cutoff=self.cutoff, x0=self.X[0])
+        filt_batch = iir_filter_rt(order=3, cutoff=self.cutoff,
+                                   x0=np.tile(self.X[0], (M, 1)))
+        out = np.empty((M, 4))
+        for x in self.X:
+            y = filt(x)
+            y_batch = filt_batch(np.tile(x, (M, 1)), out=out)
+            self.assertTrue(y_batch is out)
+            self.assertTrue(np.allclose(y_batch, y))
+
+    def test_2_controller_filter(self):
+        controller = PointPIDController()
+        controller.set_filter_args(filt="iir", x0=self.X[0],
+                                   filter_kwargs={"iir_order": 2,
+                                                  "iir_cutoff": self.cutoff})
+        controller.init()
+        filt = iir_filter_rt(order=2, cutoff=self.cutoff, x0=self.X[0])
+        for x in self.X[:20]:
+            controller.get_control_output(x)
+        Y = np.array([filt(x) for x in self.X[:20]])
+        self.assertTrue(np.allclose(controller.x_filt_hist, Y))
+
+    def test_3_kalman_filter_steady_state(self):
+        plant = DoublePendulumPlant(model_pars=model_parameters())
+        x_lin = np.array([np.pi, 0., 0., 0.])
+        A, B = plant.linear_matrices(x_lin, [0., 0.])
+        kwargs = {"A": A, "B": B, "x0": x_lin, "dt": 0.01,
+                  "process_noise": [1e-3, 1e-3, 1e-2, 1e-2]}
+        filt = kalman_filter_rt(**kwargs)
+        filt_ss = kalman_filter_rt(steady_state=True, **kwargs)
+        self.assertTrue(filt_ss.steady_state)
+        # same symmetrized process noise as used for the steady state gain
+        filt.f.Q = 0.5*(filt.f.Q + filt.f.Q.T)
+        X = x_lin + 0.01*np.random.default_rng(1).standard_normal((5000, 4))
+        u = np.zeros(2)
+        # converge the time-varying gain, then start from the same estimate
+        for x in X:
+            filt(x, u)
+        self.assertTrue(np.allclose(filt.f.K, filt_ss.K, atol=1e-6))
+        filt_ss.v[:4] = filt.f.x
+        for x in X[:100]:
+            self.assertTrue(np.allclose(filt(x, u), filt_ss(x, u), atol=1e-5))
+
+        # no stabilizing solution of the Riccati equation: full update
+        kwargs["process_noise"] = [1., 1., 10., 10.]
+        filt = kalman_filter_rt(**kwargs)
+        filt_ss = kalman_filter_rt(steady_state=True, **kwargs)
+        self.assertFalse(filt_ss.steady_state)
+        for x in X[:10]:
+            self.assertTrue(np.allclose(filt(x, u), filt_ss(x, u)))
+
+    def test_4_extended_kalman_filter(self):
+        plant = DoublePendulumPlant(model_pars=model_parameters())
+        sim = Simulator(plant=plant)
+        dt = 0.005
+        x0 = [2.5, -1., 0., 0.]
+        T, X, U = sim.simulate(t0=0., x0=x0, tf=2., dt=dt, controller=None,
+                               integrator="runge_kutta")
+        X = np.asarray(X)
+        meas_noise = [1e-6, 1e-6, 0.05, 0.05]
+        Z = X + np.random.default_rng(2).normal(0., np.sqrt(meas_noise), X.shape)
+        u = np.zeros(2)
+        kwargs = {"x0": x0, "dt": dt,
+                  "process_noise": [1e-4, 1e-4, 1e-3, 1e-3],
+                  "measurement_noise": meas_noise}
+        ekf = extended_kalman_filter_rt(plant=plant, fx=sim.runge_integrator,
+                                        **kwargs)
+        ekf_generic = extended_kalman_filter_rt(plant=plant, **kwargs)
+        # linear_matrices and rhs instead of the scalar fast path
+        ekf_generic.fast = False
+        Y = np.array([ekf(z, u) for z in Z])
+        Y_generic = np.array([ekf_generic(z, u) for z in Z])
+        self.assertTrue(np.allclose(Y, Y_generic))
+        err_meas = np.sqrt(np.mean((Z - X)[:, 2:]**2))
+        err_ekf = np.sqrt(np.mean((Y - X)[:, 2:]**2))
+        self.assertLess(err_ekf, 0.3*err_meas)
+
+        controller = PointPIDController(dt=dt)
+        controller.set_filter_args(filt="ekf", x0=x0, dt=dt, plant=plant,
+                                   simulator=sim,
+                                   filter_kwargs={
+                                       "ekf_integrator": "runge_kutta",
+                                       "ekf_process_noise_sigmas": kwargs["process_noise"],
+                                       "ekf_meas_noise_sigmas": meas_noise})
+        controller.init()
+        ekf = extended_kalman_filter_rt(plant=plant, **kwargs)
+        Y = []
+        last_u = np.zeros(2)
+        for z in Z[:20]:
+            Y.append(ekf(z, last_u))
+            last_u = controller.get_control_output(z)
+        self.assertTrue(np.allclose(controller.x_filt_hist, Y))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.utils.csv_trajectory import save_trajectory
+from double_pendulum.analysis import leaderboard
+
+
+class Test(unittest.TestCase):
+
+    mpar = model_parameters()
+    weights = {
+        "swingup_time": 0.2,
+        "max_tau": 0.1,
+        "energy": 0.0,
+        "integ_tau": 0.1,
+        "tau_cost": 0.0,
+        "tau_smoothness": 0.5,
+        "velocity_cost": 0.1,
+    }
+    normalize = {
+        "swingup_time": 10.0,
+        "max_tau": 1.0,
+        "energy": 1.0,
+        "integ_tau": 10.0,
+        "tau_cost": 10.0,
+        "tau_smoothness": 1.0,
+        "velocity_cost": 1000.0,
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def save_csv(self, name, seed):
+        rng = np.random.default_rng(seed)
+        N = 50
+        T = np.linspace(0.0, 1.0, N)
+        X = np.zeros((N, 4))
+        X[:, 0] = np.linspace(0.0, np.pi, N)
+        X[:, 2:] = rng.normal(size=(N, 2))
+        U = rng.normal(size=(N, 2))
+        path = os.path.join(self.tmp_dir.name, name, "sim_swingup.csv")
+        os.makedirs(os.path.dirname(path))
+        save_trajectory(path, T=T, X_meas=X, U_con=U)
+        return path
+
+    def scored_paths(self, paths, weights, cache_file):
+        with mock.patch.object(
+            leaderboard,
+            "get_trajectory_scores",
+            wraps=leaderboard.get_trajectory_scores,
+        ) as score_mock:
+            scores = leaderboard.get_path_scores(
+                paths, self.mpar, weights, self.normalize, cache_file=cache_file
+            )
+        return scores, sorted(c.args[0] for c in score_mock.call_args_list)
+
+    def test_0_score_cache_new_file(self):
+        cache_file = os.path.join(self.tmp_dir.name, "cache.pkl")
+        paths = [self.save_csv("con1", 0), self.save_csv("con2", 1)]
+
+        scores1, scored = self.scored_paths(paths, self.weights, cache_file)
+        self.assertEqual(scored, sorted(paths))
+        self.assertTrue(os.path.isfile(cache_file))
+
+        new_path = self.save_csv("con3", 2)
+        scores2, scored = self.scored_paths(paths + [new_path], self.weights, cache_file)
+        self.assertEqual(scored, [new_path])
+        for path in paths:
+            self.assertEqual(scores1[path], scores2[path])
+
+        scores3, _ = self.scored_paths([new_path], self.weights, None)
+        self.assertEqual(scores2[new_path], scores3[new_path])
+
+    def test_1_score_cache_weights(self):
+        cache_file = os.path.join(self.tmp_dir.name, "cache.pkl")
+        paths = [self.save_csv("con1", 0), self.save_csv("con2", 1)]
+
+        scores1, _ = self.scored_paths(paths, self.weights, cache_file)
+        _, scored = self.scored_paths(paths, self.weights, cache_file)
+        self.assertEqual(scored, [])
+
+        weights = dict(self.weights, max_tau=0.0, tau_smoothness=0.6)
+        scores2, scored = self.scored_paths(paths, weights, cache_file)
+        self.assertEqual(scored, sorted(paths))
+        for path in paths:
+            self.assertEqual(scores1[path]["max_tau"], scores2[path]["max_tau"])
+            self.assertNotEqual(scores1[path]["score"], scores2[path]["score"])
+
+    def test_2_leaderboard_no_cache_file(self):
+        path = self.save_csv("con1", 0)
+        save_to = os.path.join(self.tmp_dir.name, "leaderboard.csv")
+        data_paths = {
+            "con1": {
+                "csv_path": path,
+                "name": "con1",
+                "short_description": "test controller",
+                "username": "test",
+            }
+        }
+        leaderboard.leaderboard_scores(
+            data_paths, save_to, self.mpar, self.weights, self.normalize
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir.name)), ["con1", "leaderboard.csv"]
+        )
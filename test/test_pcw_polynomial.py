@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+
+from double_pendulum.utils.pcw_polynomial import (FitPiecewisePolynomial,
+                                                  InterpolateVector,
+                                                  InterpolateMatrix)
+
+
+class Test(unittest.TestCase):
+
+    T = np.linspace(0., 5., 501)
+    X = np.array([np.sin(T), np.zeros_like(T), T**2, np.cos(2.*T)]).T
+    K = np.array([[np.sin(T), np.cos(T)], [np.zeros_like(T), T]]).transpose(2, 0, 1)
+
+    def reference(self, x, t, num_break):
+        # independent least squares fit of the section of t, the sections
+        # are looked up as in the original list search
+        secs_t = np.array_split(self.T, num_break)
+        secs_x = np.array_split(x, num_break)
+        index = min([i for i, sec in enumerate(secs_t) if any(sec >= t)])
+        coeff = np.polyfit(secs_t[index], secs_x[index], 3)
+        return np.polyval(coeff, t)
+
+    def test_0_interpolate_vector(self):
+        interp = InterpolateVector(self.T, self.X, num_break=20, poly_degree=3)
+        for t in np.linspace(0., 5., 57):
+            x = interp.get_value(t)
+            self.assertEqual(x.shape, (4,))
+            self.assertEqual(x[1], 0.)
+            for d in [0, 2, 3]:
+                self.assertAlmostEqual(x[d], self.reference(self.X[:, d], t, 20))
+
+        # evaluation of many times at once
+        tt = np.linspace(0., 5., 33)
+        xx = interp.get_value(tt)
+        self.assertEqual(xx.shape, (33, 4))
+        self.assertTrue(np.allclose(xx, [interp.get_value(t) for t in tt]))
+        self.assertTrue(np.allclose(xx[:, 0], np.sin(tt), atol=1e-3))
+
+        fit = FitPiecewisePolynomial(self.T, self.X[:, 3], 20, 3)
+        self.assertAlmostEqual(fit.get_value(1.234), interp.get_value(1.234)[3])
+        self.assertEqual(len(fit.coeff_sec_data), 20)
+        self.assertEqual(np.shape(fit.coeff_sec_data[0]), (4,))
+
+    def test_1_interpolate_matrix(self):
+        interp = InterpolateMatrix(self.T, self.K, num_break=10, poly_degree=3)
+        for t in [0., 0.25, 1.7, 5.]:
+            k = interp.get_value(t)
+            self.assertEqual(k.shape, (2, 2))
+            self.assertEqual(k[1, 0], 0.)
+            self.assertAlmostEqual(k[0, 1], self.reference(self.K[:, 0, 1], t, 10))
+            self.assertAlmostEqual(k[1, 1], t)
+
+    def test_2_spline(self):
+        noisy = self.X[:, 0] + 0.01*np.random.default_rng(0).standard_normal(len(self.T))
+        fit = FitPiecewisePolynomial(self.T, noisy, 10, 3, continuity=1)
+        h = 1e-7
+        for knot in fit.x_ends[:-1]:
+            left = fit.get_value(knot)
+            right = fit.get_value(knot + h)
+            self.assertAlmostEqual(left, right, places=5)
+            dleft = (left - fit.get_value(knot - h)) / h
+            dright = (fit.get_value(knot + 2*h) - right) / h
+            self.assertAlmostEqual(dleft, dright, places=3)
+        tt = np.linspace(0., 5., 100)
+        self.assertTrue(np.allclose(fit.get_value(tt), np.sin(tt), atol=0.02))
+
+
+if __name__ == '__main__':
+    unittest.main()
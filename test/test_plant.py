@@ -238,5 +238,95 @@ class Test(unittest.TestCase):
                     self.assertTrue(np.shape(B) == (4,2))
                     self.assertTrue(not None in B)
 
+    def test_18_rhs_batch(self):
+
+        X = np.asarray(self.states)
+        for p in self.plants:
+            for formulas in ["UnderactuatedLecture", "Spong"]:
+                p.formulas = formulas
+                for u in self.actions:
+                    U = np.tile(u, (len(X), 1))
+                    res = p.rhs_batch(0., X, U)
+                    self.assertTrue(type(res) == np.ndarray)
+                    self.assertTrue(np.shape(res) == (len(X), 4))
+                    for i, x in enumerate(X):
+                        res_scalar = p.rhs(0., x, u)
+                        self.assertTrue(np.allclose(res[i], res_scalar,
+                                                    rtol=1e-12, atol=1e-12))
+            p.formulas = "UnderactuatedLecture"
+
+    def test_19_rhs_fast(self):
+
+        out = np.zeros(4)
+        for p in self.plants:
+            for formulas in ["UnderactuatedLecture", "Spong"]:
+                # the coefficients are updated when the formulas change
+                p.formulas = formulas
+                for x in np.asarray(self.states, dtype=float):
+                    for u in self.actions:
+                        res = p.rhs_into(x, u, out)
+                        res_scalar = p.rhs(0., x, u)
+                        self.assertTrue(np.allclose(res, res_scalar,
+                                                    rtol=1e-12, atol=1e-12))
+            p.formulas = "UnderactuatedLecture"
+
+            # diverged states give nan like the numpy implementation
+            for x in [[np.inf, 0., 0., 0.], [0., 0., np.nan, 0.],
+                      [0., 0., 0., -np.inf]]:
+                res = p.rhs_into(np.array(x), [0., 0.], out)
+                self.assertTrue(np.all(np.isnan(res[2:])))
+
+        # reassigned model parameters are used by the fast path
+        p = DoublePendulumPlant(model_pars=self.mpar)
+        x = np.asarray(self.states[2], dtype=float)
+        u = self.actions[3]
+        p.m = [2.*m for m in p.m]
+        p.b = [0.5, 0.5]
+        self.assertTrue(np.allclose(p.rhs_into(x, u, out), p.rhs(0., x, u),
+                                    rtol=1e-12, atol=1e-12))
+
+    def test_20_trajectory_quantities(self):
+        X = np.asarray(self.states, dtype=float)
+        for p in self.plants:
+            for formulas in ["UnderactuatedLecture", "Spong"]:
+                p.formulas = formulas
+                fk = p.forward_kinematics_batch(X)
+                E = p.total_energy_batch(X)
+                L = p.angular_momentum_batch(X)
+                com = p.center_of_mass_batch(X[:, :2])
+                self.assertEqual(fk.shape, (len(X), 2, 2))
+                self.assertEqual(com.shape, (len(X), 2))
+                for i, x in enumerate(X):
+                    self.assertTrue(np.allclose(fk[i], p.forward_kinematics(x[:2])))
+                    self.assertTrue(np.isclose(E[i], p.total_energy(x)))
+                    self.assertTrue(np.isclose(L[i], p.mass_matrix(x)[0].dot(x[2:])))
+                    m = np.asarray(p.m)
+                    self.assertTrue(np.allclose(com[i] * np.sum(m),
+                                                (m * p.com)[0] * fk[i, 0] / p.l[0] +
+                                                m[1] * (fk[i, 0] + p.com[1] * (fk[i, 1] - fk[i, 0]) / p.l[1])))
+            p.formulas = "UnderactuatedLecture"
+
+    def test_21_linear_matrices_into(self):
+        A = np.empty((4, 4))
+        B = np.empty((4, 2))
+        eps = 1e-6
+        for p in self.plants:
+            for formulas in ["UnderactuatedLecture", "Spong"]:
+                p.formulas = formulas
+                p.init_fast_dynamics()
+                for x in self.states[:4]:
+                    for u in self.actions[:4]:
+                        x = np.asarray(x, dtype=float)
+                        p.linear_matrices_into(x, u, A, B)
+                        # central differences of the equations of motion
+                        for i in range(4):
+                            dx = np.zeros(4)
+                            dx[i] = eps
+                            col = (p.rhs(0., x + dx, u) - p.rhs(0., x - dx, u)) / (2*eps)
+                            self.assertTrue(np.allclose(A[:, i], col, rtol=1e-5, atol=1e-4))
+                        self.assertTrue(np.allclose(B, p.get_Blin(x, u)))
+            p.formulas = "UnderactuatedLecture"
+            p.init_fast_dynamics()
+
 if __name__ == '__main__':
     unittest.main()
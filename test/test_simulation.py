@@ -9,6 +9,7 @@ import numpy as np
 
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.controller.pid.point_pid_controller import PointPIDController
 
 
 class Test(unittest.TestCase):
@@ -62,12 +63,12 @@ class Test(unittest.TestCase):
 
     def test_1_reset_data_recorder(self):
         self.simulator.reset_data_recorder()
-        self.assertTrue(self.simulator.t_values == [])
-        self.assertTrue(self.simulator.x_values == [])
-        self.assertTrue(self.simulator.tau_values == [])
-        self.assertTrue(self.simulator.meas_x_values == [])
-        self.assertTrue(self.simulator.filt_x_values == [])
-        self.assertTrue(self.simulator.con_u_values == [])
+        self.assertTrue(len(self.simulator.t_values) == 0)
+        self.assertTrue(len(self.simulator.x_values) == 0)
+        self.assertTrue(len(self.simulator.tau_values) == 0)
+        self.assertTrue(len(self.simulator.meas_x_values) == 0)
+        self.assertTrue(len(self.simulator.filt_x_values) == 0)
+        self.assertTrue(len(self.simulator.con_u_values) == 0)
 
     def test_2_record_data(self):
         for t in self.times:
@@ -147,3 +148,145 @@ class Test(unittest.TestCase):
                                 self.assertTrue(np.shape(T) in [(N,), (N+1,)])
                                 self.assertTrue(np.shape(X) in [(N,4), (N+1,4)])
                                 self.assertTrue(np.shape(U) in [(N-1,2), (N, 2)])
+
+    def test_7_return_lists(self):
+        sim_lists = Simulator(self.plant, return_lists=True)
+        for dt in self.dts:
+            x0 = self.states[2]
+            T, X, U = self.simulator.simulate(0., x0, 1., dt)
+            T_l, X_l, U_l = sim_lists.simulate(0., x0, 1., dt)
+            self.assertTrue(type(T_l) == list)
+            self.assertTrue(type(X_l) == list)
+            self.assertTrue(type(U_l) == list)
+            self.assertTrue(np.allclose(T, T_l))
+            self.assertTrue(np.allclose(X, X_l))
+            self.assertTrue(np.allclose(U, U_l))
+
+    def test_8_delay_without_record(self):
+        sim_norec = Simulator(self.plant, record_trajectory=False)
+        for sim in [self.simulator, sim_norec]:
+            sim.reset()
+            sim.set_measurement_parameters(delay=0.05, delay_mode="posvel")
+            sim.set_motor_parameters(u_responsiveness=0.7)
+        controller = PointPIDController(torque_limit=[3.0, 3.0], dt=0.01)
+        controller.set_parameters(Kp=5.0, Ki=0.0, Kd=0.5)
+        controller.init()
+        T, X, U = self.simulator.simulate(0., self.states[2], 1., 0.01,
+                                          controller)
+        controller.init()
+        T_n, X_n, U_n = sim_norec.simulate(0., self.states[2], 1., 0.01,
+                                           controller)
+        self.assertTrue(len(T_n) == 0)
+        self.assertTrue(len(X_n) == 0)
+        self.assertTrue(np.allclose(X[-1], sim_norec.get_state()[1]))
+        self.simulator.reset()
+
+    def test_9_adaptive_integrators(self):
+        x0 = [0.5, -0.5, 2.0, -3.0]
+        self.simulator.reset()
+        T, X, U = self.simulator.simulate(0., x0, 0.5, 0.0005)
+        x_ref = np.copy(X[-1])
+        for integrator in ["dopri5", "bs32"]:
+            self.simulator.set_integrator_parameters(rtol=1e-8, atol=1e-8)
+            T_a, X_a, U_a = self.simulator.simulate(0., x0, 0.5, 0.01,
+                                                    integrator=integrator)
+            stats = self.simulator.get_integrator_statistics()
+            self.assertTrue(np.isclose(T[-1], T_a[-1]))
+            self.assertTrue(np.max(np.abs(X_a[-1] - x_ref)) < 1e-4)
+            self.assertTrue(stats["n_accepted"] >= len(T_a) - 1)
+            self.assertTrue(stats["n_rhs"] > 0)
+
+            # dense output inside the last interval
+            integ = self.simulator.adaptive_integrator
+            t_end = T_a[-1]
+            self.assertTrue(np.allclose(integ.dense_output(t_end), X_a[-1]))
+            self.assertTrue(np.allclose(integ.dense_output(T_a[-2]), X_a[-2]))
+            i_mid = np.argmin(np.abs(T - (t_end - 0.005)))
+            self.assertTrue(np.max(np.abs(integ.dense_output(T[i_mid])
+                                          - X[i_mid])) < 1e-4)
+        self.simulator.reset()
+
+    def test_10_multi_rate(self):
+        controller = PointPIDController(torque_limit=[3.0, 3.0], dt=0.01)
+        controller.set_parameters(Kp=5.0, Ki=0.0, Kd=0.5)
+        x0 = self.states[2]
+        self.simulator.reset()
+
+        controller.init()
+        T, X, U = self.simulator.simulate(0., x0, 1., 0.01, controller)
+        controller.init()
+        T_s, X_s, U_s = self.simulator.simulate(0., x0, 1., controller=controller,
+                                                controller_dt=0.01,
+                                                physics_dt=0.01)
+        self.assertTrue(np.allclose(X, X_s))
+
+        controller.init()
+        T_r, X_r, U_r = self.simulator.simulate(0., x0, 1., controller=controller,
+                                                controller_dt=0.01,
+                                                physics_dt=0.00025)
+        x_ref = np.copy(X_r[-1])
+
+        for record_rate, n_rec in [("controller", 1), ("physics", 10)]:
+            controller.init()
+            T_m, X_m, U_m = self.simulator.simulate(0., x0, 1.,
+                                                    controller=controller,
+                                                    controller_dt=0.01,
+                                                    physics_dt=0.001,
+                                                    record_rate=record_rate)
+            n_ticks = len(self.simulator.con_u_values)
+            self.assertTrue(n_ticks == len(T) - 1)
+            self.assertTrue(len(self.simulator.meas_x_values) == n_ticks)
+            self.assertTrue(len(T_m) == n_rec * n_ticks + 1)
+            self.assertTrue(np.shape(X_m) == (n_rec * n_ticks + 1, 4))
+            self.assertTrue(np.shape(U_m) == (n_rec * n_ticks, 2))
+            self.assertTrue(np.isclose(T_m[-1], T[-1]))
+            # more accurate than integrating with controller_dt
+            self.assertTrue(np.max(np.abs(X_m[-1] - x_ref)) <
+                            np.max(np.abs(X[-1] - x_ref)))
+
+    def test_11_stop_condition(self):
+        controller = PointPIDController(torque_limit=[3.0, 3.0], dt=0.01)
+        controller.set_parameters(Kp=5.0, Ki=0.0, Kd=0.5)
+        controller.set_goal([0., 0., 0., 0.])
+        x0 = [0.1, -0.1, 0., 0.]
+        stop = {"goal": [0., 0., 0., 0.],
+                "epsilon": [0.2, 0.2, 1.0, 1.0],
+                "hold_time": 0.1}
+        self.simulator.reset()
+
+        controller.init()
+        T, X, U = self.simulator.simulate(0., x0, 2., 0.01, controller)
+        self.assertTrue(self.simulator.stop_reason == "tf")
+        n = len(T)
+
+        controller.init()
+        T_s, X_s, U_s = self.simulator.simulate(0., x0, 2., 0.01, controller,
+                                                stop_condition=stop)
+        self.assertTrue(self.simulator.stop_reason == "success")
+        self.assertTrue(len(T_s) < n)
+        n_s = len(T_s)
+        self.assertTrue(np.allclose(X_s, X[:n_s]))
+
+        controller.init()
+        T_h, X_h, U_h = self.simulator.simulate(0., x0, 2., 0.01, controller,
+                                                stop_condition=stop,
+                                                pad="auto")
+        self.assertTrue(len(T_h) == n)
+        self.assertTrue(np.shape(U_h) == np.shape(U))
+        self.assertTrue(np.allclose(X_h[n_s:], X_h[n_s - 1]))
+
+        T_c, X_c, U_c = self.simulator.simulate(
+            0., x0, 2., 0.01, None,
+            stop_condition=lambda t, x, tau: "custom" if t >= 0.5 else None,
+            pad="nan")
+        self.assertTrue(self.simulator.stop_reason == "custom")
+        self.assertTrue(len(T_c) == n)
+        self.assertTrue(np.isfinite(X_c[50]).all())
+        self.assertTrue(np.isnan(X_c[-1]).all())
+
+        T_d, X_d, U_d = self.simulator.simulate(
+            0., self.states[2], 2., 0.01, None,
+            stop_condition={"x_max": [10., 10., 5., 5.]})
+        self.assertTrue(self.simulator.stop_reason == "diverged")
+        self.assertTrue(len(T_d) < n)
+        self.simulator.reset()
@@ -3,43 +3,67 @@ Unit Tests
 ==========
 """
 
+import os
+import glob
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 import numpy as np
 
 
+from double_pendulum.model import symbolic_cache
+from double_pendulum.model import symbolic_plant
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.model.model_parameters import model_parameters
 
 
 class Test(unittest.TestCase):
 
-    plant1 = SymbolicDoublePendulum(
-            mass=[0.606, 0.630],
-            length=[0.3, 0.2],
-            com=[0.275, 0.166],
-            damping=[0.081, 0.0],
-            gravity=9.81,
-            coulomb_fric=[0.093, 0.186],
-            inertia=[None, None],
-            motor_inertia=0.0,
-            gear_ratio=6,
-            torque_limit=[3.0, 3.0])
-    plant2 = SymbolicDoublePendulum(
-            mass=[0.64, 0.56],
-            length=[0.2, 0.3],
-            com=[0.2, 0.32],
-            damping=[0.001, 0.001],
-            gravity=9.81,
-            coulomb_fric=[0.078, 0.093],
-            inertia=[0.027, 0.054],
-            motor_inertia=6.29e-5,
-            gear_ratio=6,
-            torque_limit=[10.0, 10.0])
-
     mpar = model_parameters()
-    plant3 = SymbolicDoublePendulum(model_pars=mpar)
 
-    plants = [plant1, plant2, plant3]
+    @classmethod
+    def setUpClass(cls):
+        # keep the compile cache of the tests out of the user cache
+        cls.cache_dir = tempfile.TemporaryDirectory()
+        cls.old_cache_dir = os.environ.get("DOUBLE_PENDULUM_CACHE_DIR")
+        os.environ["DOUBLE_PENDULUM_CACHE_DIR"] = cls.cache_dir.name
+        symbolic_cache._memory_cache.clear()
+
+        cls.plant1 = SymbolicDoublePendulum(
+                mass=[0.606, 0.630],
+                length=[0.3, 0.2],
+                com=[0.275, 0.166],
+                damping=[0.081, 0.0],
+                gravity=9.81,
+                coulomb_fric=[0.093, 0.186],
+                inertia=[None, None],
+                motor_inertia=0.0,
+                gear_ratio=6,
+                torque_limit=[3.0, 3.0])
+        cls.plant2 = SymbolicDoublePendulum(
+                mass=[0.64, 0.56],
+                length=[0.2, 0.3],
+                com=[0.2, 0.32],
+                damping=[0.001, 0.001],
+                gravity=9.81,
+                coulomb_fric=[0.078, 0.093],
+                inertia=[0.027, 0.054],
+                motor_inertia=6.29e-5,
+                gear_ratio=6,
+                torque_limit=[10.0, 10.0])
+        cls.plant3 = SymbolicDoublePendulum(model_pars=cls.mpar)
+
+        cls.plants = [cls.plant1, cls.plant2, cls.plant3]
+
+    @classmethod
+    def tearDownClass(cls):
+        symbolic_cache._memory_cache.clear()
+        if cls.old_cache_dir is None:
+            del os.environ["DOUBLE_PENDULUM_CACHE_DIR"]
+        else:
+            os.environ["DOUBLE_PENDULUM_CACHE_DIR"] = cls.old_cache_dir
+        cls.cache_dir.cleanup()
 
     poses = [[0., 0.],
              [np.pi, 0.],
@@ -242,5 +266,160 @@ class Test(unittest.TestCase):
                     diff = np.max(np.abs(tau - u))
                     self.assertTrue(diff < epsilon)
 
+    def test_18_compile_cache(self):
+        key = symbolic_cache.get_cache_key(self.plant1.formulas, self.plant1.B)
+        path = symbolic_cache._entry_path(key)
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(os.path.dirname(path), self.cache_dir.name)
+
+        # same formulas and actuators as plant1 -> loaded from disk,
+        # used with the parameters of plant2
+        symbolic_cache._memory_cache.clear()
+        with mock.patch.object(symbolic_plant, "store_entry",
+                               side_effect=AssertionError("cache miss")):
+            plant = SymbolicDoublePendulum(
+                    mass=[0.64, 0.56],
+                    length=[0.2, 0.3],
+                    com=[0.2, 0.32],
+                    damping=[0.001, 0.001],
+                    gravity=9.81,
+                    coulomb_fric=[0.078, 0.093],
+                    inertia=[0.027, 0.054],
+                    motor_inertia=6.29e-5,
+                    gear_ratio=6,
+                    torque_limit=[3.0, 3.0])
+        self.assertTrue(key in symbolic_cache._memory_cache)
+        for x in self.states:
+            for u in self.actions:
+                self.assertTrue(np.allclose(plant.rhs(0., x, u),
+                                            self.plant2.rhs(0., x, u)))
+                A1, B1 = plant.linear_matrices(x, u)
+                A2, B2 = self.plant2.linear_matrices(x, u)
+                self.assertTrue(np.allclose(A1, A2))
+                self.assertTrue(np.allclose(B1, B2))
+            self.assertTrue(np.isclose(plant.total_energy(x),
+                                       self.plant2.total_energy(x)))
+
+    def test_19_compile_cache_invalidation(self):
+        key = symbolic_cache.get_cache_key(self.plant1.formulas, self.plant1.B)
+        path = symbolic_cache._entry_path(key)
+        backup = os.path.join(self.cache_dir.name, "entry.bak")
+        shutil.copy(path, backup)
+        old_version = symbolic_cache.get_cache_version()
+        try:
+            with mock.patch.object(symbolic_cache, "_cache_version",
+                                   "changed-version"):
+                symbolic_cache._memory_cache.clear()
+                # an entry written with another version is not used
+                new_path = symbolic_cache._entry_path(key)
+                self.assertNotEqual(new_path, path)
+                shutil.copy(backup, new_path)
+                self.assertIsNone(symbolic_cache.load_entry(key))
+                # and entries of other versions are removed
+                symbolic_cache.prune_cache()
+                self.assertFalse(os.path.isfile(path))
+                os.remove(new_path)
+        finally:
+            symbolic_cache._memory_cache.clear()
+            shutil.move(backup, path)
+        self.assertEqual(symbolic_cache.get_cache_version(), old_version)
+        self.assertIsNotNone(symbolic_cache.load_entry(key))
+
+        # size cap: the least recently used entries are evicted
+        prefix = symbolic_cache._version_prefix()
+        entries = [os.path.join(self.cache_dir.name, f"{prefix}-dummy{i}.pkl")
+                   for i in range(3)]
+        for i, e in enumerate(entries):
+            with open(e, "wb") as f:
+                f.write(b"0"*1000)
+            os.utime(e, (i, i))
+        size = sum(os.path.getsize(p) for p in
+                   glob.glob(os.path.join(self.cache_dir.name, "*.pkl")))
+        symbolic_cache.prune_cache(max_size=size - 1500)
+        self.assertFalse(os.path.isfile(entries[0]))
+        self.assertFalse(os.path.isfile(entries[1]))
+        self.assertTrue(os.path.isfile(entries[2]))
+        self.assertTrue(os.path.isfile(path))
+        os.remove(entries[2])
+
+    def test_20_parameter_batch(self):
+        P = np.array([p.parameter_vector() for p in self.plants])
+        for x in self.states:
+            for u in self.actions:
+                X = np.tile(x, (len(P), 1))
+                U = np.tile(u, (len(P), 1))
+                res = self.plant1.rhs_batch(0., X, U, P)
+                A, B = self.plant1.linear_matrices_batch(X, U, P)
+                self.assertTrue(np.shape(res) == (len(P), 4))
+                self.assertTrue(np.shape(A) == (len(P), 4, 4))
+                self.assertTrue(np.shape(B) == (len(P), 4, 2))
+                for i, p in enumerate(self.plants):
+                    self.assertTrue(np.allclose(res[i], p.rhs(0., x, u)))
+                    A_i, B_i = p.linear_matrices(x, u)
+                    self.assertTrue(np.allclose(A[i], A_i))
+                    self.assertTrue(np.allclose(B[i], B_i))
+
+    def test_21_set_parameters(self):
+        plant = SymbolicDoublePendulum(torque_limit=[3.0, 3.0])
+        plant.set_parameters(par_vector=self.plant2.parameter_vector())
+        for x in self.states:
+            for u in self.actions:
+                self.assertTrue(np.allclose(plant.rhs(0., x, u),
+                                            self.plant2.rhs(0., x, u)))
+        plant.set_parameters(model_pars=self.mpar)
+        for x in self.states:
+            self.assertTrue(np.isclose(plant.total_energy(x),
+                                       self.plant3.total_energy(x)))
+
+    def test_22_set_parameters_actuator(self):
+        # acrobot -> pendubot via the torque limit of the model parameters
+        plant = SymbolicDoublePendulum(model_pars=self.mpar,
+                                       torque_limit=[0., 5.])
+        self.assertTrue(np.array_equal(plant.B, [[0, 0], [0, 1]]))
+        mpar = model_parameters()
+        mpar.set_torque_limit([5., 0.])
+        plant.set_parameters(model_pars=mpar)
+        self.assertTrue(np.array_equal(plant.B, [[1, 0], [0, 0]]))
+        ref = SymbolicDoublePendulum(model_pars=mpar, torque_limit=[5., 0.])
+        for x in self.states:
+            self.assertTrue(np.allclose(plant.rhs(0., x, [0., 1.]),
+                                        plant.rhs(0., x, [0., 0.])))
+            for u in self.actions:
+                self.assertTrue(np.allclose(plant.rhs(0., x, u),
+                                            ref.rhs(0., x, u)))
+                A1, B1 = plant.linear_matrices(x, u)
+                A2, B2 = ref.linear_matrices(x, u)
+                self.assertTrue(np.allclose(A1, A2))
+                self.assertTrue(np.allclose(B1, B2))
+
+    def test_23_discrete_linearization(self):
+        dt = 0.01
+        X = np.asarray(self.states, dtype=float)
+        U = np.tile(self.actions[1], (len(X), 1))
+        A, B = self.plant1.linear_matrices_discrete_batch(X, U, dt)
+        for i, x in enumerate(X):
+            A_i, B_i = self.plant1.linear_matrices_discrete(x, U[i], dt)
+            self.assertTrue(np.allclose(A[i], A_i))
+            self.assertTrue(np.allclose(B[i], B_i))
+
+        # jacobians of one Runge-Kutta step, compared to finite differences
+        def rk4(x, u):
+            k1 = self.plant1.rhs(0., x, u)
+            k2 = self.plant1.rhs(0., x + 0.5*dt*k1, u)
+            k3 = self.plant1.rhs(0., x + 0.5*dt*k2, u)
+            k4 = self.plant1.rhs(0., x + dt*k3, u)
+            return x + dt/6.*(k1 + 2.*k2 + 2.*k3 + k4)
+
+        A, B = self.plant1.linear_matrices_discrete_batch(
+            X, U, dt, method="runge_kutta")
+        eps = 1e-6
+        for i, x in enumerate(X):
+            A_fd = np.array([(rk4(x + eps*e, U[i]) - rk4(x - eps*e, U[i])) / (2*eps)
+                             for e in np.identity(4)]).T
+            B_fd = np.array([(rk4(x, U[i] + eps*e) - rk4(x, U[i] - eps*e)) / (2*eps)
+                             for e in np.identity(2)]).T
+            self.assertTrue(np.allclose(A[i], A_fd, rtol=1e-4, atol=1e-5))
+            self.assertTrue(np.allclose(B[i], B_fd, rtol=1e-4, atol=1e-5))
+
 if __name__ == '__main__':
     unittest.main()